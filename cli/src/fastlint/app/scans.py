@@ -3,6 +3,7 @@ import json
 import os
 import sys
 from collections import Counter
+from collections import defaultdict
 from datetime import datetime
 from datetime import timedelta
 from pathlib import Path
@@ -11,6 +12,7 @@ from typing import Dict
 from typing import FrozenSet
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Set
 from typing import TYPE_CHECKING
 from typing import Union
@@ -31,11 +33,13 @@ from fastlint.error import INVALID_API_KEY_EXIT_CODE
 from fastlint.error import FastlintError
 from fastlint.parsing_data import ParsingData
 from fastlint.rule import Rule
+from fastlint.rule_match import RuleMatch
 from fastlint.rule_match import RuleMatchMap
 from fastlint.state import get_state
 from fastlint.subproject import resolved_subproject_to_stats
 from fastlint.subproject import subproject_to_stats
 from fastlint.target_manager import ALL_PRODUCTS
+from fastlint.util import sort_paths
 from fastlint.verbose_logging import getLogger
 
 if TYPE_CHECKING:
@@ -350,7 +354,7 @@ class ScanHandler:
         matches_by_rule: RuleMatchMap,
         errors: List[FastlintError],
         rules: List[Rule],
-        targets: Set[Path],
+        sorted_targets: Sequence[str],
         renamed_targets: Set[Path],
         ignored_targets: FrozenSet[Path],
         cli_suggested_exit_code: int,
@@ -367,6 +371,9 @@ class ScanHandler:
         """
         commit_date here for legacy reasons. epoch time of latest commit
 
+        sorted_targets are the paths of the targets, as given by
+        OutputExtra.sorted_targets()
+
         Returns (success, block_scan, block_reason)
         """
         state = get_state()
@@ -391,11 +398,17 @@ class ScanHandler:
             out.High(): 4,
             out.Critical(): 5,
         }
-        # NB: sorted guarantees stable sort, so within a given severity level
-        # issues remain sorted as before
-        all_matches = sorted(
-            all_matches, key=lambda match: sort_order[match.severity.value]
-        )
+        # Bucket the matches by severity level, so within a given severity
+        # level issues remain in the order as before (like a stable sort,
+        # without the comparisons)
+        matches_by_level: Dict[int, List[RuleMatch]] = defaultdict(list)
+        for match in all_matches:
+            matches_by_level[sort_order[match.severity.value]].append(match)
+        all_matches = [
+            match
+            for level in sorted(matches_by_level)
+            for match in matches_by_level[level]
+        ]
         new_ignored, new_matches = partition(
             all_matches, lambda match: bool(match.is_ignored)
         )
@@ -434,8 +447,8 @@ class ScanHandler:
             token=token,
             findings=findings,
             ignores=ignores,
-            searched_paths=[out.Fpath(str(t)) for t in sorted(targets)],
-            renamed_paths=[out.Fpath(str(rt)) for rt in sorted(renamed_targets)],
+            searched_paths=[out.Fpath(t) for t in sorted_targets],
+            renamed_paths=[out.Fpath(rt) for rt in sort_paths(renamed_targets)],
             rule_ids=rule_ids,
             contributions=contributions,
         )
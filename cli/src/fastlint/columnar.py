@@ -0,0 +1,204 @@
+##############################################################################
+# Prelude
+##############################################################################
+# A compact binary encoding of the findings of a scan, stored column by
+# column, for analytics pipelines that find parsing multi-GB JSON outputs
+# too slow. This is what --columnar writes.
+#
+# This module only depends on the standard library, so that the reader can
+# be copied as is in projects not depending on fastlint.
+#
+# Layout of a file:
+#  - MAGIC
+#  - the length of the header, as a little-endian uint32
+#  - the header, in JSON: the number of findings, and for each column its
+#    name, array typecode, whether it is dictionary-encoded, and where its
+#    data is in the body
+#  - the body: the data of each column, as little-endian arrays
+#
+# Dictionary-encoded columns hold indices in the string table, which is
+# stored as the UTF-8 encoding of all the strings ("strings.data") and the
+# offset of the end of each string in it ("strings.end").
+import json
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Dict
+from typing import IO
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Sequence
+from typing import Tuple
+
+MAGIC = b"FLCOL\x00\x00\x01"
+
+STRINGS_DATA = "strings.data"
+STRINGS_END = "strings.end"
+
+# The columns of a file written by --columnar, with their array typecode.
+# Columns of typecode "I" are dictionary-encoded.
+COLUMNS: Sequence[Tuple[str, str]] = (
+    ("rule_id", "I"),
+    ("path", "I"),
+    ("start_line", "i"),
+    ("start_col", "i"),
+    ("start_offset", "q"),
+    ("end_line", "i"),
+    ("end_col", "i"),
+    ("end_offset", "q"),
+    ("severity", "I"),
+    ("message", "I"),
+    ("fingerprint", "I"),
+    # the metadata of the rule, as JSON
+    ("metadata", "I"),
+    ("is_ignored", "B"),
+)
+
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+class StringTable:
+    """
+    The strings of a dictionary-encoded file, each stored once.
+    """
+
+    def __init__(self) -> None:
+        self._indices: Dict[str, int] = {}
+
+    def add(self, s: str) -> int:
+        index = self._indices.get(s)
+        if index is None:
+            index = len(self._indices)
+            self._indices[s] = index
+        return index
+
+    def to_columns(self) -> Tuple[array, array]:
+        data = bytearray()
+        end = array("Q")
+        # dicts keep insertion order, which is the order of the indices
+        for s in self._indices:
+            data += s.encode("utf-8")
+            end.append(len(data))
+        return array("B", data), end
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_columns(
+    fout: IO[bytes], count: int, columns: Mapping[str, array], strings: StringTable
+) -> None:
+    """
+    Write a file with `count` rows. Columns using typecode "I" are
+    dictionary-encoded in `strings`.
+    """
+    strings_data, strings_end = strings.to_columns()
+    all_columns = {**columns, STRINGS_DATA: strings_data, STRINGS_END: strings_end}
+
+    header_columns: List[Dict[str, Any]] = []
+    offset = 0
+    for name, values in all_columns.items():
+        size = len(values) * values.itemsize
+        header_columns.append(
+            {
+                "name": name,
+                "type": values.typecode,
+                "dict": values.typecode == "I",
+                "offset": offset,
+                "size": size,
+            }
+        )
+        offset += size
+    header = json.dumps(
+        {"count": count, "columns": header_columns}, separators=(",", ":")
+    ).encode("utf-8")
+
+    fout.write(MAGIC)
+    fout.write(_HEADER_LENGTH.pack(len(header)))
+    fout.write(header)
+    for values in all_columns.values():
+        fout.write(_to_little_endian(values))
+
+
+@dataclass
+class ColumnarFindings:
+    """
+    The content of a file written by --columnar.
+    """
+
+    count: int
+    columns: Dict[str, array]
+    # the names of the dictionary-encoded columns
+    dict_columns: List[str]
+    strings: List[str] = field(repr=False)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def values(self, name: str) -> List[Any]:
+        """
+        The values of a column, decoded if dictionary-encoded.
+        """
+        column = self.columns[name]
+        if name in self.dict_columns:
+            strings = self.strings
+            return [strings[i] for i in column]
+        return column.tolist()
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        The findings, one dict per finding. The metadata is decoded once
+        per distinct value, so rows with the same metadata share the dict.
+        """
+        names = list(self.columns)
+        values = [self.values(name) for name in names]
+        if "metadata" in self.columns:
+            column = self.columns["metadata"]
+            decoded = {i: json.loads(self.strings[i]) for i in set(column)}
+            values[names.index("metadata")] = [decoded[i] for i in column]
+        for row in zip(*values):
+            yield dict(zip(names, row))
+
+
+def read_columns(fin: IO[bytes]) -> ColumnarFindings:
+    """
+    Read a file written by write_columns().
+    """
+    data = fin.read()
+    if not data.startswith(MAGIC):
+        raise ValueError("not a columnar findings file")
+    (header_length,) = _HEADER_LENGTH.unpack_from(data, len(MAGIC))
+    body_start = len(MAGIC) + _HEADER_LENGTH.size + header_length
+    header = json.loads(data[body_start - header_length : body_start])
+
+    view = memoryview(data)
+    columns: Dict[str, array] = {}
+    for column in header["columns"]:
+        start = body_start + column["offset"]
+        values = array(column["type"])
+        values.frombytes(view[start : start + column["size"]])
+        if sys.byteorder == "big" and values.itemsize > 1:
+            values.byteswap()
+        columns[column["name"]] = values
+
+    strings_data = columns.pop(STRINGS_DATA).tobytes()
+    strings: List[str] = []
+    start = 0
+    for end in columns.pop(STRINGS_END):
+        strings.append(strings_data[start:end].decode("utf-8"))
+        start = end
+
+    return ColumnarFindings(
+        count=header["count"],
+        columns=columns,
+        dict_columns=[c["name"] for c in header["columns"] if c["dict"]],
+        strings=strings,
+    )
@@ -233,18 +233,22 @@ def ci(
     jobs: int,
     matching_explanations: bool,
     max_chars_per_line: int,
+    max_findings_displayed: Optional[int],
     max_lines_per_finding: int,
     max_log_list_entries: int,
     max_memory: Optional[int],
     max_target_bytes: int,
     metrics: Optional[MetricsState],
     optimizations: str,
+    dedup_rules: bool,
     dataflow_traces: Optional[bool],
     output: Optional[str],
     output_format: OutputFormat,
     outputs_text: List[str],
     outputs_emacs: List[str],
     outputs_json: List[str],
+    outputs_ndjson: List[str],
+    outputs_columnar: List[str],
     outputs_vim: List[str],
     outputs_gitlab_sast: List[str],
     outputs_gitlab_secrets: List[str],
@@ -398,7 +402,7 @@ def ci(
                         dict(),
                         [],
                         [],
-                        set(),
+                        [],
                         set(),
                         frozenset(),
                         0,  # Inform app that we are exiting with code 0
@@ -586,6 +590,8 @@ def ci(
             outputs_text=outputs_text,
             outputs_emacs=outputs_emacs,
             outputs_json=outputs_json,
+            outputs_ndjson=outputs_ndjson,
+            outputs_columnar=outputs_columnar,
             outputs_vim=outputs_vim,
             outputs_gitlab_sast=outputs_gitlab_sast,
             outputs_gitlab_secrets=outputs_gitlab_secrets,
@@ -600,6 +606,7 @@ def ci(
             timeout_threshold=timeout_threshold,
             output_time=time_flag,
             output_per_finding_max_lines_limit=max_lines_per_finding,
+            max_findings_displayed=max_findings_displayed,
             output_per_line_max_chars_limit=max_chars_per_line,
             dataflow_traces=dataflow_traces,
             max_log_list_entries=max_log_list_entries,
@@ -663,6 +670,7 @@ def ci(
             "skip_unknown_extensions": (not scan_unknown_extensions),
             "allow_untrusted_validators": allow_untrusted_validators,
             "optimizations": optimizations,
+            "dedup_rules": dedup_rules,
             "baseline_commit": metadata.merge_base_ref,
             "baseline_commit_is_mergebase": True,
             "diff_depth": diff_depth,
@@ -898,7 +906,7 @@ def ci(
                     filtered_matches_by_rule,
                     fastlint_errors,
                     filtered_rules,
-                    output_extra.all_targets,
+                    output_extra.sorted_targets(),
                     renamed_targets,
                     ignore_log.unsupported_lang_paths,
                     cli_suggested_exit_code,
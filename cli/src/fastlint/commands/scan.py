@@ -170,6 +170,11 @@ _scan_options: List[Callable] = [
         default="all",
         type=click.Choice(["all", "none"]),
     ),
+    optgroup.option(
+        "--dedup-rules",
+        is_flag=True,
+        default=False,
+    ),
     optgroup.option(
         "--timeout",
         type=int,
@@ -201,6 +206,11 @@ _scan_options: List[Callable] = [
         type=int,
         default=DEFAULT_MAX_CHARS_PER_LINE,
     ),
+    optgroup.option(
+        "--max-findings-displayed",
+        type=int,
+        default=None,
+    ),
     optgroup.option(
         "--max-lines-per-finding",
         type=int,
@@ -285,6 +295,18 @@ _scan_options: List[Callable] = [
         type=OutputFormat,
         flag_value=OutputFormat.JSON,
     ),
+    optgroup.option(
+        "--ndjson",
+        "output_format",
+        type=OutputFormat,
+        flag_value=OutputFormat.NDJSON,
+    ),
+    optgroup.option(
+        "--columnar",
+        "output_format",
+        type=OutputFormat,
+        flag_value=OutputFormat.COLUMNAR,
+    ),
     optgroup.option(
         "--gitlab-sast",
         "output_format",
@@ -328,6 +350,8 @@ _scan_options: List[Callable] = [
     ),
     optgroup.option("--emacs-output", "outputs_emacs", multiple=True, default=[]),
     optgroup.option("--json-output", "outputs_json", multiple=True, default=[]),
+    optgroup.option("--ndjson-output", "outputs_ndjson", multiple=True, default=[]),
+    optgroup.option("--columnar-output", "outputs_columnar", multiple=True, default=[]),
     optgroup.option(
         "--gitlab-sast-output", "outputs_gitlab_sast", multiple=True, default=[]
     ),
@@ -408,6 +432,8 @@ def collect_additional_outputs(
     outputs_text: List[str],
     outputs_emacs: List[str],
     outputs_json: List[str],
+    outputs_ndjson: List[str],
+    outputs_columnar: List[str],
     outputs_vim: List[str],
     outputs_gitlab_sast: List[str],
     outputs_gitlab_secrets: List[str],
@@ -419,6 +445,8 @@ def collect_additional_outputs(
         (OutputFormat.EMACS, outputs_emacs),
         (OutputFormat.VIM, outputs_vim),
         (OutputFormat.JSON, outputs_json),
+        (OutputFormat.NDJSON, outputs_ndjson),
+        (OutputFormat.COLUMNAR, outputs_columnar),
         (OutputFormat.GITLAB_SAST, outputs_gitlab_sast),
         (OutputFormat.GITLAB_SECRETS, outputs_gitlab_secrets),
         (OutputFormat.JUNIT_XML, outputs_junit_xml),
@@ -553,18 +581,22 @@ def scan(
     lang: Optional[str],
     matching_explanations: bool,
     max_chars_per_line: int,
+    max_findings_displayed: Optional[int],
     max_lines_per_finding: int,
     max_log_list_entries: int,
     max_memory: Optional[int],
     max_target_bytes: int,
     metrics: Optional[MetricsState],
     optimizations: str,
+    dedup_rules: bool,
     dataflow_traces: bool,
     output: Optional[str],
     output_format: OutputFormat,
     outputs_text: List[str],
     outputs_emacs: List[str],
     outputs_json: List[str],
+    outputs_ndjson: List[str],
+    outputs_columnar: List[str],
     outputs_vim: List[str],
     outputs_gitlab_sast: List[str],
     outputs_gitlab_secrets: List[str],
@@ -702,6 +734,8 @@ def scan(
             outputs_text=outputs_text,
             outputs_emacs=outputs_emacs,
             outputs_json=outputs_json,
+            outputs_ndjson=outputs_ndjson,
+            outputs_columnar=outputs_columnar,
             outputs_vim=outputs_vim,
             outputs_gitlab_sast=outputs_gitlab_sast,
             outputs_gitlab_secrets=outputs_gitlab_secrets,
@@ -717,6 +751,7 @@ def scan(
             timeout_threshold=timeout_threshold,
             output_time=time_flag,
             output_per_finding_max_lines_limit=max_lines_per_finding,
+            max_findings_displayed=max_findings_displayed,
             output_per_line_max_chars_limit=max_chars_per_line,
             dataflow_traces=dataflow_traces,
             max_log_list_entries=max_log_list_entries,
@@ -866,6 +901,7 @@ def scan(
                         allow_untrusted_validators=allow_untrusted_validators,
                         severity=severity,
                         optimizations=optimizations,
+                        dedup_rules=dedup_rules,
                         baseline_commit=baseline_commit,
                         x_ls=x_ls,
                         x_ls_long=x_ls_long,
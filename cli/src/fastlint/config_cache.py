@@ -0,0 +1,113 @@
+##############################################################################
+# Prelude
+##############################################################################
+# An on-disk cache of the configs (rule files) that were successfully parsed
+# and validated.
+#
+# Parsing a config with ruamel's span-preserving constructor and validating
+# it (with fastlint-core or jsonschema) takes 5 to 15 seconds for registry
+# packs of several thousand rules. Since the result only depends on the
+# content of the config, on the version of fastlint and on the validation
+# (with fastlint-core, or with jsonschema only for --force-jsonschema), we
+# store it as JSON in a file named after a hash of the three, and reuse it on
+# the next runs.
+#
+# Only configs without any error (including the ones about rules skipped for
+# this version of fastlint) are stored, and only if all their rules can be
+# built. The cached configs have no spans; if one of them can't be turned
+# into rules after all, e.g. because its file was modified, it is parsed
+# again with spans to report the error.
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+from typing import Optional
+
+from fastlint import __VERSION__
+from fastlint.state import get_state
+from fastlint.verbose_logging import getLogger
+
+logger = getLogger(__name__)
+
+# How many configs we keep. The least recently used ones are removed first.
+MAX_ENTRIES = 32
+
+
+def config_key(contents: str, force_jsonschema: bool = False) -> str:
+    h = hashlib.sha256()
+    h.update(__VERSION__.encode())
+    h.update(b"\0")
+    h.update(b"jsonschema" if force_jsonschema else b"fastlint-core")
+    h.update(b"\0")
+    h.update(contents.encode())
+    return h.hexdigest()
+
+
+def _cache_dir() -> Path:
+    return get_state().env.config_cache_path
+
+
+def is_config_cached(contents: str, force_jsonschema: bool = False) -> bool:
+    return (_cache_dir() / f"{config_key(contents, force_jsonschema)}.json").exists()
+
+
+def get_cached_config(contents: str, force_jsonschema: bool = False) -> Optional[Any]:
+    """
+    The unrolled YamlTree of the config `contents` if it is in the cache.
+    """
+    path = _cache_dir() / f"{config_key(contents, force_jsonschema)}.json"
+    try:
+        with path.open(encoding="utf-8") as f:
+            data = json.load(f)
+        # for the least-recently-used eviction in cache_config()
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.debug(f"Ignoring unreadable cached config {path}: {e}")
+        return None
+    logger.debug(f"Using cached config {path}")
+    return data
+
+
+def cache_config(contents: str, data: Any, force_jsonschema: bool = False) -> None:
+    """
+    Store `data`, the unrolled YamlTree of the validated config `contents`.
+
+    Failing to write to the cache is not an error.
+    """
+    try:
+        serialized = json.dumps(data, separators=(",", ":"))
+    except (TypeError, ValueError):
+        # e.g. YAML dates
+        return
+    if json.loads(serialized) != data:
+        # e.g. YAML mappings with non-string keys
+        return
+
+    cache_dir = _cache_dir()
+    path = cache_dir / f"{config_key(contents, force_jsonschema)}.json"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # write then rename, so that concurrent runs never read a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(serialized)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        _evict(cache_dir)
+    except OSError as e:
+        logger.debug(f"Failed to cache config in {path}: {e}")
+
+
+def _evict(cache_dir: Path) -> None:
+    entries = sorted(
+        cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for path in entries[MAX_ENTRIES:]:
+        path.unlink(missing_ok=True)
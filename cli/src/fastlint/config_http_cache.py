@@ -0,0 +1,230 @@
+##############################################################################
+# Prelude
+##############################################################################
+# An on-disk HTTP cache of the configs downloaded from the registry or from
+# a URL.
+#
+# Configs like p/default are several MB and were downloaded on every run.
+# We now store each response with its headers, ETag and Last-Modified included:
+#  - while the response is fresh (max-age of its Cache-Control header, or
+#    FASTLINT_CONFIG_HTTP_CACHE_TTL seconds), it is used without contacting
+#    the server at all;
+#  - after that, the request is sent with If-None-Match and
+#    If-Modified-Since, so that the server can answer 304 Not Modified
+#    instead of sending the config again;
+#  - if the server can't be reached, the stored response is used whatever
+#    its age.
+#
+# Only GET requests are cached. The configs of the Fastlint Cloud Platform
+# come from POST /api/cli/scans, which also registers a new scan and must
+# reach the server every time.
+#
+# Together with fastlint.config_cache, a repeated run skips both the
+# download and the parsing of its configs.
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Mapping
+from typing import Optional
+
+import requests
+from attrs import evolve
+from attrs import field
+from attrs import frozen
+from requests.structures import CaseInsensitiveDict
+
+from fastlint.state import get_state
+from fastlint.verbose_logging import getLogger
+
+logger = getLogger(__name__)
+
+# The total size of the stored responses. The least recently used ones are
+# removed first.
+MAX_SIZE = 256 * 1024 * 1024
+
+_MAX_AGE_RE = re.compile(r"\bmax-age=(\d+)")
+
+
+@frozen
+class CachedResponse:
+    url: str
+    content: bytes
+    fetched_at: float
+    # how long after fetched_at the response can be used without asking the
+    # server
+    max_age: int
+    headers: Mapping[str, str] = field(factory=dict)
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> Optional["CachedResponse"]:
+        """
+        None if the response must not be stored.
+        """
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        return cls(
+            url=response.url,
+            content=response.content,
+            fetched_at=time.time(),
+            max_age=_max_age(cache_control),
+            headers=dict(response.headers),
+        )
+
+    @property
+    def etag(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.fetched_at + self.max_age
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = requests.codes.ok
+        response.url = self.url
+        response._content = self.content
+        response.headers = CaseInsensitiveDict(self.headers)
+        return response
+
+
+def _max_age(cache_control: str) -> int:
+    if "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        return int(match[1])
+    return get_state().env.config_http_cache_ttl
+
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """
+    get_state().app_session.request(method, url, **kwargs), through the cache
+    for GET requests.
+
+    The stored responses are specific to the url and the token of the user.
+    """
+    session = get_state().app_session
+    if method != "GET":
+        return session.request(method, url, **kwargs)
+
+    key = _key(url, session.token)
+    cached = _load(key)
+    if cached is not None and cached.is_fresh():
+        logger.debug(f"Using cached response for {method} {url}")
+        return cached.to_response()
+
+    headers: Dict[str, Optional[str]] = dict(kwargs.pop("headers", None) or {})
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    try:
+        response = session.request(method, url, headers=headers, **kwargs)
+    except requests.exceptions.RequestException as e:
+        if cached is None:
+            raise
+        logger.verbose(f"Using cached response for {method} {url}: {e}")
+        return cached.to_response()
+
+    if response.status_code == requests.codes.not_modified and cached is not None:
+        logger.debug(f"Cached response for {method} {url} is still valid")
+        # the headers of a 304 answer replace the stored ones
+        stored_headers = CaseInsensitiveDict(cached.headers)
+        stored_headers.update(response.headers)
+        cached = evolve(
+            cached,
+            fetched_at=time.time(),
+            max_age=_max_age(response.headers.get("Cache-Control", "").lower()),
+            headers=dict(stored_headers),
+        )
+        _store(key, cached)
+        return cached.to_response()
+
+    if response.status_code == requests.codes.ok:
+        to_store = CachedResponse.from_response(response)
+        if to_store is not None:
+            _store(key, to_store)
+    return response
+
+
+def _cache_dir() -> Path:
+    return get_state().env.config_http_cache_path
+
+
+def _key(url: str, token: Optional[str]) -> str:
+    h = hashlib.sha256()
+    for part in (url, token or ""):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# A stored response is a JSON header with everything but the content, on the
+# first line, followed by the content.
+def _load(key: str) -> Optional[CachedResponse]:
+    path = _cache_dir() / key
+    try:
+        with path.open("rb") as f:
+            header = json.loads(f.readline())
+            content = f.read()
+        # for the least-recently-used eviction in _store()
+        os.utime(path)
+        return CachedResponse(content=content, **header)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError) as e:
+        logger.debug(f"Ignoring unreadable cached response {path}: {e}")
+        return None
+
+
+def _store(key: str, cached: CachedResponse) -> None:
+    """
+    Failing to write to the cache is not an error.
+    """
+    header = {
+        "url": cached.url,
+        "fetched_at": cached.fetched_at,
+        "max_age": cached.max_age,
+        "headers": dict(cached.headers),
+    }
+    cache_dir = _cache_dir()
+    path = cache_dir / key
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # write then rename, so that concurrent runs never read a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(header).encode())
+                f.write(b"\n")
+                f.write(cached.content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        _evict(cache_dir)
+    except OSError as e:
+        logger.debug(f"Failed to cache response in {path}: {e}")
+
+
+def _evict(cache_dir: Path) -> None:
+    entries = [(p.stat(), p) for p in cache_dir.iterdir() if p.suffix != ".tmp"]
+    size = sum(stat.st_size for stat, _ in entries)
+    # the least recently used first
+    for stat, path in sorted(entries, key=lambda e: e[0].st_mtime):
+        if size <= MAX_SIZE:
+            break
+        path.unlink(missing_ok=True)
+        size -= stat.st_size
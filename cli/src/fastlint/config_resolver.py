@@ -3,6 +3,7 @@ import os
 import re
 import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import auto
 from enum import Enum
 from functools import lru_cache
@@ -16,6 +17,7 @@ from typing import NamedTuple
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
+from typing import Union
 from urllib.parse import urlencode
 from urllib.parse import urlparse
 from urllib.parse import urlsplit
@@ -25,8 +27,12 @@ from ruamel.yaml import YAMLError
 
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
 from fastlint import __VERSION__
+from fastlint import config_http_cache
 from fastlint import tracing
 from fastlint.app import auth
+from fastlint.config_cache import cache_config
+from fastlint.config_cache import get_cached_config
+from fastlint.config_cache import is_config_cached
 from fastlint.constants import CLI_RULE_ID
 from fastlint.constants import Colors
 from fastlint.constants import DEFAULT_FASTLINT_APP_CONFIG_URL
@@ -40,14 +46,18 @@ from fastlint.error import FastlintError
 from fastlint.error import UNPARSEABLE_YAML_EXIT_CODE
 from fastlint.error_location import Span
 from fastlint.rule import Rule
-from fastlint.rule import rule_without_metadata
 from fastlint.rule_lang import EmptySpan
 from fastlint.rule_lang import EmptyYamlException
 from fastlint.rule_lang import parse_config_preserve_spans
+from fastlint.rule_lang import parse_yaml_fast
 from fastlint.rule_lang import prepend_rule_path
+from fastlint.rule_lang import remove_incompatible_rules_based_on_version
+from fastlint.rule_lang import RpcValidationError
+from fastlint.rule_lang import run_rpc_validate
 from fastlint.rule_lang import validate_yaml
 from fastlint.rule_lang import YamlMap
 from fastlint.rule_lang import YamlTree
+from fastlint.state import get_context
 from fastlint.state import get_state
 from fastlint.util import is_config_suffix
 from fastlint.util import is_rules
@@ -76,6 +86,9 @@ CLOUD_PLATFORM_CONFIG_ID = "fastlint-app-rules"
 REGISTRY_CONFIG_ID = "remote-registry"
 NON_REGISTRY_REMOTE_CONFIG_ID = "remote-url"
 
+# How many --config we resolve at the same time
+MAX_CONFIG_WORKERS = 8
+
 
 class ConfigFile(NamedTuple):
     config_id: Optional[str]  # None for remote files
@@ -196,11 +209,12 @@ class ConfigLoader:
             raise  # error from first fetch
 
     def _download_config_from_url(self, url: str) -> ConfigFile:
-        app_session = get_state().app_session
         logger.debug("Downloading config from %s", url)
         error = f"Failed to download configuration from {url}"
         try:
-            resp = app_session.get(url, headers={"Accept": "application/json"})
+            resp = config_http_cache.request(
+                "GET", url, headers={"Accept": "application/json"}
+            )
             if resp.status_code == requests.codes.ok:
                 try:
                     rule_config = resp.json()["rule_config"]
@@ -430,32 +444,25 @@ def parse_config_files(
     """
     config = {}
     errors: List[FastlintError] = []
-    for config_id, contents, config_path in loaded_config_infos:
+    named_configs = [
+        (*_name_config(config_id, config_path), contents, config_path)
+        for config_id, contents, config_path in loaded_config_infos
+    ]
+    validated = (
+        {}
+        if force_jsonschema
+        else _validate_configs_together(
+            [(filename, contents) for _, filename, contents, _ in named_configs]
+        )
+    )
+    for i, (config_id, filename, contents, config_path) in enumerate(named_configs):
         try:
-            if not config_id:  # registry rules don't have config ids
-                # Note: we must disambiguate registry sourced remote rules from
-                # non-registry sourced ones for security purposes. Namely, we
-                # want to avoid running postprocessors from untrusted remote
-                # sources (unless a local flag disabiling the relevant check is
-                # used).
-                try:
-                    remote_rule_netloc = urlsplit(config_path).netloc
-                except ValueError:
-                    remote_rule_netloc = "invalid-url"
-                config_id = (
-                    REGISTRY_CONFIG_ID
-                    if is_url(config_path)
-                    and (
-                        remote_rule_netloc.endswith(".fastlint.dev")
-                        or remote_rule_netloc == "fastlint.dev"
-                    )
-                    else NON_REGISTRY_REMOTE_CONFIG_ID
-                )
-                filename = f"{config_path[:20]}..."
-            else:
-                filename = config_path
             config_data, config_errors = parse_config_string(
-                config_id, contents, filename, force_jsonschema=force_jsonschema
+                config_id,
+                contents,
+                filename,
+                force_jsonschema=force_jsonschema,
+                validated=validated.get(i),
             )
             config.update(config_data)
             errors.extend(config_errors)
@@ -473,6 +480,91 @@ def parse_config_files(
     return config, errors
 
 
+def _name_config(config_id: Optional[str], config_path: str) -> Tuple[str, str]:
+    """
+    The config id and the filename to use in errors for a config file.
+    """
+    if config_id:
+        return config_id, config_path
+    # registry rules don't have config ids
+    # Note: we must disambiguate registry sourced remote rules from
+    # non-registry sourced ones for security purposes. Namely, we
+    # want to avoid running postprocessors from untrusted remote
+    # sources (unless a local flag disabiling the relevant check is
+    # used).
+    try:
+        remote_rule_netloc = urlsplit(config_path).netloc
+    except ValueError:
+        remote_rule_netloc = "invalid-url"
+    config_id = (
+        REGISTRY_CONFIG_ID
+        if is_url(config_path)
+        and (
+            remote_rule_netloc.endswith(".fastlint.dev")
+            or remote_rule_netloc == "fastlint.dev"
+        )
+        else NON_REGISTRY_REMOTE_CONFIG_ID
+    )
+    return config_id, f"{config_path[:20]}..."
+
+
+@tracing.trace()
+def _validate_configs_together(
+    configs: Sequence[Tuple[str, str]]
+) -> Dict[int, Tuple[YamlTree, List[FastlintError]]]:
+    """
+    Validate the rules of several configs, given as (filename, contents), with
+    a single fastlint-core call instead of one per config, which is slow for
+    directories of hundreds of rule files.
+
+    Returns the result of parsing and validating each config that passed, by
+    index in `configs`. The configs that are cached, or can't be parsed or turned into
+    rules without errors, are not included, and neither are any of the
+    configs if fastlint-core rejects their rules: they must be validated one
+    by one by parse_config_string(), to find which ones are invalid and why.
+    """
+    parsed: Dict[int, Tuple[YamlTree, List[FastlintError]]] = {}
+    for i, (filename, contents) in enumerate(configs):
+        if not contents or is_config_cached(contents):
+            continue
+        data = _load_config_fast(contents)
+        if data is None or not isinstance(data.value, YamlMap):
+            continue
+        errors = remove_incompatible_rules_based_on_version(data, filename)
+        if _can_build_rules(data):
+            parsed[i] = (data, errors)
+    if len(parsed) < 2:
+        return {}
+
+    try:
+        combined = json.dumps(
+            {
+                RULES_KEY: [
+                    rule.unroll()
+                    for data, _ in parsed.values()
+                    for rule in data.value[RULES_KEY].value
+                ]
+            }
+        )
+    except (TypeError, ValueError) as e:
+        logger.debug(f"Can't combine the rules of {len(parsed)} configs: {e}")
+        return {}
+
+    try:
+        fd, rules_tmp_path = mkstemp(suffix=".rules", prefix="fastlint-", text=True)
+        try:
+            with os.fdopen(fd, "w") as fp:
+                fp.write(combined)
+            logger.debug(f"Validating {len(parsed)} configs together")
+            run_rpc_validate(rules_tmp_path)
+        finally:
+            os.unlink(rules_tmp_path)
+    except (RpcValidationError, OSError) as e:
+        logger.debug(f"Failed to validate {len(parsed)} configs together: {e}")
+        return {}
+    return parsed
+
+
 @tracing.trace()
 def resolve_config(
     config_str: str,
@@ -480,8 +572,13 @@ def resolve_config(
     force_jsonschema: bool = False,
 ) -> Tuple[Dict[str, YamlTree], List[FastlintError]]:
     """resolves if config arg is a registry entry, a url, or a file, folder, or loads from defaults if None"""
+    return _resolve_config(ConfigLoader(config_str, project_url), force_jsonschema)
+
+
+def _resolve_config(
+    config_loader: "ConfigLoader", force_jsonschema: bool = False
+) -> Tuple[Dict[str, YamlTree], List[FastlintError]]:
     start_t = time.time()
-    config_loader = ConfigLoader(config_str, project_url)
     config, errors = parse_config_files(
         config_loader.load_config(), force_jsonschema=force_jsonschema
     )
@@ -570,13 +667,40 @@ class Config:
         with_code_rules = False
         with_secrets = False
 
-        for i, config in enumerate(configs):
+        # ConfigLoader() records metrics, which isn't thread-safe, so the
+        # loaders are created here.
+        loaders: List[Union[ConfigLoader, FastlintError]] = []
+        for config in configs:
+            try:
+                loaders.append(ConfigLoader(config, project_url))
+            except FastlintError as e:
+                loaders.append(e)
+
+        # get_state() relies on click's current context, which is per thread
+        ctx = get_context()
+
+        def resolve(
+            loader: Union[ConfigLoader, FastlintError]
+        ) -> Tuple[Dict[str, YamlTree], List[FastlintError]]:
+            if isinstance(loader, FastlintError):
+                raise loader
+            with ctx.scope(cleanup=False):
+                return _resolve_config(loader, force_jsonschema=force_jsonschema)
+
+        # Resolving a config may download it, or read and validate a whole
+        # directory of rules, so the configs are resolved concurrently. The
+        # results are still merged in the order of `configs`, for the rule
+        # ids to be the same from one run to the other.
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(loaders), MAX_CONFIG_WORKERS))
+        ) as executor:
+            futures = [executor.submit(resolve, loader) for loader in loaders]
+
+        for i, (config, future) in enumerate(zip(configs, futures)):
             try:
                 # Patch config_id to fix
                 # https://github.com/khulnasoft/fastlint/issues/1912
-                resolved_config, config_errors = resolve_config(
-                    config, project_url, force_jsonschema=force_jsonschema
-                )
+                resolved_config, config_errors = future.result()
                 errors.extend(config_errors)
                 if not resolved_config:
                     logger.verbose(f"Could not resolve config for {config}. Skipping.")
@@ -629,17 +753,17 @@ class Config:
         # Deduplication occurs from left to right so as to have the same
         # behavior as ofastlint i.e. the first occurrence of each rule
         # if preserved and subsequent occurrences are discarded.
-        return list(
-            reversed(
-                list(
-                    OrderedDict(
-                        (rule_without_metadata(rule), rule)
-                        for rules in reversed(configs.values())
-                        for rule in reversed(rules)
-                    ).values()
-                )
+        registry = get_state().rule_registry
+        return [
+            registry.intern(rule)
+            for rule in reversed(
+                OrderedDict(
+                    (rule.full_hash, rule)
+                    for rules in reversed(configs.values())
+                    for rule in reversed(rules)
+                ).values()
             )
-        )
+        ]
 
     @staticmethod
     def _rename_rule_ids(valid_configs: Mapping[str, Sequence[Rule]]) -> None:
@@ -773,12 +897,67 @@ def parse_config_string(
     filename: Optional[str],
     no_rewrite_rule_ids: bool = False,
     force_jsonschema: bool = False,
+    validated: Optional[Tuple[YamlTree, List[FastlintError]]] = None,
 ) -> Tuple[Dict[str, YamlTree], List[FastlintError]]:
+    """
+    :param validated: the result of _validate_configs_together() for this
+        config, if any
+    """
     if not contents:
         raise FastlintError(
             f"Empty configuration file {filename}", code=UNPARSEABLE_YAML_EXIT_CODE
         )
 
+    cached = get_cached_config(contents, force_jsonschema)
+    if cached is not None:
+        data = YamlTree.wrap(cached, EmptySpan)
+        # Spans are only needed for errors. If the cached config can't be
+        # turned into rules, it is parsed again below to report why.
+        if _can_build_rules(data):
+            return {config_id: data}, []
+        logger.debug(f"Ignoring cached config {config_id}: its rules are invalid")
+
+    if validated is not None:
+        data, errors = validated
+    else:
+        data, errors = _parse_config_string(
+            config_id,
+            contents,
+            filename,
+            no_rewrite_rule_ids=no_rewrite_rule_ids,
+            force_jsonschema=force_jsonschema,
+        )
+    if not errors and _can_build_rules(data):
+        cache_config(contents, data.unroll(), force_jsonschema)
+    return {config_id: data}, errors
+
+
+def _can_build_rules(data: YamlTree) -> bool:
+    """
+    Whether Config._validate() would build all the rules of `data` without
+    error.
+    """
+    config = data.value
+    if not isinstance(config, YamlMap):
+        return False
+    rules = config.get(RULES_KEY)
+    if rules is None or not isinstance(rules.value, list):
+        return False
+    try:
+        for rule_dict in rules.value:
+            validate_single_rule("", rule_dict)
+    except InvalidRuleSchemaError:
+        return False
+    return True
+
+
+def _parse_config_string(
+    config_id: str,
+    contents: str,
+    filename: Optional[str],
+    no_rewrite_rule_ids: bool = False,
+    force_jsonschema: bool = False,
+) -> Tuple[YamlTree, List[FastlintError]]:
     # Should we guard this code and checks whether filename ends with .json?
     errors: List[FastlintError] = []
 
@@ -803,10 +982,21 @@ def parse_config_string(
                 rules_tmp_path=rules_tmp_path,
             )
         )
-        return ({config_id: data}, errors)
+        return data, errors
     except json.decoder.JSONDecodeError:
         pass
 
+    fast_result = _parse_config_fast(
+        contents,
+        filename,
+        force_jsonschema=force_jsonschema,
+        rules_tmp_path=rules_tmp_path,
+    )
+    if fast_result is not None:
+        data, config_errors = fast_result
+        errors.extend(config_errors)
+        return data, errors
+
     try:
         data, config_errors = parse_config_preserve_spans(
             contents,
@@ -824,7 +1014,57 @@ def parse_config_string(
             f"Invalid YAML file {config_id}:\n{indent(str(se))}",
             code=UNPARSEABLE_YAML_EXIT_CODE,
         )
-    return {config_id: data}, errors
+    return data, errors
+
+
+def _load_config_fast(contents: str) -> Optional[YamlTree]:
+    """
+    The config in JSON or YAML, without spans, or None if it can't be parsed
+    that way.
+    """
+    try:
+        return YamlTree.wrap(json.loads(contents), EmptySpan)
+    except json.decoder.JSONDecodeError:
+        pass
+    try:
+        return parse_yaml_fast(contents)
+    except YAMLError:
+        return None
+
+
+def _parse_config_fast(
+    contents: str,
+    filename: Optional[str],
+    force_jsonschema: bool = False,
+    rules_tmp_path: Optional[str] = None,
+) -> Optional[Tuple[YamlTree, List[FastlintError]]]:
+    """
+    Like parse_config_preserve_spans(), without tracking spans.
+
+    Configs are almost always valid, and the spans are only used in error
+    messages, so we first try this several times faster parsing. It returns
+    None if the config can't be parsed, validated or turned into rules; the
+    config must then be parsed again with parse_config_preserve_spans() to
+    report the problem with precise locations.
+    """
+    try:
+        data = parse_yaml_fast(contents)
+    except YAMLError:
+        return None
+    if data is None:
+        return None
+    try:
+        errors = validate_yaml(
+            data,
+            filename,
+            force_jsonschema=force_jsonschema,
+            rules_tmp_path=rules_tmp_path,
+        )
+    except InvalidRuleSchemaError:
+        return None
+    if not _can_build_rules(data):
+        return None
+    return data, errors
 
 
 def is_registry_id(config_str: str) -> bool:
@@ -41,6 +41,8 @@ UNSUPPORTED_EXT_IGNORE_LANGS = {"generic", "regex"}
 class OutputFormat(Enum):
     TEXT = auto()
     JSON = auto()
+    NDJSON = auto()
+    COLUMNAR = auto()
     GITLAB_SAST = auto()
     GITLAB_SECRETS = auto()
     JUNIT_XML = auto()
@@ -49,7 +51,7 @@ class OutputFormat(Enum):
     VIM = auto()
 
     def is_json(self) -> bool:
-        return self in [OutputFormat.JSON, OutputFormat.SARIF]
+        return self in [OutputFormat.JSON, OutputFormat.NDJSON, OutputFormat.SARIF]
 
 
 class RuleScanSource(Enum):
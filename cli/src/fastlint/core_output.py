@@ -9,7 +9,6 @@ parsing and interpreting the fastlint-core profiling information).
 The precise type of the response from fastlint-core is specified in
 fastlint_interfaces/fastlint_output_v1.atd
 """
-import copy
 import dataclasses
 from dataclasses import replace
 from typing import Dict
@@ -24,6 +23,7 @@ from fastlint.error import TARGET_PARSE_FAILURE_EXIT_CODE
 from fastlint.rule import Rule
 from fastlint.rule_match import RuleMatch
 from fastlint.rule_match import RuleMatches
+from fastlint.rule_match import sort_findings
 from fastlint.verbose_logging import getLogger
 
 logger = getLogger(__name__)
@@ -103,10 +103,11 @@ def core_matches_to_rule_matches(
 
         message = match.extra.message if match.extra.message else rule.message
 
+        # The rule's metadata is shared by all its matches. Only the (rare)
+        # matches overriding some of it get their own, shallow, copy.
         metadata = rule.metadata
         if match.extra.metadata:
-            metadata = copy.deepcopy(metadata)
-            metadata.update(match.extra.metadata.value)
+            metadata = {**metadata, **match.extra.metadata.value}
 
         if match.extra.fix is not None:
             fix = match.extra.fix
@@ -115,7 +116,6 @@ def core_matches_to_rule_matches(
 
         return RuleMatch(
             match=match,
-            extra=match.extra.to_json(),
             message=message,
             metadata=metadata,
             severity=match.extra.severity if match.extra.severity else rule.severity,
@@ -134,4 +134,4 @@ def core_matches_to_rule_matches(
     # Sort results so as to guarantee the same results across different
     # runs. Results may arrive in a different order due to parallelism
     # (-j option).
-    return {rule: sorted(matches) for rule, matches in findings.items()}
+    return {rule: sort_findings(matches) for rule, matches in findings.items()}
@@ -45,6 +45,8 @@ from fastlint.error import with_color
 from fastlint.output_extra import OutputExtra
 from fastlint.parsing_data import ParsingData
 from fastlint.rule import Rule
+from fastlint.rule_dedup import add_alias_matches
+from fastlint.rule_dedup import dedup_rules
 from fastlint.rule_match import OrderedRuleMatchList
 from fastlint.rule_match import RuleMatchMap
 from fastlint.fastlint_types import Language
@@ -520,6 +522,7 @@ class CoreRunner:
         respect_rule_paths: bool = True,
         path_sensitive: bool = False,
         symbol_analysis: bool = False,
+        dedup_rules: bool = False,
     ):
         self._binary_path = engine_type.get_binary_path()
         self._jobs = jobs or engine_type.default_jobs
@@ -536,6 +539,7 @@ class CoreRunner:
         self._respect_rule_paths = respect_rule_paths
         self._capture_stderr = capture_stderr
         self._symbol_analysis = symbol_analysis
+        self._dedup_rules = dedup_rules
 
     def _extract_core_output(
         self,
@@ -798,6 +802,15 @@ class CoreRunner:
 
         parsing_data: ParsingData = ParsingData()
 
+        # the rules actually passed to fastlint-core, see fastlint.rule_dedup
+        core_rules: List[Rule] = rules
+        aliases: Dict[str, List[Rule]] = {}
+        if self._dedup_rules:
+            core_rules, aliases = dedup_rules(rules)
+            logger.verbose(
+                f"Running {len(core_rules)} distinct rules out of {len(rules)}"
+            )
+
         # Create an exit stack context manager to properly handle closing
         # either the temp files for an actual run or else the dump files for
         # a future direct run of fastlint-core. This method of file management
@@ -856,9 +869,8 @@ Could not find the fastlint-core executable. Your Fastlint install is likely cor
             ]
 
             # adding rules option
-            rule_file_contents = json.dumps(
-                {"rules": [rule._raw for rule in rules]}, indent=2, sort_keys=True
-            )
+            # shared with the SARIF formatter, unless rules were deduplicated
+            rule_file_contents = state.rules_blob_cache.get(core_rules)
             rule_file.write(rule_file_contents)
             rule_file.flush()
             cmd.extend(["-rules", rule_file.name])
@@ -886,7 +898,7 @@ Could not find the fastlint-core executable. Your Fastlint install is likely cor
                 # for `plan`, the `baseline_handler` is disabled within the `target_manager`
                 # when executing `plan_core_run`.
                 plan = self.plan_core_run(
-                    rules,
+                    core_rules,
                     evolve(target_manager, baseline_handler=None),
                     all_targets=all_targets,
                     sca_subprojects=sca_subprojects,
@@ -894,7 +906,7 @@ Could not find the fastlint-core executable. Your Fastlint install is likely cor
 
             else:
                 plan = self.plan_core_run(
-                    rules,
+                    core_rules,
                     target_manager,
                     all_targets=all_targets,
                     sca_subprojects=sca_subprojects,
@@ -1030,13 +1042,15 @@ Could not find the fastlint-core executable. Your Fastlint install is likely cor
             returncode = runner.execute()
             # Process output
             output_json = self._extract_core_output(
-                rules,
+                core_rules,
                 returncode,
                 " ".join(cmd),
                 runner.stdout,
                 runner.stderr,
             )
-            core_output = out.CoreOutput.from_json(output_json)
+            core_output = add_alias_matches(
+                out.CoreOutput.from_json(output_json), aliases
+            )
             if core_output.paths.skipped:
                 for skip in core_output.paths.skipped:
                     if skip.rule_id:
@@ -1,4 +1,3 @@
-import copy
 import dataclasses
 import json
 import os
@@ -162,8 +161,7 @@ def generate_unreachable_sca_findings(
                     extra={"sca_info": sca_match},
                 )
                 # TODO: remove sca_info from extra once we migrate to the typed sca_info
-                new_extra = copy.deepcopy(match.extra)
-                new_extra["sca_info"] = sca_match
+                new_extra = {**match.extra, "sca_info": sca_match}
                 new_rule_match = evolve(
                     match,
                     match=dataclasses.replace(
@@ -286,17 +284,16 @@ def generate_reachable_sca_findings(
                         found_dependency=found_dep,
                         lockfile=out.Fpath(str(lockfile_path)),
                     )
-                    # ! deepcopy is necessary here since we might iterate over the
-                    # ! same match for multiple dependencies
                     sca_match = out.ScaMatch(
                         sca_finding_schema=SCA_FINDING_SCHEMA,
                         reachable=True,
                         reachability_rule=rule.should_run_on_fastlint_core,
                         dependency_match=dep_match,
                     )
-                    new_extra = copy.deepcopy(match.extra)
+                    # ! a fresh extra is necessary here since we might iterate over
+                    # ! the same match for multiple dependencies
                     # TODO: remove sca_info from extra once we migrate to the typed sca_info
-                    new_extra["sca_info"] = sca_match
+                    new_extra = {**match.extra, "sca_info": sca_match}
                     new_rule_match = evolve(
                         match,
                         match=dataclasses.replace(
@@ -78,6 +78,9 @@ class Env:
     )
     version_check_timeout: int = field()
     version_check_cache_path: Path = field()
+    config_cache_path: Path = field()
+    config_http_cache_path: Path = field()
+    config_http_cache_ttl: int = field()
 
     git_command_timeout: int = field()
 
@@ -107,6 +110,25 @@ class Env:
             return Path(value)
         return Path.home() / ".cache" / "fastlint_version"
 
+    @config_cache_path.default
+    def config_cache_path_default(self) -> Path:
+        value = os.getenv("FASTLINT_CONFIG_CACHE_PATH")
+        if value:
+            return Path(value)
+        return Path.home() / ".cache" / "fastlint_configs"
+
+    @config_http_cache_path.default
+    def config_http_cache_path_default(self) -> Path:
+        value = os.getenv("FASTLINT_CONFIG_HTTP_CACHE_PATH")
+        if value:
+            return Path(value)
+        return Path.home() / ".cache" / "fastlint_config_downloads"
+
+    @config_http_cache_ttl.default
+    def config_http_cache_ttl_default(self) -> int:
+        value = os.getenv("FASTLINT_CONFIG_HTTP_CACHE_TTL", "300")
+        return int(value)
+
     @git_command_timeout.default
     def git_command_timeout_default(self) -> int:
         value = os.getenv("FASTLINT_GIT_COMMAND_TIMEOUT", "300")
@@ -5,6 +5,9 @@
 # with error.py)
 #
 import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
 from typing import Dict
 from typing import List
 from typing import NewType
@@ -25,20 +28,62 @@ class SourceTracker:
     """
     Singleton class tracking mapping from filehashes -> file contents to support
     building error messages from Spans
+
+    The lines of a source are only computed when needed, e.g. when rendering a
+    Span, and only the lines of the MAX_CACHED_SOURCES most recently used
+    sources are kept. Sources added with the path of their file are read again
+    from it when needed, so that big files like lockfiles aren't kept in memory
+    for the whole run.
     """
 
+    MAX_CACHED_SOURCES = 8
+
     # sources are a class variable to share state
-    sources: Dict[SourceFileHash, List[str]] = {}
+    # the sources that can't be read again
+    sources: Dict[SourceFileHash, str] = {}
+    # the files of the sources that can be read again
+    source_paths: Dict[SourceFileHash, Path] = {}
+    # the lines of the most recently used sources, the most recent last
+    _lines: "OrderedDict[SourceFileHash, List[str]]" = OrderedDict()
+    _lock = threading.Lock()
 
     @classmethod
-    def add_source(cls, source: str) -> SourceFileHash:
+    def add_source(cls, source: str, path: Optional[Path] = None) -> SourceFileHash:
+        """
+        :param path: the file `source` was read from, with
+            read_text(errors="replace"), if it can be read again
+        """
         file_hash = cls._src_to_hash(source)
-        cls.sources[file_hash] = source.splitlines()
+        if path is None:
+            cls.sources[file_hash] = source
+        elif file_hash not in cls.sources:
+            cls.source_paths[file_hash] = path
         return file_hash
 
     @classmethod
     def source(cls, source_hash: SourceFileHash) -> List[str]:
-        return cls.sources[source_hash]
+        with cls._lock:
+            lines = cls._lines.get(source_hash)
+            if lines is not None:
+                cls._lines.move_to_end(source_hash)
+                return lines
+
+        if source_hash in cls.sources:
+            lines = cls.sources[source_hash].splitlines()
+        else:
+            path = cls.source_paths[source_hash]
+            try:
+                lines = path.read_text(errors="replace").splitlines()
+            except OSError:
+                # the file was removed since, we can still report the error
+                # without its code
+                return []
+
+        with cls._lock:
+            cls._lines[source_hash] = lines
+            while len(cls._lines) > cls.MAX_CACHED_SOURCES:
+                cls._lines.popitem(last=False)
+        return lines
 
     @staticmethod
     def _src_to_hash(contents: Union[str, bytes]) -> SourceFileHash:
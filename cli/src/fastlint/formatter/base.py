@@ -1,9 +1,13 @@
 import abc
+import threading
 from typing import Any
+from typing import Callable
 from typing import Collection
 from typing import FrozenSet
+from typing import IO
 from typing import Iterable
 from typing import Mapping
+from typing import Optional
 from typing import Sequence
 
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
@@ -11,6 +15,7 @@ from fastlint import __VERSION__
 from fastlint.error import FastlintError
 from fastlint.rule import Rule
 from fastlint.rule_match import RuleMatch
+from fastlint.rule_match import sort_findings
 
 
 # used also in ofastlint_sarif.py
@@ -35,8 +40,9 @@ def rule_match_to_CliMatch(rule_match: RuleMatch) -> out.CliMatch:
         extra.fix = rule_match.fix
     if rule_match.is_ignored is not None:
         extra.is_ignored = rule_match.is_ignored
-    if rule_match.extra.get("extra_extra"):
-        extra.extra_extra = out.RawJson(rule_match.extra.get("extra_extra"))
+    if rule_match.extra.get("extra_extra") or rule_match.match.extra.extra_extra:
+        # the one monkey patched in, if any, wins over the one of fastlint-core
+        extra.extra_extra = out.RawJson(rule_match.get_full_extra()["extra_extra"])
 
     return out.CliMatch(
         check_id=out.RuleId(rule_match.rule_id),
@@ -53,8 +59,9 @@ def to_CliOutput(
     fastlint_structured_errors: Sequence[FastlintError],
     cli_output_extra: out.CliOutputExtra,
 ) -> out.CliOutput:
-    # Sort according to RuleMatch.get_ordering_key
-    sorted_findings = sorted(rule_matches)
+    # Sort according to RuleMatch.get_ordering_key. Findings normally come
+    # already in order from OutputHandler, in which case this is linear.
+    sorted_findings = sort_findings(rule_matches)
     # Note that extra is not used here! Every part of the JSON output should
     # be specified in fastlint_output_v1.atd and be part of CliOutputExtra
     return out.CliOutput(
@@ -69,6 +76,43 @@ def to_CliOutput(
     )
 
 
+class SharedCliOutput:
+    """
+    The out.CliOutput of a scan, built once for all its outputs.
+
+    OutputHandler renders several outputs concurrently, and passes an
+    instance of this class to all of them as extra["shared_cli_output"].
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cli_output: Optional[out.CliOutput] = None
+
+    def get(self, build: Callable[[], out.CliOutput]) -> out.CliOutput:
+        with self._lock:
+            if self._cli_output is None:
+                self._cli_output = build()
+            return self._cli_output
+
+
+def get_CliOutput(
+    extra: Mapping[str, Any],
+    rule_matches: Iterable[RuleMatch],
+    fastlint_structured_errors: Sequence[FastlintError],
+    cli_output_extra: out.CliOutputExtra,
+) -> out.CliOutput:
+    """
+    Same as to_CliOutput(), but reuse the out.CliOutput shared by the
+    outputs of the scan, if any.
+    """
+    shared: Optional[SharedCliOutput] = extra.get("shared_cli_output")
+    if shared is None:
+        return to_CliOutput(rule_matches, fastlint_structured_errors, cli_output_extra)
+    return shared.get(
+        lambda: to_CliOutput(rule_matches, fastlint_structured_errors, cli_output_extra)
+    )
+
+
 class BaseFormatter(abc.ABC):
     def output(
         self,
@@ -91,6 +135,32 @@ class BaseFormatter(abc.ABC):
             ctx,
         )
 
+    def write_output(
+        self,
+        fout: IO[Any],
+        rules: FrozenSet[Rule],
+        rule_matches: Sequence[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        shown_severities: Collection[out.MatchSeverity],
+        ctx: out.FormatContext,
+    ) -> None:
+        """
+        Same as output(), but write the result to `fout`.
+        """
+        filtered_rules = (r for r in rules if r.severity in shown_severities)
+        filtered_matches = (m for m in rule_matches if m.severity in shown_severities)
+        self.write_format(
+            fout,
+            filtered_rules,
+            filtered_matches,
+            fastlint_structured_errors,
+            cli_output_extra,
+            extra,
+            ctx,
+        )
+
     @abc.abstractmethod
     def format(
         self,
@@ -103,6 +173,50 @@ class BaseFormatter(abc.ABC):
     ) -> str:
         raise NotImplementedError
 
+    def write_format(
+        self,
+        fout: IO[Any],
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> None:
+        """
+        Write the output to `fout`.
+
+        By default this writes the string built by format(). Formatters for
+        which is_streaming() is True override it to write their output
+        piece by piece, as they go through the findings.
+        """
+        fout.write(
+            self.format(
+                rules,
+                rule_matches,
+                fastlint_structured_errors,
+                cli_output_extra,
+                extra,
+                ctx,
+            )
+        )
+
+    def is_streaming(self) -> bool:
+        """
+        Return True if write_format() writes the output incrementally.
+
+        The output of streaming formatters ends with a newline, so it can be
+        written to stdout as is.
+        """
+        return False
+
+    def is_binary(self) -> bool:
+        """
+        Return True if the output is binary. write_format() is then given a
+        binary stream, and format() is not supported.
+        """
+        return False
+
     def keep_ignores(self) -> bool:
         """
         Return True if ignored findings should be passed to this formatter; False otherwise.
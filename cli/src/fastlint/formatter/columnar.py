@@ -0,0 +1,84 @@
+import json
+from array import array
+from typing import Any
+from typing import Dict
+from typing import IO
+from typing import Iterable
+from typing import Mapping
+from typing import Sequence
+
+import fastlint.formatter.base as base
+import fastlint.fastlint_interfaces.fastlint_output_v1 as out
+from fastlint.columnar import COLUMNS
+from fastlint.columnar import StringTable
+from fastlint.columnar import write_columns
+from fastlint.error import FastlintError
+from fastlint.rule import Rule
+from fastlint.rule_match import RuleMatch
+from fastlint.rule_match import sort_findings
+
+
+class ColumnarFormatter(base.BaseFormatter):
+    """
+    The findings as column arrays, see fastlint.columnar. Errors and the
+    other parts of the JSON output are not included.
+    """
+
+    def format(
+        self,
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> str:
+        # OutputHandler always calls write_format() for binary formatters
+        raise FastlintError("The columnar output is binary, it can't be a string")
+
+    def write_format(
+        self,
+        fout: IO[Any],
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> None:
+        columns = {name: array(typecode) for name, typecode in COLUMNS}
+        strings = StringTable()
+        # The metadata dict of a rule is shared by its findings, so we
+        # serialize it once per rule.
+        metadata_index: Dict[int, int] = {}
+
+        sorted_findings = sort_findings(rule_matches)
+        for rule_match in sorted_findings:
+            start = rule_match.start
+            end = rule_match.end
+            index = metadata_index.get(id(rule_match.metadata))
+            if index is None:
+                index = strings.add(json.dumps(rule_match.metadata, sort_keys=True))
+                metadata_index[id(rule_match.metadata)] = index
+
+            columns["rule_id"].append(strings.add(rule_match.rule_id))
+            columns["path"].append(strings.add(rule_match.match.path.value))
+            columns["start_line"].append(start.line)
+            columns["start_col"].append(start.col)
+            columns["start_offset"].append(start.offset)
+            columns["end_line"].append(end.line)
+            columns["end_col"].append(end.col)
+            columns["end_offset"].append(end.offset)
+            columns["severity"].append(strings.add(rule_match.severity.to_json()))
+            columns["message"].append(strings.add(rule_match.message))
+            columns["fingerprint"].append(strings.add(rule_match.match_based_id))
+            columns["metadata"].append(index)
+            columns["is_ignored"].append(1 if rule_match.is_ignored else 0)
+
+        write_columns(fout, len(sorted_findings), columns, strings)
+
+    def is_streaming(self) -> bool:
+        return True
+
+    def is_binary(self) -> bool:
+        return True
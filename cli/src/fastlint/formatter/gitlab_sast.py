@@ -21,7 +21,7 @@ class GitlabSastFormatter(base.BaseFormatter):
         extra: Mapping[str, Any],
         ctx: out.FormatContext,
     ) -> str:
-        output = base.to_CliOutput(
-            rule_matches, fastlint_structured_errors, cli_output_extra
+        output = base.get_CliOutput(
+            extra, rule_matches, fastlint_structured_errors, cli_output_extra
         )
         return fastlint.rpc_call.format(out.OutputFormat(out.GitlabSast()), ctx, output)
@@ -1,14 +1,69 @@
+import json
+from io import StringIO
 from typing import Any
+from typing import IO
 from typing import Iterable
 from typing import Mapping
 from typing import Sequence
 
 import fastlint.formatter.base as base
-import fastlint.rpc_call
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
 from fastlint.error import FastlintError
 from fastlint.rule import Rule
 from fastlint.rule_match import RuleMatch
+from fastlint.rule_match import sort_findings
+
+
+# Same as the compact JSON produced by the ATD serializers of fastlint-core
+def dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _write_array(fout: IO[str], values: Iterable[Any]) -> None:
+    fout.write("[")
+    for i, value in enumerate(values):
+        if i:
+            fout.write(",")
+        fout.write(dumps(value))
+    fout.write("]")
+
+
+def write_json(
+    fout: IO[str],
+    rule_matches: Iterable[RuleMatch],
+    fastlint_structured_errors: Sequence[FastlintError],
+    cli_output_extra: out.CliOutputExtra,
+) -> None:
+    """
+    Write the JSON of base.to_CliOutput(...) to `fout`, one finding at a time.
+
+    Only one finding is converted to out.CliMatch and serialized at any time,
+    instead of the whole out.CliOutput and then its whole JSON string.
+    """
+    # Everything but the results and errors, in the order of CliOutput's fields
+    envelope = base.to_CliOutput([], [], cli_output_extra).to_json()
+    fout.write("{")
+    for i, (key, value) in enumerate(envelope.items()):
+        if i:
+            fout.write(",")
+        fout.write(dumps(key))
+        fout.write(":")
+        if key == "results":
+            _write_array(
+                fout,
+                (
+                    base.rule_match_to_CliMatch(rule_match).to_json()
+                    for rule_match in sort_findings(rule_matches)
+                ),
+            )
+        elif key == "errors":
+            _write_array(
+                fout,
+                (error.to_CliError().to_json() for error in fastlint_structured_errors),
+            )
+        else:
+            fout.write(dumps(value))
+    fout.write("}")
 
 
 class JsonFormatter(base.BaseFormatter):
@@ -21,12 +76,27 @@ class JsonFormatter(base.BaseFormatter):
         extra: Mapping[str, Any],
         ctx: out.FormatContext,
     ) -> str:
-        output = base.to_CliOutput(
-            rule_matches, fastlint_structured_errors, cli_output_extra
-        )
-        # alt: we could call json.dumps() directly here, but more consistent with
-        # the other formatters to call instead rpc_call.format (this will also
-        # help to avoid code duplication when we need to some post-processing of
-        # the JSON output in osmegrep).
-        # old: return json.dumps(output.to_json(), sort_keys=True, default=to_json)
-        return fastlint.rpc_call.format(out.OutputFormat(out.Json()), ctx, output)
+        # old: this used to build the whole out.CliOutput, send it to
+        # fastlint-core through rpc_call.format and get back its JSON. With
+        # large scans, that meant holding two or three copies of the output
+        # in memory. The JSON is the serialization of CliOutput as is, so we
+        # now write it ourselves, finding by finding.
+        buf = StringIO()
+        write_json(buf, rule_matches, fastlint_structured_errors, cli_output_extra)
+        return buf.getvalue()
+
+    def write_format(
+        self,
+        fout: IO[str],
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> None:
+        write_json(fout, rule_matches, fastlint_structured_errors, cli_output_extra)
+        fout.write("\n")
+
+    def is_streaming(self) -> bool:
+        return True
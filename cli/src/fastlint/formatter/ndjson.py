@@ -0,0 +1,66 @@
+from io import StringIO
+from typing import Any
+from typing import IO
+from typing import Iterable
+from typing import Mapping
+from typing import Sequence
+
+import fastlint.formatter.base as base
+import fastlint.fastlint_interfaces.fastlint_output_v1 as out
+from fastlint.error import FastlintError
+from fastlint.formatter.json import dumps
+from fastlint.rule import Rule
+from fastlint.rule_match import RuleMatch
+from fastlint.rule_match import sort_findings
+
+
+class NdjsonFormatter(base.BaseFormatter):
+    """
+    Newline-delimited JSON: one out.CliMatch per line for each finding,
+    followed by one out.CliError per line for each error.
+
+    Findings can be told apart from errors by their "check_id" field. Unlike
+    with the JSON format, there is no envelope (version, paths, timing, ...),
+    so that each line can be processed as soon as it is written.
+    """
+
+    def format(
+        self,
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> str:
+        buf = StringIO()
+        self.write_format(
+            buf,
+            rules,
+            rule_matches,
+            fastlint_structured_errors,
+            cli_output_extra,
+            extra,
+            ctx,
+        )
+        return buf.getvalue()
+
+    def write_format(
+        self,
+        fout: IO[str],
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> None:
+        for rule_match in sort_findings(rule_matches):
+            fout.write(dumps(base.rule_match_to_CliMatch(rule_match).to_json()))
+            fout.write("\n")
+        for error in fastlint_structured_errors:
+            fout.write(dumps(error.to_CliError().to_json()))
+            fout.write("\n")
+
+    def is_streaming(self) -> bool:
+        return True
@@ -1,8 +1,10 @@
-import contextlib
 import json
-import tempfile
+from io import StringIO
 from typing import Any
+from typing import IO
 from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Mapping
 from typing import Optional
 from typing import Sequence
@@ -11,16 +13,26 @@ import fastlint.formatter.base as base
 import fastlint.rpc_call
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
 from fastlint.error import FastlintError
+from fastlint.formatter.json import dumps
 from fastlint.rule import Rule
 from fastlint.rule_match import RuleMatch
+from fastlint.rule_match import sort_findings
+from fastlint.state import get_state
+
+# How many findings we send to fastlint-core for conversion at once, when
+# writing SARIF output incrementally
+RESULTS_CHUNK_SIZE = 5000
+
+NO_OUTPUT = "<ERROR: no SARIF output>"
 
 
 class SarifFormatter(base.BaseFormatter):
     def keep_ignores(self) -> bool:
         return True
 
-    # TODO? inline this function in the caller now that it's mostly a wrapper
-    # over an RPC call
+    def is_streaming(self) -> bool:
+        return True
+
     def _ofastlint_format(
         self,
         rules: Iterable[Rule],
@@ -28,30 +40,22 @@ class SarifFormatter(base.BaseFormatter):
         extra: Mapping[str, Any],
         ctx: out.FormatContext,
     ) -> Optional[str]:
-        exit_stack = contextlib.ExitStack()
-        with exit_stack:
-            rule_file = exit_stack.enter_context(
-                tempfile.NamedTemporaryFile("w+", suffix=".json")
-            )
-            rule_file_contents = json.dumps(
-                {"rules": [rule._raw for rule in rules]}, indent=2, sort_keys=True
-            )
-            rule_file.write(rule_file_contents)
-            rule_file.flush()
-            rules_path = out.Fpath(rule_file.name)
-            is_pro = bool(
-                cli_output.engine_requested
-                and cli_output.engine_requested == out.EngineKind(out.PRO_())
-            )
-            show_dataflow_traces = extra.get("dataflow_traces", False)
-            sarif_fmt = out.SarifFormat(
-                rules=rules_path,
-                is_pro=is_pro,
-                show_dataflow_traces=show_dataflow_traces,
-            )
-            formatted_output = fastlint.rpc_call.sarif_format(sarif_fmt, ctx, cli_output)
-            if formatted_output:
-                return formatted_output.value
+        # The rules file is written once per scan, from the same
+        # serialization as the one passed to fastlint-core for the scan.
+        rules_path = out.Fpath(str(get_state().rules_blob_cache.path(rules)))
+        is_pro = bool(
+            cli_output.engine_requested
+            and cli_output.engine_requested == out.EngineKind(out.PRO_())
+        )
+        show_dataflow_traces = extra.get("dataflow_traces", False)
+        sarif_fmt = out.SarifFormat(
+            rules=rules_path,
+            is_pro=is_pro,
+            show_dataflow_traces=show_dataflow_traces,
+        )
+        formatted_output = fastlint.rpc_call.sarif_format(sarif_fmt, ctx, cli_output)
+        if formatted_output:
+            return formatted_output.value
         return None
 
     def format(
@@ -63,13 +67,115 @@ class SarifFormatter(base.BaseFormatter):
         extra: Mapping[str, Any],
         ctx: out.FormatContext,
     ) -> str:
-        output = base.to_CliOutput(
-            rule_matches, fastlint_structured_errors, cli_output_extra
+        buf = StringIO()
+        self.write_format(
+            buf,
+            rules,
+            rule_matches,
+            fastlint_structured_errors,
+            cli_output_extra,
+            extra,
+            ctx,
         )
+        return buf.getvalue().rstrip("\n")
+
+    def write_format(
+        self,
+        fout: IO[str],
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> None:
         # LATER:return fastlint.rpc_call.format(out.OutputFormat(out.Sarif()),...)
         rule_list = list(rules)
-        rpc_result = self._ofastlint_format(rule_list, output, extra, ctx)
-        if rpc_result is not None:
-            return rpc_result
-        else:
-            return "<ERROR: no SARIF output>"
+        sorted_findings = sort_findings(rule_matches)
+
+        if len(sorted_findings) <= RESULTS_CHUNK_SIZE:
+            output = base.get_CliOutput(
+                extra, sorted_findings, fastlint_structured_errors, cli_output_extra
+            )
+            rpc_result = self._ofastlint_format(rule_list, output, extra, ctx)
+            fout.write(rpc_result if rpc_result is not None else NO_OUTPUT)
+            fout.write("\n")
+            return
+
+        # Too many findings to convert them all at once: get everything but
+        # the results from a first call, and then the results chunk by chunk.
+        envelope_str = self._ofastlint_format(
+            rule_list,
+            base.to_CliOutput([], fastlint_structured_errors, cli_output_extra),
+            extra,
+            ctx,
+        )
+        envelope = json.loads(envelope_str) if envelope_str is not None else None
+        if not (isinstance(envelope, dict) and len(envelope.get("runs", [])) == 1):
+            fout.write(NO_OUTPUT)
+            fout.write("\n")
+            return
+
+        def chunks() -> Iterator[List[Any]]:
+            for start in range(0, len(sorted_findings), RESULTS_CHUNK_SIZE):
+                chunk_str = self._ofastlint_format(
+                    rule_list,
+                    base.to_CliOutput(
+                        sorted_findings[start : start + RESULTS_CHUNK_SIZE],
+                        [],
+                        cli_output_extra,
+                    ),
+                    extra,
+                    ctx,
+                )
+                if chunk_str is None:
+                    # Part of the output is already written, and skipping the
+                    # chunk would silently drop its findings.
+                    raise FastlintError(
+                        f"Failed to convert findings {start} to "
+                        f"{start + RESULTS_CHUNK_SIZE - 1} to SARIF"
+                    )
+                yield json.loads(chunk_str)["runs"][0].get("results", [])
+
+        _write_sarif(fout, envelope, chunks())
+        fout.write("\n")
+
+
+def _write_sarif(
+    fout: IO[str], envelope: Mapping[str, Any], results: Iterator[List[Any]]
+) -> None:
+    """
+    Write the SARIF log `envelope`, with the results of its only run being
+    the concatenation of `results`.
+    """
+    run = dict(envelope["runs"][0])
+    run.setdefault("results", [])
+    fout.write("{")
+    for i, (key, value) in enumerate(envelope.items()):
+        if i:
+            fout.write(",")
+        fout.write(dumps(key))
+        fout.write(":")
+        if key != "runs":
+            fout.write(dumps(value))
+            continue
+        fout.write("[{")
+        for j, (run_key, run_value) in enumerate(run.items()):
+            if j:
+                fout.write(",")
+            fout.write(dumps(run_key))
+            fout.write(":")
+            if run_key != "results":
+                fout.write(dumps(run_value))
+                continue
+            fout.write("[")
+            first = True
+            for chunk in results:
+                for result in chunk:
+                    if not first:
+                        fout.write(",")
+                    first = False
+                    fout.write(dumps(result))
+            fout.write("]")
+        fout.write("}]")
+    fout.write("}")
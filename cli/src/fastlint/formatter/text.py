@@ -1,9 +1,12 @@
 import textwrap
 from contextlib import contextmanager
+from io import StringIO
 from itertools import groupby
 from pathlib import Path
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import IO
 from typing import Iterable
 from typing import Iterator
 from typing import List
@@ -26,6 +29,7 @@ from fastlint.error import FastlintCoreError
 from fastlint.error import FastlintError
 from fastlint.rule import Rule
 from fastlint.rule_match import RuleMatch
+from fastlint.rule_match import sort_findings
 from fastlint.fastlint_types import LANGUAGE
 from fastlint.fastlint_types import Language
 from fastlint.state import get_state
@@ -166,11 +170,16 @@ def format_lines(
     per_line_max_chars_limit: Optional[int],
     show_separator: bool,
     is_different_file: bool,
+    total_lines: Optional[int] = None,
 ) -> Iterator[Text]:
+    """
+    `total_lines` is the number of lines of the location, when `lines` only
+    has the first few ones.
+    """
     trimmed = 0
 
     if per_finding_max_lines_limit:
-        trimmed = len(lines) - per_finding_max_lines_limit
+        trimmed = (total_lines or len(lines)) - per_finding_max_lines_limit
         lines = lines[:per_finding_max_lines_limit]
 
     per_line_max_chars_limit = min(
@@ -262,6 +271,34 @@ def finding_to_line(
         )
 
 
+def get_location_lines(
+    location: out.Location,
+    content: str,
+    per_finding_max_lines_limit: Optional[int],
+) -> Tuple[List[str], int]:
+    """
+    Return the lines of `location` that we may display, at most
+    `per_finding_max_lines_limit` of them, and its total number of lines.
+
+    Taint traces can point at huge locations (whole function bodies), so we
+    don't fetch lines that format_lines() would throw away anyway.
+    """
+    start_line = location.start.line
+    end_line = location.end.line
+    total_lines = end_line - start_line + 1
+    if per_finding_max_lines_limit:
+        end_line = min(end_line, start_line + per_finding_max_lines_limit - 1)
+    try:
+        lines = get_lines_from_file(Path(location.path.value), start_line, end_line)
+    except FileNotFoundError:
+        # Use ‘content’ instead when the file at the specified location doesn’t exist.
+        # This can happen if the taint trace shows a match in a temporary fake lifecycle
+        # file used for web framework analysis. The issue is specific to pyfastlint, as
+        # for ofastlint, the temporary file isn’t deleted until ofastlint finishes.
+        return [content], 1
+    return lines, max(total_lines, len(lines))
+
+
 def match_to_lines(
     ref_path: Path,
     location: out.Location,
@@ -275,14 +312,9 @@ def match_to_lines(
     # bunch of lines that belong to a different file, so instruct 'format_lines'
     # to print the name of that file too.
     is_different_file = path != ref_path
-    try:
-        lines = get_lines_from_file(path, location.start.line, location.end.line)
-    except FileNotFoundError:
-        # Use ‘content’ instead when the file at the specified location doesn’t exist.
-        # This can happen if the taint trace shows a match in a temporary fake lifecycle
-        # file used for web framework analysis. The issue is specific to pyfastlint, as
-        # for ofastlint, the temporary file isn’t deleted until ofastlint finishes.
-        lines = [content]
+    lines, total_lines = get_location_lines(
+        location, content, per_finding_max_lines_limit
+    )
     yield from format_lines(
         path,
         location.start.line,
@@ -296,6 +328,7 @@ def match_to_lines(
         per_line_max_chars_limit,
         False,
         is_different_file,
+        total_lines,
     )
 
 
@@ -339,12 +372,9 @@ def call_trace_to_lines(
             for var in intermediate_vars:
                 loc = var.location
                 path = Path(loc.path.value)
-                try:
-                    lines = get_lines_from_file(
-                        Path(loc.path.value), loc.start.line, loc.end.line
-                    )
-                except FileNotFoundError:
-                    lines = [var.content]
+                lines, total_lines = get_location_lines(
+                    loc, var.content, per_finding_max_lines_limit
+                )
                 is_different_file = path != prev_path
                 yield from format_lines(
                     Path(loc.path.value),
@@ -359,6 +389,7 @@ def call_trace_to_lines(
                     per_line_max_chars_limit,
                     False,
                     is_different_file,
+                    total_lines,
                 )
                 prev_path = path
 
@@ -410,10 +441,9 @@ def dataflow_trace_to_lines(
             for var in intermediate_vars:
                 loc = var.location
                 path = Path(loc.path.value)
-                try:
-                    lines = get_lines_from_file(path, loc.start.line, loc.end.line)
-                except FileNotFoundError:
-                    lines = [var.content]
+                lines, total_lines = get_location_lines(
+                    loc, var.content, per_finding_max_lines_limit
+                )
                 is_different_file = path != prev_path
                 yield from format_lines(
                     path,
@@ -428,6 +458,7 @@ def dataflow_trace_to_lines(
                     per_line_max_chars_limit,
                     False,
                     is_different_file,
+                    total_lines,
                 )
                 prev_path = path
 
@@ -625,12 +656,17 @@ def print_text_output(
     per_finding_max_lines_limit: Optional[int],
     per_line_max_chars_limit: Optional[int],
     dataflow_traces: bool,
+    flush: Optional[Callable[[], None]] = None,
 ) -> None:
+    """
+    Print the findings on the console. If `flush` is given, it is called
+    once the findings of a file have been printed.
+    """
     last_file = None
     last_rule_id = None
     last_message = None
     # Sort the findings according to RuleMatch.get_ordering_key()
-    sorted_rule_matches = sorted(rule_matches)
+    sorted_rule_matches = sort_findings(rule_matches)
     for rule_index, rule_match in enumerate(sorted_rule_matches):
         current_file = (
             f"{rule_match.path}@{rule_match.git_commit.value}"
@@ -644,6 +680,8 @@ def print_text_output(
             lockfile = rule_match.extra["sca_info"].dependency_match.lockfile.value
         if last_file is None or last_file != current_file:
             if last_file is not None:
+                if flush:
+                    flush()
                 console.print()
             console.print(
                 f"\n{with_color(Colors.cyan, f'  {current_file}', bold=False)}"
@@ -818,6 +856,9 @@ def force_quiet_off(console: Console) -> Iterator[None]:
 
 
 class TextFormatter(base.BaseFormatter):
+    def is_streaming(self) -> bool:
+        return True
+
     def format(
         self,
         rules: Iterable[Rule],
@@ -827,134 +868,215 @@ class TextFormatter(base.BaseFormatter):
         extra: Mapping[str, Any],
         ctx: out.FormatContext,
     ) -> str:
-        # all output in this function is captured and returned as a string
-        with force_quiet_off(console), console.capture() as captured_output:
-            grouped_matches: Dict[Tuple[out.Product, str], List[RuleMatch]] = {
-                # ordered most important to least important
-                (out.Product(out.SAST()), "blocking"): [],
-                (out.Product(out.SCA()), "reachable"): [],
-                (out.Product(out.Secrets()), "valid"): [],
-                (out.Product(out.SCA()), "undetermined"): [],
-                (out.Product(out.Secrets()), "validation error"): [],
-                (out.Product(out.Secrets()), "unvalidated"): [],
-                (out.Product(out.SCA()), "unreachable"): [],
-                (out.Product(out.SAST()), "nonblocking"): [],
-                (out.Product(out.Secrets()), "invalid"): [],
-                (out.Product(out.Secrets()), "generic-secrets"): [],
-            }
-
-            secrets_blocking_rules = set()
-
-            for match in rule_matches:
-                if isinstance(match.product.value, out.SAST):
-                    subgroup = "blocking" if match.is_blocking else "nonblocking"
-                elif isinstance(match.product.value, out.Secrets):
-                    if match.is_blocking:
-                        secrets_blocking_rules.add(match.match.check_id.value)
-                    if match.metadata.get("generic_secrets", False):
-                        subgroup = "generic-secrets"
+        buf = StringIO()
+        self._write_text(
+            buf, rule_matches, fastlint_structured_errors, cli_output_extra, extra, ctx
+        )
+        return buf.getvalue()
+
+    def write_format(
+        self,
+        fout: IO[str],
+        rules: Iterable[Rule],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> None:
+        if self._write_text(
+            fout, rule_matches, fastlint_structured_errors, cli_output_extra, extra, ctx
+        ):
+            # what print() used to add after the output returned by format()
+            fout.write("\n")
+
+    def _write_text(
+        self,
+        fout: IO[str],
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+    ) -> bool:
+        """
+        Write the text output to `fout` one file's worth of findings at a
+        time, so that huge outputs are neither held in memory nor delayed
+        until the end. Return whether anything was written.
+        """
+        written = False
+
+        # all output printed on the console is captured, and written to fout
+        # on each flush
+        def flush() -> None:
+            nonlocal written
+            text = console.end_capture()
+            console.begin_capture()
+            if text:
+                fout.write(text)
+                fout.flush()
+                written = True
+
+        with force_quiet_off(console):
+            console.begin_capture()
+            try:
+                self._print_text(
+                    rule_matches,
+                    fastlint_structured_errors,
+                    cli_output_extra,
+                    extra,
+                    ctx,
+                    flush,
+                )
+            finally:
+                flush()
+                console.end_capture()
+        return written
+
+    def _print_text(
+        self,
+        rule_matches: Iterable[RuleMatch],
+        fastlint_structured_errors: Sequence[FastlintError],
+        cli_output_extra: out.CliOutputExtra,
+        extra: Mapping[str, Any],
+        ctx: out.FormatContext,
+        flush: Callable[[], None],
+    ) -> None:
+        # How many more findings we may display, if limited
+        budget: Optional[int] = extra.get("max_findings_displayed")
+
+        grouped_matches: Dict[Tuple[out.Product, str], List[RuleMatch]] = {
+            # ordered most important to least important
+            (out.Product(out.SAST()), "blocking"): [],
+            (out.Product(out.SCA()), "reachable"): [],
+            (out.Product(out.Secrets()), "valid"): [],
+            (out.Product(out.SCA()), "undetermined"): [],
+            (out.Product(out.Secrets()), "validation error"): [],
+            (out.Product(out.Secrets()), "unvalidated"): [],
+            (out.Product(out.SCA()), "unreachable"): [],
+            (out.Product(out.SAST()), "nonblocking"): [],
+            (out.Product(out.Secrets()), "invalid"): [],
+            (out.Product(out.Secrets()), "generic-secrets"): [],
+        }
+
+        secrets_blocking_rules = set()
+
+        for match in rule_matches:
+            if isinstance(match.product.value, out.SAST):
+                subgroup = "blocking" if match.is_blocking else "nonblocking"
+            elif isinstance(match.product.value, out.Secrets):
+                if match.is_blocking:
+                    secrets_blocking_rules.add(match.match.check_id.value)
+                if match.metadata.get("generic_secrets", False):
+                    subgroup = "generic-secrets"
+                else:
+                    state = match.validation_state
+                    if state is None:
+                        subgroup = "unvalidated"
                     else:
-                        state = match.validation_state
-                        if state is None:
-                            subgroup = "unvalidated"
+                        if isinstance(state.value, out.ConfirmedValid):
+                            subgroup = "valid"
+                        elif isinstance(state.value, out.ConfirmedInvalid):
+                            subgroup = "invalid"
+                        elif isinstance(state.value, out.ValidationError):
+                            subgroup = "validation error"
                         else:
-                            if isinstance(state.value, out.ConfirmedValid):
-                                subgroup = "valid"
-                            elif isinstance(state.value, out.ConfirmedInvalid):
-                                subgroup = "invalid"
-                            elif isinstance(state.value, out.ValidationError):
-                                subgroup = "validation error"
-                            else:
-                                subgroup = "unvalidated"
-                else:
-                    subgroup = match.exposure_type or "undetermined"
-
-                grouped_matches[match.product, subgroup].append(match)
-
-            code_blocking_rules = {
-                match.match.check_id.value
-                for match in grouped_matches[out.Product(out.SAST()), "blocking"]
-            }
-
-            # When ephemeral rules are run with the -e or --pattern flag in the command-line, the rule_id is set to -.
-            # The rule is ran in the command-line and has no associated rule_id
-            code_blocking_rules.discard("-")
-
-            if not ctx.is_ci_invocation:
-                grouped_matches[(out.Product(out.SAST()), "merged")] = [
-                    *grouped_matches.pop((out.Product(out.SAST()), "nonblocking")),
-                    *grouped_matches.pop((out.Product(out.SAST()), "blocking")),
-                ]
-
-            for group, matches in grouped_matches.items():
-                if not matches:
-                    continue
-
-                # Generic Secrets findings are somewhat special, and don't print out their
-                # matches in the output.
-                # Instead, they are sent to the App for LLM validation. We expect this to
-                # be noisy, so we won't print out all of the findings here.
-                if group[1] == "generic-secrets" and ctx.is_ci_invocation:
-                    url = get_state().env.fastlint_url
-                    console.print(
-                        textwrap.dedent(
-                            f"""
-                        Your deployment has generic secrets enabled. {len(matches)} potential line locations
-                        will be uploaded to the Fastlint platform and then analyzed by Fastlint Assistant.
-                        Any findings that appear actionable will be available in the Fastlint Platform.
-                        You can view the secrets analyzed by Assistant at {url}/orgs/-/secrets?status=open&type=AI-detected+secret+%28beta%29
-                        """
-                        )
-                    )
-                else:
-                    console.print(Title(unit_str(len(matches), GROUP_TITLES[group])))
-
-                    print_text_output(
-                        matches,
-                        extra.get("color_output", False),
-                        extra["per_finding_max_lines_limit"],
-                        extra["per_line_max_chars_limit"],
-                        extra["dataflow_traces"],
-                    )
+                            subgroup = "unvalidated"
+            else:
+                subgroup = match.exposure_type or "undetermined"
 
-            if code_blocking_rules and ctx.is_ci_invocation:
-                console.print(Title("Blocking Code Rules Fired:", order=2))
-                for rule_id in sorted(code_blocking_rules):
-                    console.print(f"  {rule_id}")
-                console.reset_title(order=1)
-
-            if secrets_blocking_rules and ctx.is_ci_invocation:
-                console.print(Title("Blocking Secrets Rules Fired:", order=2))
-                for rule_id in sorted(secrets_blocking_rules):
-                    console.print(f"  {rule_id}")
-                console.reset_title(order=1)
-
-            if cli_output_extra.time:
-                print_time_summary(cli_output_extra.time, fastlint_structured_errors)
-
-            rules_by_engine = (
-                cli_output_extra.rules_by_engine
-                if cli_output_extra.rules_by_engine
-                else []
-            )
+            grouped_matches[match.product, subgroup].append(match)
+
+        code_blocking_rules = {
+            match.match.check_id.value
+            for match in grouped_matches[out.Product(out.SAST()), "blocking"]
+        }
+
+        # When ephemeral rules are run with the -e or --pattern flag in the command-line, the rule_id is set to -.
+        # The rule is ran in the command-line and has no associated rule_id
+        code_blocking_rules.discard("-")
 
-            rules_ran_within_a_file = [
-                with_color(Colors.foreground, rule.value[0].value, bold=True)
-                for rule in rules_by_engine
-                if isinstance(rule.value[1].value, out.OSS)
+        if not ctx.is_ci_invocation:
+            grouped_matches[(out.Product(out.SAST()), "merged")] = [
+                *grouped_matches.pop((out.Product(out.SAST()), "nonblocking")),
+                *grouped_matches.pop((out.Product(out.SAST()), "blocking")),
             ]
 
-            if (extra["engine_requested"].is_interfile) and rules_ran_within_a_file:
+        for group, matches in grouped_matches.items():
+            if not matches:
+                continue
+
+            # Generic Secrets findings are somewhat special, and don't print out their
+            # matches in the output.
+            # Instead, they are sent to the App for LLM validation. We expect this to
+            # be noisy, so we won't print out all of the findings here.
+            if group[1] == "generic-secrets" and ctx.is_ci_invocation:
+                url = get_state().env.fastlint_url
                 console.print(
-                    f"{unit_str(len(rules_ran_within_a_file), 'rule')} ran in a within-a-file fashion"
-                    + " because `interfile: true` was not specified."
+                    textwrap.dedent(
+                        f"""
+                    Your deployment has generic secrets enabled. {len(matches)} potential line locations
+                    will be uploaded to the Fastlint platform and then analyzed by Fastlint Assistant.
+                    Any findings that appear actionable will be available in the Fastlint Platform.
+                    You can view the secrets analyzed by Assistant at {url}/orgs/-/secrets?status=open&type=AI-detected+secret+%28beta%29
+                    """
+                    )
                 )
-                if extra.get("verbose_errors"):
+            else:
+                console.print(Title(unit_str(len(matches), GROUP_TITLES[group])))
+
+                shown = sort_findings(matches)
+                if budget is not None:
+                    shown = shown[: max(budget, 0)]
+                    budget -= len(shown)
+                print_text_output(
+                    shown,
+                    extra.get("color_output", False),
+                    extra["per_finding_max_lines_limit"],
+                    extra["per_line_max_chars_limit"],
+                    extra["dataflow_traces"],
+                    flush,
+                )
+                if len(shown) < len(matches):
                     console.print(
-                        "These rules were:\n   "
-                        + "   \n   ".join(rules_ran_within_a_file)
+                        f"\n  [hid {len(matches) - len(shown)} additional findings,"
+                        " adjust with --max-findings-displayed]"
                     )
-                else:
-                    console.print("(Use --verbose to see which ones.)")
+                flush()
 
-        return captured_output.get()
+        if code_blocking_rules and ctx.is_ci_invocation:
+            console.print(Title("Blocking Code Rules Fired:", order=2))
+            for rule_id in sorted(code_blocking_rules):
+                console.print(f"  {rule_id}")
+            console.reset_title(order=1)
+
+        if secrets_blocking_rules and ctx.is_ci_invocation:
+            console.print(Title("Blocking Secrets Rules Fired:", order=2))
+            for rule_id in sorted(secrets_blocking_rules):
+                console.print(f"  {rule_id}")
+            console.reset_title(order=1)
+
+        if cli_output_extra.time:
+            print_time_summary(cli_output_extra.time, fastlint_structured_errors)
+
+        rules_by_engine = (
+            cli_output_extra.rules_by_engine if cli_output_extra.rules_by_engine else []
+        )
+
+        rules_ran_within_a_file = [
+            with_color(Colors.foreground, rule.value[0].value, bold=True)
+            for rule in rules_by_engine
+            if isinstance(rule.value[1].value, out.OSS)
+        ]
+
+        if (extra["engine_requested"].is_interfile) and rules_ran_within_a_file:
+            console.print(
+                f"{unit_str(len(rules_ran_within_a_file), 'rule')} ran in a within-a-file fashion"
+                + " because `interfile: true` was not specified."
+            )
+            if extra.get("verbose_errors"):
+                console.print(
+                    "These rules were:\n   " + "   \n   ".join(rules_ran_within_a_file)
+                )
+            else:
+                console.print("(Use --verbose to see which ones.)")
@@ -0,0 +1,104 @@
+##############################################################################
+# Prelude
+##############################################################################
+# Read git blobs through one long-lived `git cat-file --batch` process.
+#
+# Historical scans report findings in blobs rather than in files of the
+# working tree, and each of those findings needs the lines of its blob
+# several times (RuleMatch.lines, previous_line, the line hashes, ...).
+# Forking `git cat-file blob <sha>` for every lookup added up to tens of
+# thousands of git processes on big histories. Instead, we keep a single
+# batch process around and write it one object name per request.
+#
+# See https://git-scm.com/docs/git-cat-file#_batch_output for the protocol.
+import atexit
+import os
+import subprocess
+from typing import IO
+from typing import Optional
+
+from fastlint.error import FastlintError
+from fastlint.verbose_logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class GitBlobReader:
+    """
+    Return the content of git blobs, given their sha.
+
+    The underlying `git cat-file --batch` process is started on the first
+    request and stopped by close(), or at the latest when the program exits.
+    """
+
+    def __init__(self, cwd: Optional[str] = None) -> None:
+        self._cwd = cwd
+        self._proc: Optional["subprocess.Popen[bytes]"] = None
+
+    def _start(self) -> "subprocess.Popen[bytes]":
+        if self._proc is None or self._proc.poll() is not None:
+            logger.debug("starting git cat-file --batch")
+            # nofastlint: python.lang.security.audit.dangerous-subprocess-use.dangerous-subprocess-use
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=self._cwd if self._cwd is not None else os.getcwd(),
+            )
+            atexit.register(self.close)
+        return self._proc
+
+    def read(self, blob_sha: str) -> bytes:
+        """
+        Return the raw content of the blob `blob_sha`.
+
+        Raises FastlintError if the blob does not exist.
+        """
+        proc = self._start()
+        stdin: Optional[IO[bytes]] = proc.stdin
+        stdout: Optional[IO[bytes]] = proc.stdout
+        if stdin is None or stdout is None:
+            # Can't happen since we set both to PIPE, but please mypy
+            raise FastlintError("git cat-file is missing stdin or stdout")
+        try:
+            stdin.write(blob_sha.encode("ascii") + b"\n")
+            stdin.flush()
+            # <sha> SP <type> SP <size> LF, or <object> SP missing LF
+            header = stdout.readline().split()
+        except (BrokenPipeError, OSError) as e:
+            self.close()
+            raise FastlintError(f"Failed to read git blob {blob_sha}: {e}")
+        if len(header) != 3:
+            if not header:
+                # the process died, let the next request restart it
+                self.close()
+            raise FastlintError(f"git blob {blob_sha} not found")
+        size = int(header[2])
+        contents = stdout.read(size)
+        # the content is followed by a LF
+        stdout.read(1)
+        if header[1] != b"blob":
+            raise FastlintError(
+                f"git object {blob_sha} is a {header[1].decode()}, not a blob"
+            )
+        return contents
+
+    def close(self) -> None:
+        proc = self._proc
+        self._proc = None
+        if proc is None:
+            return
+        atexit.unregister(self.close)
+        if proc.stdin is not None:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            logger.debug("git cat-file did not exit cleanly. Killing it.")
+            proc.kill()
+        if proc.stdout is not None:
+            proc.stdout.close()
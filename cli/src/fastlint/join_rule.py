@@ -1,14 +1,13 @@
-import json
-import tempfile
+import dataclasses
 from collections import defaultdict
 from enum import Enum
 from functools import reduce
 from itertools import chain
-from pathlib import Path
 from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
 from typing import Set
 from typing import Tuple
@@ -19,24 +18,20 @@ from attrs import define
 from boltons.iterutils import partition
 from peewee import CTE
 from peewee import ModelSelect
-from ruamel.yaml import YAML
 
-import fastlint.run_scan
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
 from fastlint.config_resolver import Config
 from fastlint.config_resolver import resolve_config
-from fastlint.error import ERROR_MAP
 from fastlint.error import FATAL_EXIT_CODE
 from fastlint.error import FastlintError
 from fastlint.git import get_project_url
 from fastlint.rule import Rule
 from fastlint.rule_match import RuleMatch
+from fastlint.rule_match import RuleMatches
 from fastlint.verbose_logging import getLogger
 
 logger = getLogger(__file__)
 
-yaml = YAML()
-
 
 # TODO: probably, add error handling
 # TODO: decide how to represent these kinds of rules in the output.
@@ -112,7 +107,8 @@ class BaseModel(pw.Model):  # type: ignore
 def model_factory(model_name: str, columns: List[str]) -> Type[BaseModel]:
     """
     Dynamically create a database model with the specified column names.
-    By default, all columns will be TextFields.
+    By default, all columns will be TextFields. The 'finding' column is the
+    index of the finding of a row in the list given to load_results_into_db().
     Returns a model _class_, not a model _object_.
     """
     logger.debug(f"Creating model '{model_name}' with columns {columns}")
@@ -120,8 +116,12 @@ def model_factory(model_name: str, columns: List[str]) -> Type[BaseModel]:
         model_name,
         (BaseModel,),
         dict(
-            [("raw", pw.BlobField())]
-            + [(column, pw.TextField(null=True)) for column in columns]
+            [("finding", pw.IntegerField())]
+            + [
+                (column, pw.TextField(null=True))
+                for column in columns
+                if column != "finding"
+            ]
         ),
     )
 
@@ -211,7 +211,7 @@ def match_on_conditions(  # type: ignore
     # Without this, the return value is non-deterministic.
     last_condition_model: Type[BaseModel] = condition_terms[-1][2]
     query = (
-        joined.select(last_condition_model.raw)
+        joined.select(last_condition_model.finding)
         .distinct()
         .where(
             *list(map(lambda terms: evaluate_condition(*terms), condition_terms))  # type: ignore
@@ -238,30 +238,36 @@ def create_config_map(fastlint_config_strings: List[str]) -> Dict[str, Rule]:
     return config
 
 
-def rename_metavars_in_place(
-    fastlint_results: List[Dict[str, Any]],
+def rename_metavars(
+    fastlint_results: List[out.CoreMatch],
     refs_lookup: Dict[str, Ref],
-) -> None:
+) -> List[out.CoreMatch]:
     """
-    Rename metavariables in-place for all results in 'fastlint_results'.
+    The results in 'fastlint_results', with their metavariables renamed.
 
     Why?
     Since 'join' rules only work on resolved configs at the moment,
     'renames' make it easier to work with metavariables.
     """
+    renamed = []
     for result in fastlint_results:
-        metavars = result.get("extra", {}).get("metavars", {})
-        renamed_metavars = {
-            refs_lookup[result.get("check_id", "")].renames.get(
-                metavar, metavar
-            ): contents
-            for metavar, contents in metavars.items()
-        }
-        result["extra"]["metavars"] = renamed_metavars
+        renames = refs_lookup[result.check_id.value].renames
+        metavars = out.Metavars(
+            {
+                renames.get(metavar, metavar): contents
+                for metavar, contents in result.extra.metavars.value.items()
+            }
+        )
+        renamed.append(
+            dataclasses.replace(
+                result, extra=dataclasses.replace(result.extra, metavars=metavars)
+            )
+        )
+    return renamed
 
 
 def create_model_map(
-    fastlint_results: List[Dict[str, Any]],
+    fastlint_results: List[out.CoreMatch],
 ) -> Dict[str, Type[BaseModel]]:
     """
     Dynamically create 'peewee' model classes directly from Fastlint results.
@@ -270,14 +276,14 @@ def create_model_map(
 
     The return value is a mapping from rule ID to its model class.
     """
-    collections: Dict[str, List[Dict]] = group(
-        fastlint_results, key=lambda item: item.get("check_id")
+    collections: Dict[str, List[out.CoreMatch]] = group(
+        fastlint_results, key=lambda item: item.check_id.value
     )
     model_map: Dict[str, Type[BaseModel]] = {}
     for name, findings in collections.items():
-        metavars = set()
+        metavars: Set[str] = set()
         for finding in findings:
-            metavars.update(finding.get("extra", {}).get("metavars", {}).keys())
+            metavars.update(finding.extra.metavars.value.keys())
         model_fields = ["path"] + list(metavars)
         model_class = model_factory(camel_case(name), model_fields)
         model_map[name] = model_class
@@ -285,26 +291,22 @@ def create_model_map(
 
 
 def load_results_into_db(
-    fastlint_results: List[Dict[str, Any]], model_map: Dict[str, Type[BaseModel]]
+    fastlint_results: List[out.CoreMatch], model_map: Dict[str, Type[BaseModel]]
 ) -> None:
     """
     Populate the models in the database directly from Fastlint results.
 
     Returns nothing; this will load all data directly into the in-memory database.
     """
-    collections = group(fastlint_results, key=lambda item: item.get("check_id"))
-    for name, findings in collections.items():
-        for finding in findings:
-            model_map[name].create(
-                path=finding.get("path"),
-                raw=json.dumps(finding),
-                **{
-                    metavar: content.get("abstract_content").strip().strip("\"'")
-                    for metavar, content in finding.get("extra", {})
-                    .get("metavars", {})
-                    .items()
-                },
-            )
+    for i, finding in enumerate(fastlint_results):
+        model_map[finding.check_id.value].create(
+            path=finding.path.value,
+            finding=i,
+            **{
+                metavar: content.abstract_content.strip().strip("\"'")
+                for metavar, content in finding.extra.metavars.value.items()
+            },
+        )
 
 
 def handle_recursive_conditions(
@@ -323,7 +325,7 @@ def handle_recursive_conditions(
         cte = generate_recursive_cte(model, condition.property_a, condition.property_b)
         query = (
             model.select(
-                model.raw,
+                model.finding,
                 getattr(cte.c, condition.property_a),
                 getattr(cte.c, condition.property_b),
             )
@@ -361,59 +363,51 @@ def generate_recursive_cte(model: Type[BaseModel], column1: str, column2: str) -
     return cte
 
 
-# For join mode, we get the final output of Fastlint and then need to construct
-# RuleMatches from that. Ideally something would be refactored so that we don't
-# need to move backwards in the pipeline like this.
-def json_to_rule_match(join_rule: Dict[str, Any], match: Dict[str, Any]) -> RuleMatch:
-    cli_match_extra = out.CliMatchExtra.from_json(match.get("extra", {}))
+def to_join_rule_match(
+    join_rule: Dict[str, Any], finding: RuleMatch, match: out.CoreMatch
+) -> RuleMatch:
+    """
+    The finding of 'join_rule' for 'finding', a finding of one of its rules
+    satisfying its conditions. 'match' is 'finding.match' with the
+    metavariables renamed.
+    """
     extra = out.CoreMatchExtra(
-        message=cli_match_extra.message,
-        # cli_match_extra.metavars is optional, but core_match_extra.metavars is
-        # not. This is unsafe, but before it was just implicitly unsafe.
-        metavars=cli_match_extra.metavars,  # type: ignore[arg-type]
-        dataflow_trace=cli_match_extra.dataflow_trace,
-        engine_kind=cli_match_extra.engine_kind
-        if cli_match_extra.engine_kind
-        else out.EngineOfFinding(out.OSS()),
-        is_ignored=False,
+        message=match.extra.message,
+        metavars=match.extra.metavars,
+        dataflow_trace=match.extra.dataflow_trace,
+        engine_kind=match.extra.engine_kind,
+        is_ignored=finding.is_ignored,
     )
     return RuleMatch(
-        message=join_rule.get(
-            "message", match.get("extra", {}).get("message", "[empty]")
-        ),
-        metadata=join_rule.get("metadata", match.get("extra", {}).get("metadata", {})),
-        severity=out.MatchSeverity.from_json(
-            join_rule.get("severity", match.get("severity", "INFO"))
+        message=join_rule.get("message", finding.message),
+        metadata=join_rule.get("metadata", finding.metadata),
+        severity=(
+            out.MatchSeverity.from_json(join_rule["severity"])
+            if "severity" in join_rule
+            else finding.severity
         ),
-        match=out.CoreMatch(
-            check_id=out.RuleId(join_rule.get("id", match.get("check_id", "[empty]"))),
-            path=out.Fpath(match.get("path", "[empty]")),
-            start=out.Position.from_json(match["start"]),
-            end=out.Position.from_json(match["end"]),
+        match=dataclasses.replace(
+            match,
+            check_id=out.RuleId(join_rule.get("id", finding.rule_id)),
             extra=extra,
         ),
-        # still needed?
-        extra=match.get("extra", {}),
         fix=None,
     )
 
 
-def run_join_rule(
-    join_rule: Dict[str, Any],
-    scanning_roots: List[Path],
-    allow_local_builds: bool = False,
-    ptt_enabled: bool = False,
-) -> Tuple[List[RuleMatch], List[FastlintError]]:
+@define
+class PreparedJoinRule:
     """
-    Run a 'join' mode rule.
+    A 'join' mode rule, with the rules it is made of, so that they can be run
+    by fastlint-core along with the other rules of the scan.
 
     Join rules are comprised of multiple Fastlint rules and a set
     of conditions which must be satisfied in order to return a result.
     These conditions are typically some comparison of metavariable contents
     from different rules.
 
-    'join_rule' is a join rule definition in dictionary form. The required keys are
-    {'id', 'mode', 'severity', 'message', 'join'}.
+    The rule definition has the required keys {'id', 'mode', 'severity',
+    'message', 'join'}.
 
     'join' is dictionary with the required keys {'refs', 'on'}.
 
@@ -434,144 +428,148 @@ def run_join_rule(
     See cli/tests/default/e2e/rules/join_rules/user-input-with-unescaped-extension.yaml
     for an example.
     """
-    join_contents = join_rule.get("join", {})
-
-    refs = join_contents.get("refs", [])
-    fastlint_config_strings = [ref.get("rule") for ref in refs]
-    config_map = create_config_map(fastlint_config_strings)
-
-    join_rule_refs: List[Ref] = [
-        Ref(
-            id=config_map[ref.get("rule")].id,
-            renames={
-                rename.get("from"): rename.get("to")
-                for rename in ref.get("renames", [])
-            },
-            alias=ref.get("as"),
-        )
-        for ref in join_contents.get("refs", [])
-    ]
-    refs_lookup = {ref.id: ref for ref in join_rule_refs}
-    alias_lookup = {ref.alias: ref.id for ref in join_rule_refs}
-
-    inline_rules = join_contents.get("rules", [])
-    for rule in inline_rules:
-        # Add severity and message fields so that it can be a full rule
-        rule.update({"severity": "INFO", "message": "join rule"})
-    inline_rules = [Rule.from_json(rule) for rule in inline_rules]
-
-    # Hack: Use the rule ID for inline rules as keys for refs_lookup and alias_lookup.
-    # This behavior should probably split out into a separate code
-    # path that only deals with refs in the future.
-    refs_lookup.update(
-        {rule.id: Ref(id=rule.id, renames={}, alias=rule.id) for rule in inline_rules}
-    )
-    alias_lookup.update({rule.id: rule.id for rule in inline_rules})
 
-    try:
-        conditions = [
-            Condition.parse(condition_string)
-            for condition_string in join_contents.get("on", [])
+    rule: Rule
+    # The rules of the join, renamed to <join rule id>.<rule id> so that
+    # they can't clash with the other rules of the scan, by new id.
+    core_rules: Dict[str, Rule]
+    # the id of each rule of core_rules in the join rule
+    original_ids: Dict[str, str]
+    refs_lookup: Dict[str, Ref]
+    alias_lookup: Dict[str, str]
+    conditions: List[Condition]
+
+    @classmethod
+    def prepare(
+        cls, join_rule: Rule
+    ) -> Tuple[Optional["PreparedJoinRule"], List[FastlintError]]:
+        join_contents = join_rule.raw.get("join", {})
+
+        refs = join_contents.get("refs", [])
+        fastlint_config_strings = [ref.get("rule") for ref in refs]
+        config_map = create_config_map(fastlint_config_strings)
+
+        join_rule_refs: List[Ref] = [
+            Ref(
+                id=config_map[ref.get("rule")].id,
+                renames={
+                    rename.get("from"): rename.get("to")
+                    for rename in ref.get("renames", [])
+                },
+                alias=ref.get("as"),
+            )
+            for ref in refs
         ]
-    except InvalidConditionError as e:
-        return [], [e]
-
-    # Run Fastlint
-    with tempfile.NamedTemporaryFile() as rule_path:
-        # Combine inline rules and refs
-        raw_rules = [rule.raw for rule in inline_rules]
-        raw_rules.extend([rule.raw for rule in config_map.values()])
-        yaml.dump({"rules": raw_rules}, rule_path)
-        rule_path.flush()
-        rule_path.seek(0)
-
-        logger.debug(
-            f"Running join mode rule {join_rule.get('id')} on {len(scanning_roots)} files."
-        )
-        output = fastlint.run_scan.run_scan_and_return_json(
-            config=Path(rule_path.name),
-            scanning_roots=scanning_roots,
-            no_rewrite_rule_ids=True,
-            optimizations="all",
-            allow_local_builds=allow_local_builds,
-            ptt_enabled=ptt_enabled,
-        )
+        refs_lookup = {ref.id: ref for ref in join_rule_refs}
+        alias_lookup = {ref.alias: ref.id for ref in join_rule_refs}
 
-    assert isinstance(output, dict)  # placate mypy
+        # Add severity and message fields so that they can be full rules
+        inline_rules = [
+            Rule.from_json({**rule, "severity": "INFO", "message": "join rule"})
+            for rule in join_contents.get("rules", [])
+        ]
 
-    results = output.get("results", [])
-    errors = output.get("errors", [])
+        # Hack: Use the rule ID for inline rules as keys for refs_lookup and alias_lookup.
+        # This behavior should probably split out into a separate code
+        # path that only deals with refs in the future.
+        refs_lookup.update(
+            {
+                rule.id: Ref(id=rule.id, renames={}, alias=rule.id)
+                for rule in inline_rules
+            }
+        )
+        alias_lookup.update({rule.id: rule.id for rule in inline_rules})
 
-    parsed_errors = []
-    for error_dict in errors:
         try:
-            """
-            This is a hack to reconstitute errors after they've been
-            JSONified as output. Subclasses of FastlintError define the 'level'
-            and 'code' as class properties, which means they aren't accepted
-            as arguments when instantiated. 'type' is also added when errors are
-            JSONified, and is just a string of the error class name. It's not used
-            as an argument.
-            All of these properties will be properly populated because it's using the
-            class properties of the FastlintError inferred by 'type'.
-            """
-            del error_dict["code"]
-            del error_dict["level"]
-            errortype = error_dict.get("type")
-            del error_dict["type"]
-            parsed_errors.append(
-                ERROR_MAP[error_dict.get(errortype)].from_dict(error_dict)
+            conditions = [
+                Condition.parse(condition_string)
+                for condition_string in join_contents.get("on", [])
+            ]
+        except InvalidConditionError as e:
+            return None, [e]
+
+        core_rules: Dict[str, Rule] = {}
+        original_ids: Dict[str, str] = {}
+        for rule in chain(inline_rules, config_map.values()):
+            core_id = f"{join_rule.id}.{rule.id}"
+            core_rules[core_id] = Rule.from_json({**rule.raw, "id": core_id})
+            original_ids[core_id] = rule.id
+
+        return (
+            cls(
+                rule=join_rule,
+                core_rules=core_rules,
+                original_ids=original_ids,
+                refs_lookup=refs_lookup,
+                alias_lookup=alias_lookup,
+                conditions=conditions,
+            ),
+            [],
+        )
+
+    def evaluate(
+        self, rule_matches: Mapping[Rule, List[RuleMatch]], disable_nosem: bool = False
+    ) -> List[RuleMatch]:
+        """
+        The findings of the join rule, from the findings of the rules of
+        core_rules in 'rule_matches'.
+
+        Unless 'disable_nosem' is set, the findings ignored with a nosem
+        comment don't take part in the join, as if the rules of the join
+        rule were run on their own.
+        """
+        findings = [
+            match
+            for rule in self.core_rules.values()
+            for match in rule_matches.get(rule, [])
+            if disable_nosem or not match.is_ignored
+        ]
+        results = [
+            dataclasses.replace(
+                finding.match,
+                check_id=out.RuleId(self.original_ids[finding.rule_id]),
             )
-        except (KeyError, TypeError):
-            logger.warning(
-                f"Could not reconstitute Fastlint error: {error_dict}.\nSkipping processing of error"
+            for finding in findings
+        ]
+
+        # Small optimization: if there are no results for rules that
+        # are used in a condition, there's no sense in continuing.
+        collection_set_unaliased = {
+            self.alias_lookup[collection]
+            for collection in create_collection_set_from_conditions(self.conditions)
+        }
+        rule_ids = {result.check_id.value for result in results}
+        if collection_set_unaliased - rule_ids:
+            logger.debug(
+                f"No results for {collection_set_unaliased - rule_ids} in join rule '{self.rule.id}'."
             )
-            continue
-
-    # Small optimization: if there are no results for rules that
-    # are used in a condition, there's no sense in continuing.
-    collection_set_unaliased = {
-        alias_lookup[collection]
-        for collection in create_collection_set_from_conditions(conditions)
-    }
-    rule_ids = {result.get("check_id") for result in results}
-    if collection_set_unaliased - rule_ids:
-        logger.debug(
-            f"No results for {collection_set_unaliased - rule_ids} in join rule '{join_rule.get('id')}'."
-        )
-        return [], parsed_errors
-
-    # Rename metavariables with user-defined renames.
-    rename_metavars_in_place(results, refs_lookup)
-
-    # Create a model map. This allows dynamically creating DB tables based
-    # on Fastlint's results. There is one table for each rule ID.
-    model_map = create_model_map(results)
-    db.connect()
-    db.create_tables(model_map.values())
-
-    # Populate the model tables with real data from the Fastlint results.
-    load_results_into_db(results, model_map)
-
-    # Apply the conditions and only keep combinations
-    # of findings that satisfy the conditions.
-    matches = []
-    matched_on_conditions = match_on_conditions(
-        model_map,
-        alias_lookup,
-        [
-            Condition.parse(condition_string)
-            for condition_string in join_contents.get("on", [])
-        ],
-    )
-    if matched_on_conditions:  # This is ugly, but makes mypy happy
-        for match in matched_on_conditions:
-            try:
-                matches.append(json.loads(match.raw.decode("utf-8", errors="replace")))
-            except AttributeError:
-                matches.append(json.loads(match.raw))
+            return []
+
+        # Rename metavariables with user-defined renames.
+        results = rename_metavars(results, self.refs_lookup)
 
-    rule_matches = [json_to_rule_match(join_rule, match) for match in matches]
+        # Create a model map. This allows dynamically creating DB tables based
+        # on Fastlint's results. There is one table for each rule ID.
+        model_map = create_model_map(results)
+        db.connect()
+        db.create_tables(model_map.values())
 
-    db.close()
-    return rule_matches, parsed_errors
+        # Populate the model tables with real data from the Fastlint results.
+        load_results_into_db(results, model_map)
+
+        # Apply the conditions and only keep combinations
+        # of findings that satisfy the conditions.
+        join_matches = RuleMatches(self.rule)
+        matched_on_conditions = match_on_conditions(
+            model_map, self.alias_lookup, self.conditions
+        )
+        if matched_on_conditions:  # This is ugly, but makes mypy happy
+            for row in matched_on_conditions:
+                join_matches.add(
+                    to_join_rule_match(
+                        self.rule.raw, findings[row.finding], results[row.finding]
+                    )
+                )
+
+        db.close()
+        return list(join_matches)
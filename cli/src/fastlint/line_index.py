@@ -0,0 +1,256 @@
+##############################################################################
+# Prelude
+##############################################################################
+# Per-scan cache of line-start offsets for the files findings point into.
+#
+# Extracting the lines of a finding (RuleMatch.lines, previous_line, the line
+# hashes, the context lines of the text formatter, ...) used to re-open the
+# file and skip lines from the start for every single lookup. A finding near
+# the end of a big file was then paying for reading the whole file several
+# times, and this repeated for every finding in that file.
+#
+# Instead, each file is now read once, its line-start offsets computed once,
+# and all the lookups slice from that. The cache is an LRU bounded by the
+# number of bytes of text it keeps alive.
+#
+# The same goes for the git blobs of historical scans, which are read through
+# a single `git cat-file --batch` process (see fastlint.git_blob).
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Pattern
+
+from fastlint.error import FastlintError
+from fastlint.git_blob import GitBlobReader
+from fastlint.verbose_logging import getLogger
+
+logger = getLogger(__name__)
+
+##############################################################################
+# Constants
+##############################################################################
+
+# Files are read in text mode with universal newlines, so by the time we see
+# their content every line ending has been normalized to '\n'. This is
+# consistent with what iterating over the file object used to return.
+NEWLINE_RE = re.compile("\n")
+
+# The line boundaries used by str.splitlines()
+SPLITLINES_RE = re.compile("\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# How much text we keep alive across all the indexed files of a scan
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+##############################################################################
+# Line index
+##############################################################################
+
+
+class LineIndex:
+    """
+    The content of a text together with the offsets at which its lines start.
+
+    Lines include their line terminator when `keepends` is set, as when
+    iterating over a file object, and exclude it otherwise, as with
+    str.splitlines().
+    """
+
+    __slots__ = ("_text", "_starts", "_line_break", "_keepends")
+
+    def __init__(
+        self,
+        text: str,
+        *,
+        line_break: Pattern[str] = NEWLINE_RE,
+        keepends: bool = True,
+    ) -> None:
+        self._text = text
+        self._line_break = line_break
+        self._keepends = keepends
+        starts = array("q", [0])
+        starts.extend(m.end() for m in line_break.finditer(text))
+        # A trailing line terminator does not start a new (empty) line.
+        # The last element is then a sentinel marking the end of the text.
+        if starts[-1] != len(text):
+            starts.append(len(text))
+        self._starts = starts
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate size of the index, used to bound the cache
+        """
+        return len(self._text) + self._starts.itemsize * len(self._starts)
+
+    def get_line(self, line: int) -> str:
+        """
+        Return the one-indexed line `line`.
+        """
+        text = self._text[self._starts[line - 1] : self._starts[line]]
+        if self._keepends:
+            return text
+        m = self._line_break.search(text)
+        return text[: m.start()] if m else text
+
+    def get_lines(self, start_line: int, end_line: int) -> List[str]:
+        """
+        Return the one-indexed lines from `start_line` to `end_line`, inclusive.
+
+        Lines past the end of the text are silently ignored.
+        """
+        first = max(start_line, 1)
+        last = min(end_line, len(self))
+        return [self.get_line(line) for line in range(first, last + 1)]
+
+
+##############################################################################
+# Cache
+##############################################################################
+
+
+class LineIndexCache:
+    """
+    An LRU of line indexes bounded by the total size of the indexed texts.
+
+    Indexes bigger than the whole budget are returned to the caller but
+    never kept. The cache can be shared by threads, e.g. the ones rendering
+    outputs concurrently.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._entries: "OrderedDict[Hashable, LineIndex]" = OrderedDict()
+        self._blob_reader = GitBlobReader()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: Hashable) -> Optional[LineIndex]:
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None:
+                self._entries.move_to_end(key)
+            return index
+
+    def put(self, key: Hashable, index: LineIndex) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key).nbytes
+            if index.nbytes > self.max_bytes:
+                return
+            self._entries[key] = index
+            self._size += index.nbytes
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._blob_reader.close()
+
+    def file_index(self, path: Path) -> LineIndex:
+        """
+        Return the line index of the file at `path`, reading it if needed.
+
+        Entries are keyed on the file's modification time and size, so a file
+        rewritten during the scan (e.g., by autofix) is read again.
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            # Let the open() below handle the error, or, if the file is
+            # somehow readable anyway, just don't cache it.
+            return self._read_file(path)
+        key = ("file", str(path), stat.st_mtime_ns, stat.st_size)
+        index = self.get(key)
+        if index is None:
+            index = self._read_file(path)
+            self.put(key, index)
+        return index
+
+    def get_file_lines(self, path: Path, start_line: int, end_line: int) -> List[str]:
+        if start_line == 0 and end_line == 0:
+            # Completely empty file
+            return []
+        return self.file_index(path).get_lines(start_line, end_line)
+
+    @staticmethod
+    def _read_file(path: Path) -> LineIndex:
+        logger.debug(f"indexing lines of {path}")
+        try:
+            with path.open(errors="replace") as fd:
+                return LineIndex(fd.read())
+        except FileNotFoundError:
+            # The file was removed since fastlint-core matched it. Its
+            # findings are reported without their lines rather than failing
+            # the whole output.
+            logger.debug(f"{path} no longer exists, its lines are empty")
+            return LineIndex("")
+
+    def blob_index(self, blob_sha: str) -> LineIndex:
+        """
+        Return the line index of the git blob `blob_sha`, reading it if needed.
+
+        Blobs are addressed by their content so their entries never go stale.
+        """
+        key = ("blob", blob_sha)
+        index = self.get(key)
+        if index is None:
+            try:
+                # The batch process answers one request at a time
+                with self._lock:
+                    blob = self._blob_reader.read(blob_sha)
+                contents = blob.decode(errors="replace")
+            except FastlintError as e:
+                # Give `git cat-file blob` a chance, it will at least report
+                # a detailed error if the blob is really missing.
+                from fastlint.git import git_check_output  # avoiding circular imports
+
+                logger.debug(f"falling back to git cat-file blob: {e}")
+                contents = git_check_output(["git", "cat-file", "blob", blob_sha])
+            # The content used to come from `git cat-file blob` through
+            # git_check_output(), which strips it, and lines were then split
+            # with str.splitlines(). We keep doing the same so that the line
+            # hashes of historical findings don't change.
+            index = LineIndex(
+                contents.strip(), line_break=SPLITLINES_RE, keepends=False
+            )
+            self.put(key, index)
+        return index
+
+    def get_blob_lines(
+        self, blob_sha: str, start_line: int, end_line: int
+    ) -> List[str]:
+        if start_line == 0 and end_line == 0:
+            # Completely empty file
+            return []
+        return self.blob_index(blob_sha).get_lines(start_line, end_line)
+
+
+_cache: Optional[LineIndexCache] = None
+
+
+def get_line_index_cache() -> LineIndexCache:
+    """
+    The line index cache shared by all the lookups of this fastlint invocation.
+    """
+    global _cache
+    if _cache is None:
+        _cache = LineIndexCache()
+    return _cache
@@ -0,0 +1,125 @@
+##############################################################################
+# Prelude
+##############################################################################
+# MurmurHash3 x64 128-bit, as used for the syntactic_id of findings.
+#
+# The syntactic_id must stay stable across versions, so this must remain
+# bit-compatible with fastlint.external.pymmh3.hash128, which we used to call
+# directly. That implementation assembles every 64-bit block one byte at a
+# time in Python, which shows up in profiles of scans with many findings.
+# Here, blocks are decoded with struct in one go, and we defer to the mmh3
+# C extension when it happens to be installed.
+#
+# See cli/tests/default/unit/test_murmur3.py for the golden vectors and
+# cli/tests/performance/test_syntactic_id_hashing.py for a comparison with
+# pymmh3.
+import struct
+from typing import Union
+
+try:
+    import mmh3 as _mmh3  # type: ignore[import]
+except ImportError:
+    _mmh3 = None
+
+##############################################################################
+# Constants
+##############################################################################
+
+_MASK = 0xFFFFFFFFFFFFFFFF
+_C1 = 0x87C37B91114253D5
+_C2 = 0x4CF5AD432745937F
+
+_BLOCKS = struct.Struct("<QQ")
+
+##############################################################################
+# Pure Python implementation
+##############################################################################
+
+
+def _fmix(k: int) -> int:
+    k ^= k >> 33
+    k = (k * 0xFF51AFD7ED558CCD) & _MASK
+    k ^= k >> 33
+    k = (k * 0xC4CEB9FE1A85EC53) & _MASK
+    k ^= k >> 33
+    return k
+
+
+def _hash128_py(key: bytes, seed: int) -> int:
+    length = len(key)
+    nblocks_len = length & ~15
+    h1 = seed
+    h2 = seed
+
+    # body
+    for k1, k2 in _BLOCKS.iter_unpack(memoryview(key)[:nblocks_len]):
+        k1 = (_C1 * k1) & _MASK
+        k1 = (k1 << 31 | k1 >> 33) & _MASK
+        k1 = (_C2 * k1) & _MASK
+        h1 ^= k1
+
+        h1 = (h1 << 27 | h1 >> 37) & _MASK
+        h1 = (h1 + h2) & _MASK
+        h1 = (h1 * 5 + 0x52DCE729) & _MASK
+
+        k2 = (_C2 * k2) & _MASK
+        k2 = (k2 << 33 | k2 >> 31) & _MASK
+        k2 = (_C1 * k2) & _MASK
+        h2 ^= k2
+
+        h2 = (h2 << 31 | h2 >> 33) & _MASK
+        h2 = (h1 + h2) & _MASK
+        h2 = (h2 * 5 + 0x38495AB5) & _MASK
+
+    # tail
+    tail = key[nblocks_len:]
+    if len(tail) > 8:
+        k2 = int.from_bytes(tail[8:], "little")
+        k2 = (k2 * _C2) & _MASK
+        k2 = (k2 << 33 | k2 >> 31) & _MASK
+        k2 = (k2 * _C1) & _MASK
+        h2 ^= k2
+    if tail:
+        k1 = int.from_bytes(tail[:8], "little")
+        k1 = (k1 * _C1) & _MASK
+        k1 = (k1 << 31 | k1 >> 33) & _MASK
+        k1 = (k1 * _C2) & _MASK
+        h1 ^= k1
+
+    # finalization
+    h1 ^= length
+    h2 ^= length
+
+    h1 = (h1 + h2) & _MASK
+    h2 = (h1 + h2) & _MASK
+
+    h1 = _fmix(h1)
+    h2 = _fmix(h2)
+
+    h1 = (h1 + h2) & _MASK
+    h2 = (h1 + h2) & _MASK
+
+    return h2 << 64 | h1
+
+
+##############################################################################
+# Entry points
+##############################################################################
+
+
+def _to_bytes(key: Union[str, bytes, bytearray]) -> bytes:
+    return key.encode() if isinstance(key, str) else bytes(key)
+
+
+def hash128(key: Union[str, bytes, bytearray], seed: int = 0) -> int:
+    """
+    The unsigned 128-bit MurmurHash3 x64 hash of `key`.
+
+    Strings are hashed as their UTF-8 encoding. The result is the same as
+    fastlint.external.pymmh3.hash128(key, seed). The mmh3 extension, when
+    available, is only used for the 32-bit seeds it supports.
+    """
+    data = _to_bytes(key)
+    if _mmh3 is not None and 0 <= seed <= 0xFFFFFFFF:
+        return int(_mmh3.hash128(data, seed, x64arch=True, signed=False))
+    return _hash128_py(data, seed)
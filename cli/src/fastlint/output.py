@@ -1,14 +1,21 @@
 import dataclasses
+import gzip
+import lzma
 import os
 import pathlib
 import sys
+import zlib
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
+from io import BytesIO
 from pathlib import Path
 from typing import Any
+from typing import cast
 from typing import Collection
 from typing import Dict
 from typing import FrozenSet
+from typing import IO
 from typing import Iterator
 from typing import List
 from typing import Mapping
@@ -18,6 +25,7 @@ from typing import Sequence
 from typing import Set
 from typing import Tuple
 from typing import Type
+from typing import Union
 
 import requests
 from boltons.iterutils import partition
@@ -33,24 +41,30 @@ from fastlint.engine import EngineType
 from fastlint.error import FINDINGS_EXIT_CODE
 from fastlint.error import FastlintCoreError
 from fastlint.error import FastlintError
+from fastlint.formatter.columnar import ColumnarFormatter
 from fastlint.formatter.emacs import EmacsFormatter
 from fastlint.formatter.gitlab_sast import GitlabSastFormatter
 from fastlint.formatter.gitlab_secrets import GitlabSecretsFormatter
 from fastlint.formatter.json import JsonFormatter
 from fastlint.formatter.junit_xml import JunitXmlFormatter
+from fastlint.formatter.ndjson import NdjsonFormatter
 from fastlint.formatter.sarif import SarifFormatter
 from fastlint.formatter.text import TextFormatter
 from fastlint.formatter.vim import VimFormatter
 from fastlint.output_extra import OutputExtra
 from fastlint.profile_manager import ProfileManager
 from fastlint.rule import Rule
+from fastlint.rule_match import merge_findings
 from fastlint.rule_match import RuleMatch
 from fastlint.rule_match import RuleMatchMap
 from fastlint.state import DesignTreatment
+from fastlint.state import get_context
 from fastlint.state import get_state
 from fastlint.target_manager import FileTargetingLog
 from fastlint.target_manager import TargetManager
 from fastlint.util import is_url
+from fastlint.util import path_sort_key
+from fastlint.util import sort_paths
 from fastlint.util import terminal_wrap
 from fastlint.util import unit_str
 from fastlint.util import with_color
@@ -60,16 +74,68 @@ logger = getLogger(__name__)
 
 
 FORMATTERS: Mapping[OutputFormat, Type[base.BaseFormatter]] = {
+    OutputFormat.COLUMNAR: ColumnarFormatter,
     OutputFormat.EMACS: EmacsFormatter,
     OutputFormat.GITLAB_SAST: GitlabSastFormatter,
     OutputFormat.GITLAB_SECRETS: GitlabSecretsFormatter,
     OutputFormat.JSON: JsonFormatter,
     OutputFormat.JUNIT_XML: JunitXmlFormatter,
+    OutputFormat.NDJSON: NdjsonFormatter,
     OutputFormat.SARIF: SarifFormatter,
     OutputFormat.TEXT: TextFormatter,
     OutputFormat.VIM: VimFormatter,
 }
 
+# How many outputs we render at the same time
+MAX_OUTPUT_WORKERS = 4
+
+# Timeout when posting an output to a URL: a base, plus some time for each MB
+# of (uncompressed) output so that big SARIF uploads don't time out
+POST_TIMEOUT_S = 10
+POST_TIMEOUT_S_PER_MB = 2
+# Size of the pieces of the output we compress and send at once
+POST_CHUNK_SIZE = 1024 * 1024
+
+
+def open_output_file(path: Path, binary: bool = False) -> IO[Any]:
+    """
+    Open an --output file for writing, compressed according to its suffix
+    (.gz or .xz).
+    """
+    # create the folders if not exists
+    path.parent.mkdir(parents=True, exist_ok=True)
+    suffix = path.suffix.lower()
+    if suffix == ".gz":
+        if binary:
+            # GzipFile is a BufferedIOBase, which typeshed doesn't see as an IO
+            return cast(IO[bytes], gzip.open(path, "wb"))
+        return gzip.open(path, "wt", encoding="utf-8")
+    if suffix == ".xz":
+        if binary:
+            return lzma.open(path, "wb")
+        return lzma.open(path, "wt", encoding="utf-8")
+    return path.open(mode="wb" if binary else "w")
+
+
+def post_timeout(size: int) -> float:
+    """
+    The timeout for posting an output of `size` bytes to a URL.
+    """
+    return POST_TIMEOUT_S + POST_TIMEOUT_S_PER_MB * size / (1024 * 1024)
+
+
+def gzip_chunks(data: bytes, chunk_size: int = POST_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Compress `data` in the gzip format, piece by piece.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for start in range(0, len(data), chunk_size):
+        chunk = compressor.compress(data[start : start + chunk_size])
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
 # Experiment and Inventory are not below on purpose
 DEFAULT_SHOWN_SEVERITIES: Collection[out.MatchSeverity] = frozenset(
     {
@@ -118,6 +184,12 @@ def _build_time_json(
     )
 
 
+class SharedFormatArgs(NamedTuple):
+    cli_output_extra: out.CliOutputExtra
+    ctx: out.FormatContext
+    cli_output: base.SharedCliOutput
+
+
 # This class is the internal representation of OutputSettings below.
 # Since it is internal it can change as much as necesarry to make
 # typechecking more accurate and enforce invariants.
@@ -126,6 +198,7 @@ class NormalizedOutputSettings(NamedTuple):
     outputs: Dict[Optional[str], OutputFormat]
     output_per_finding_max_lines_limit: Optional[int]
     output_per_line_max_chars_limit: Optional[int]
+    max_findings_displayed: Optional[int]
     error_on_findings: bool
     verbose_errors: bool
     strict: bool
@@ -151,6 +224,7 @@ class OutputSettings(NamedTuple):
     output_destination: Optional[str] = None
     output_per_finding_max_lines_limit: Optional[int] = None
     output_per_line_max_chars_limit: Optional[int] = None
+    max_findings_displayed: Optional[int] = None
     error_on_findings: bool = False
     verbose_errors: bool = False  # to do: rename to just 'verbose'
     strict: bool = False
@@ -178,6 +252,7 @@ class OutputSettings(NamedTuple):
             outputs=normalized_outputs,
             output_per_finding_max_lines_limit=self.output_per_finding_max_lines_limit,
             output_per_line_max_chars_limit=self.output_per_line_max_chars_limit,
+            max_findings_displayed=self.max_findings_displayed,
             error_on_findings=self.error_on_findings,
             verbose_errors=self.verbose_errors,
             strict=self.strict,
@@ -397,11 +472,9 @@ class OutputHandler:
         state = get_state()
         self.has_output = True
         self.rules = self.rules.union(rule_matches_by_rule.keys())
-        self.rule_matches = [
-            match
-            for matches_of_one_rule in rule_matches_by_rule.values()
-            for match in matches_of_one_rule
-        ]
+        # Each rule's matches are already in order, merging them keeps
+        # self.rule_matches in the canonical order formatters expect.
+        self.rule_matches = list(merge_findings(rule_matches_by_rule.values()))
         self.profiler = profiler
         self.all_targets = all_targets
         self.filtered_rules = filtered_rules
@@ -454,19 +527,7 @@ class OutputHandler:
             self.ignore_log.core_failure_lines_by_file = failed_to_analyze_lines_by_path
 
         if self.has_output:
-            for output_destination, output in self._build_outputs():
-                if output_destination:
-                    self._save_output(output_destination, output)
-                else:
-                    if output:
-                        try:
-                            # console.print() would go to stderr; here we print() directly to stdout
-                            # the output string is already pre-formatted by fastlint.console
-                            print(output)
-                        except UnicodeEncodeError as ex:
-                            raise Exception(
-                                "Received output encoding error, please set PYTHONIOENCODING=utf-8"
-                            ) from ex
+            self._write_outputs()
 
         if self.filtered_rules:
             fingerprint_matches, regular_matches = partition(
@@ -514,42 +575,239 @@ class OutputHandler:
 
         self._final_raise(final_error)
 
-    def _save_output(self, destination: str, output: str) -> None:
+    def _save_output(self, destination: str, output: Union[str, bytes]) -> None:
         metrics = get_state().metrics
         if is_url(destination):
             metrics.add_feature("output", "url")
             self._post_output(destination, output)
         else:
             metrics.add_feature("output", "path")
-            save_path = Path(destination)
-            # create the folders if not exists
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            with save_path.open(mode="w") as fout:
+            with open_output_file(
+                Path(destination), binary=isinstance(output, bytes)
+            ) as fout:
                 fout.write(output)
 
-    def _post_output(self, output_url: str, output: str) -> None:
+    def _post_output(self, output_url: str, output: Union[str, bytes]) -> None:
         logger.info(f"posting to {output_url}...")
+        data = output if isinstance(output, bytes) else output.encode("utf-8")
         try:
-            r = requests.post(output_url, data=output, timeout=10)
+            # A generator body is sent with chunked transfer encoding, so we
+            # never hold the whole compressed output in memory.
+            r = requests.post(
+                output_url,
+                data=gzip_chunks(data),
+                headers={"Content-Encoding": "gzip"},
+                timeout=post_timeout(len(data)),
+            )
             logger.verbose(
                 f"posted to {output_url} and got status_code:{r.status_code}"
             )
         except requests.exceptions.Timeout:
             raise FastlintError(f"posting output to {output_url} timed out")
 
+    def _write_outputs(self) -> None:
+        """
+        Render all the outputs, concurrently when there are several of them.
+
+        What all the outputs have in common, including the out.CliOutput most
+        formatters start from, is built only once. The output going to stdout,
+        if any, is printed last, unless it is streamed.
+        """
+        outputs = list(self.settings.get_outputs())
+        shared = self._build_shared_format_args()
+        # get_state() relies on click's current context, which is per thread
+        ctx = get_context()
+
+        def write(
+            output_destination: Optional[str], output_format: OutputFormat
+        ) -> Optional[str]:
+            with ctx.scope(cleanup=False):
+                formatter = self._formatters[output_destination]
+                if formatter.is_binary():
+                    self._write_binary_output(output_destination, output_format, shared)
+                    return None
+                if formatter.is_streaming() and not (
+                    output_destination and is_url(output_destination)
+                ):
+                    self._stream_output(output_destination, output_format, shared)
+                    return None
+                output = self._build_output(output_destination, output_format, shared)
+                if output_destination is None:
+                    return output
+                self._save_output(output_destination, output)
+                return None
+
+        # The text formatter captures what it prints on the global console,
+        # and toggles its quiet mode, so we keep it on this thread.
+        in_thread = [o for o in outputs if o[1] == OutputFormat.TEXT]
+        in_pool = [o for o in outputs if o[1] != OutputFormat.TEXT]
+        if not in_thread and in_pool:
+            in_thread.append(in_pool.pop())
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(in_pool), MAX_OUTPUT_WORKERS))
+        ) as executor:
+            futures = [executor.submit(write, *o) for o in in_pool]
+            stdout_outputs = [write(*o) for o in in_thread]
+            stdout_outputs.extend(future.result() for future in futures)
+
+        for output in stdout_outputs:
+            if output:
+                try:
+                    # console.print() would go to stderr; here we print() directly to stdout
+                    # the output string is already pre-formatted by fastlint.console
+                    print(output)
+                except UnicodeEncodeError as ex:
+                    raise Exception(
+                        "Received output encoding error, please set PYTHONIOENCODING=utf-8"
+                    ) from ex
+
+    def _stream_output(
+        self,
+        output_destination: Optional[str],
+        output_format: OutputFormat,
+        shared: Optional[SharedFormatArgs] = None,
+    ) -> None:
+        """
+        Write the output of a streaming formatter as it is produced, rather
+        than building it as one string first.
+        """
+        formatter = self._formatters[output_destination]
+        args = self._build_format_args(output_destination, output_format, shared)
+        if output_destination is None:
+            try:
+                formatter.write_output(sys.stdout, *args)
+                sys.stdout.flush()
+            except UnicodeEncodeError as ex:
+                raise Exception(
+                    "Received output encoding error, please set PYTHONIOENCODING=utf-8"
+                ) from ex
+        else:
+            get_state().metrics.add_feature("output", "path")
+            with open_output_file(Path(output_destination)) as fout:
+                formatter.write_output(fout, *args)
+
+    def _write_binary_output(
+        self,
+        output_destination: Optional[str],
+        output_format: OutputFormat,
+        shared: Optional[SharedFormatArgs] = None,
+    ) -> None:
+        """
+        Write the output of a binary formatter, which is never built as a
+        string.
+        """
+        formatter = self._formatters[output_destination]
+        args = self._build_format_args(output_destination, output_format, shared)
+        if output_destination is None:
+            # in case some text was written to stdout before
+            sys.stdout.flush()
+            formatter.write_output(sys.stdout.buffer, *args)
+            sys.stdout.buffer.flush()
+        elif is_url(output_destination):
+            buf = BytesIO()
+            formatter.write_output(buf, *args)
+            self._save_output(output_destination, buf.getvalue())
+        else:
+            get_state().metrics.add_feature("output", "path")
+            with open_output_file(Path(output_destination), binary=True) as fout:
+                formatter.write_output(fout, *args)
+
     def _build_outputs(self) -> Iterator[Tuple[Optional[str], str]]:
+        shared = self._build_shared_format_args()
         for output_destination, output_format in self.settings.get_outputs():
-            yield self._build_output(output_destination, output_format)
+            yield (
+                output_destination,
+                self._build_output(output_destination, output_format, shared),
+            )
 
     def _build_output(
-        self, output_destination: Optional[str], output_format: OutputFormat
-    ) -> Tuple[Optional[str], str]:
+        self,
+        output_destination: Optional[str],
+        output_format: OutputFormat,
+        shared: Optional[SharedFormatArgs] = None,
+    ) -> str:
+        formatter = self._formatters[output_destination]
+        return formatter.output(
+            *self._build_format_args(output_destination, output_format, shared)
+        )
+
+    def _build_format_args(
+        self,
+        output_destination: Optional[str],
+        output_format: OutputFormat,
+        shared: Optional[SharedFormatArgs] = None,
+    ) -> Tuple[
+        FrozenSet[Rule],
+        Sequence[RuleMatch],
+        Sequence[FastlintError],
+        out.CliOutputExtra,
+        Mapping[str, Any],
+        Collection[out.MatchSeverity],
+        out.FormatContext,
+    ]:
+        """
+        The arguments of BaseFormatter.output() and write_output(), after
+        the output stream.
+        """
+        if shared is None:
+            shared = self._build_shared_format_args()
+
+        # DO NOT USE THIS local!
+        # The extra dict is for blatantly skipping type checking and function signatures.
+        # - The text formatter uses it to store settings
+        # You should use CliOutputExtra for better type checking
+        extra: Dict[str, Any] = {}
+
+        if self.settings.verbose_errors:
+            extra["verbose_errors"] = True
+        if output_format == OutputFormat.TEXT:
+            extra["color_output"] = (
+                (output_destination is None and sys.stdout.isatty())
+                or os.environ.get("FASTLINT_FORCE_COLOR")
+            ) and not os.environ.get("NO_COLOR")
+            extra[
+                "per_finding_max_lines_limit"
+            ] = self.settings.output_per_finding_max_lines_limit
+            extra[
+                "per_line_max_chars_limit"
+            ] = self.settings.output_per_line_max_chars_limit
+            extra["dataflow_traces"] = self.settings.dataflow_traces
+            extra["max_findings_displayed"] = self.settings.max_findings_displayed
+        if output_format == OutputFormat.SARIF:
+            extra["dataflow_traces"] = self.settings.dataflow_traces
+
+        # as opposed to below, we need to distinguish the various kinds of pro engine
+        extra["engine_requested"] = self.engine_type
+        extra["shared_cli_output"] = shared.cli_output
+
+        return (
+            self.rules,  # the rules are used only by the SARIF formatter
+            self.rule_matches,
+            self.fastlint_structured_errors,
+            shared.cli_output_extra,
+            extra,
+            self.severities,
+            shared.ctx,
+        )
+
+    def _sorted_targets(self) -> List[str]:
+        if self.extra is not None and self.extra.all_targets is self.all_targets:
+            # shared with the other users of the targets of the scan
+            return self.extra.sorted_targets()
+        return sort_paths(self.all_targets)
+
+    def _build_shared_format_args(self) -> SharedFormatArgs:
+        """
+        The parts of the formatters' arguments which are the same for all
+        the outputs.
+        """
         # CliOutputExtra members
         cli_paths = out.ScannedAndSkipped(
             # This is incorrect when some rules are skipped by fastlint-core
             # e.g. proprietary rules.
             # TODO: Use what fastlint-core returns for 'scanned' and 'skipped'.
-            scanned=[out.Fpath(str(path)) for path in sorted(self.all_targets)],
+            scanned=[out.Fpath(path) for path in self._sorted_targets()],
             skipped=None,
         )
         cli_timing: Optional[out.Profile] = None
@@ -564,16 +822,11 @@ class OutputHandler:
                 self.profiler,
             )
 
-        # DO NOT USE THIS local!
-        # The extra dict is for blatantly skipping type checking and function signatures.
-        # - The text formatter uses it to store settings
-        # You should use CliOutputExtra for better type checking
-        extra: Dict[str, Any] = {}
-
         if self.settings.verbose_errors:
             # TODO: use SkippedTarget directly in ignore_log or in yield_json_objects at least
             skipped = sorted(
-                self.ignore_log.yield_json_objects(), key=lambda x: Path(x["path"])
+                self.ignore_log.yield_json_objects(),
+                key=lambda x: path_sort_key(x["path"]),
             )
             cli_paths = dataclasses.replace(
                 cli_paths,
@@ -585,24 +838,6 @@ class OutputHandler:
                     for x in skipped
                 ],
             )
-            extra["verbose_errors"] = True
-        if output_format == OutputFormat.TEXT:
-            extra["color_output"] = (
-                (output_destination is None and sys.stdout.isatty())
-                or os.environ.get("FASTLINT_FORCE_COLOR")
-            ) and not os.environ.get("NO_COLOR")
-            extra[
-                "per_finding_max_lines_limit"
-            ] = self.settings.output_per_finding_max_lines_limit
-            extra[
-                "per_line_max_chars_limit"
-            ] = self.settings.output_per_line_max_chars_limit
-            extra["dataflow_traces"] = self.settings.dataflow_traces
-        if output_format == OutputFormat.SARIF:
-            extra["dataflow_traces"] = self.settings.dataflow_traces
-
-        # as opposed to below, we need to distinguish the various kinds of pro engine
-        extra["engine_requested"] = self.engine_type
 
         # TODO: I thought we could guard this code with 'if self.extra:', and raise
         # a FastlintError otherwise, but it seems that when fastlint got an error
@@ -629,20 +864,14 @@ class OutputHandler:
         )
 
         state = get_state()
-        formatter = self._formatters[output_destination]
-        output = formatter.output(  # the rules are used only by the SARIF formatter
-            self.rules,
-            self.rule_matches,
-            self.fastlint_structured_errors,
-            cli_output_extra,
-            extra,
-            self.severities,
-            out.FormatContext(
+        return SharedFormatArgs(
+            cli_output_extra=cli_output_extra,
+            ctx=out.FormatContext(
                 is_ci_invocation=self.is_ci_invocation,
                 is_logged_in=auth.is_logged_in_weak(),
                 # If users are not using our registry, we will not nudge them to login
                 is_using_registry=state.metrics.is_using_registry
                 or state.env.mock_using_registry,
             ),
+            cli_output=base.SharedCliOutput(),
         )
-        return (output_destination, output)
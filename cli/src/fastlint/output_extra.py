@@ -1,10 +1,13 @@
 from pathlib import Path
+from typing import List
 from typing import Set
 
+from attrs import field
 from attrs import frozen
 
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
 from fastlint.parsing_data import ParsingData
+from fastlint.util import sort_paths
 
 
 # This class exists to wrap some of the output returned by `fastlint-core`, on its way up
@@ -16,3 +19,17 @@ class OutputExtra:
     core: out.CoreOutput
     all_targets: Set[Path]
     parsing_data: ParsingData
+    # all_targets sorted as strings, filled on the first call to
+    # sorted_targets()
+    _sorted_targets: List[str] = field(init=False, factory=list, eq=False)
+
+    def sorted_targets(self) -> List[str]:
+        """
+        all_targets as strings, in the order of sorted(all_targets).
+
+        They are sorted once per scan, for all the outputs and the upload of
+        the findings of `fastlint ci`, unless targets are added in between.
+        """
+        if len(self._sorted_targets) != len(self.all_targets):
+            self._sorted_targets[:] = sort_paths(self.all_targets)
+        return self._sorted_targets
@@ -7,8 +7,11 @@
 # See `src/rpc/README.txt` from the repository root for more details.
 # coupling: src/rpc/RPC.handle_call()
 # coupling: fastlint_output_v1.atd which defines the CallXxx and RetXxx
+import atexit
 import subprocess
+import threading
 from typing import IO
+from typing import List
 from typing import Optional
 from typing import Type
 from typing import TypeVar
@@ -35,55 +38,66 @@ ENCODING = "utf-8"
 # indicative of a real problem.
 SUBPROC_TIMEOUT_S = 1
 
+# Passed to fastlint-core, in addition to -rpc, to ask it to keep serving
+# calls until its stdin is closed rather than exiting after the first one.
+# Binaries not supporting it either reject it on startup or exit after the
+# first call anyway, and we then fall back to running one process per call.
+PERSISTENT_FLAG = "-rpc_persistent"
+
 ##############################################################################
 # Helpers
 ##############################################################################
 
 
-# Read `size` bytes from `io`. Returns fewer bytes if we hit EOF.
-def _really_read(io: IO[str], size: int) -> str:
-    # Operate on bytes, not str.
-    out: bytes = b""
-    while len(out) < size:
-        # `read` may return fewer bytes than requested. In practice this is
-        # unlikely, but we need to handle it.
-        #
-        # We could have used a BufferedReader which does this for us, but to do
-        # so we'd need access to the `buffer` property of the input stream.
-        # While it's documented in the (terrible) Python API docs for at least
-        # some kinds of input streams, MyPy doesn't recognize it and it's not
-        # clear to me (nmote) whether it is guaranteed to be present on the
-        # streams provided by subprocess.Popen. So, to be on the safe side,
-        # we'll just do this ourselves.
-        new: str = io.read(size)
-        # This happens if we hit EOF. In that case, repeatedly reading will lead
-        # to an infinite loop.
-        if len(new) == 0:
+def _really_read(io: IO[bytes], size: int) -> bytearray:
+    """
+    Read `size` bytes from `io`. Returns fewer bytes if we hit EOF.
+
+    Formatter payloads can weigh hundreds of MB, so we read straight into a
+    preallocated buffer rather than concatenating chunks.
+    """
+    buf = bytearray(size)
+    view = memoryview(buf)
+    pos = 0
+    while pos < size:
+        # `readinto` may return fewer bytes than requested, e.g. when reading
+        # from a pipe. It returns 0 on EOF, and then repeatedly reading would
+        # lead to an infinite loop.
+        n = io.readinto(view[pos:])  # type: ignore[attr-defined]
+        if not n:
             logger.error(f"0 bytes read from RPC input stream")
             break
-        out = out + new.encode(ENCODING)
-    return out.decode(ENCODING)
+        pos += n
+    view.release()
+    if pos < size:
+        del buf[pos:]
+    return buf
 
 
-def _read_packet(io: IO[str]) -> Optional[str]:
+def _read_packet(io: IO[bytes]) -> Optional[str]:
     # Unlike `read`, `readline` is guaranteed to return a full line unless there
     # is an EOF
     size_str = io.readline().strip()
+    if not size_str:
+        # The process exited, or closed its stdout, without answering
+        logger.debug(f"RPC input error: unexpected EOF")
+        return None
     if not size_str.isdigit():
         # Avoid horrific log spew if we somehow got a really long line
-        truncated = size_str[:50]
+        truncated = size_str[:50].decode(ENCODING, errors="replace")
         logger.error(f"RPC input error: Expected a number, got '{truncated}'")
         return None
     size = int(size_str)
-    return _really_read(io, size)
+    # Decoding once, from the whole buffer, also means we can't split a
+    # multi-byte character between two reads.
+    return _really_read(io, size).decode(ENCODING)
 
 
-def _write_packet(io: IO[str], packet: str) -> None:
+def _write_packet(io: IO[bytes], packet: str) -> None:
+    data = packet.encode(ENCODING)
     # Size in bytes
-    size: int = len(packet.encode(ENCODING))
-    size_str = str(size) + "\n"
-    io.write(size_str)
-    io.write(packet)
+    io.write(b"%d\n" % len(data))
+    io.write(data)
     io.flush()
 
 
@@ -101,22 +115,35 @@ def _parse_function_return(packet: str) -> Optional[out.FunctionReturn]:
 
 
 ##############################################################################
-# Entry point
+# Transport
 ##############################################################################
-T = TypeVar("T")
 
 
-def rpc_call(call: out.FunctionCall, cls: Type[T]) -> Optional[T]:
+def _core_command() -> List[str]:
     # We always use the pro binary if it's available. It's up to the caller to
     # appropriately handle the case where the pro function is not available and
     # to ensure that pro RPC methods are only called during a pro scan.
     fastlint_core_path = FastlintCore.pro_path() or FastlintCore.executable_path()
+    return [str(fastlint_core_path), "-rpc"]
+
+
+def _stop(proc: "subprocess.Popen[bytes]") -> None:
+    try:
+        proc.wait(timeout=SUBPROC_TIMEOUT_S)
+    except subprocess.TimeoutExpired:
+        logger.error(f"RPC subprocess did not exit cleanly. Killing it.")
+        proc.kill()
+        proc.wait()
+
+
+def _one_shot_call(call_str: str) -> Optional[str]:
+    """
+    Run a fastlint-core process for this call only.
+    """
     with subprocess.Popen(
-        [fastlint_core_path, "-rpc"],
+        _core_command(),
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
-        text=True,
-        encoding=ENCODING,
     ) as proc:
         try:
             # These need to be local variables because otherwise mypy doesn't
@@ -129,33 +156,156 @@ def rpc_call(call: out.FunctionCall, cls: Type[T]) -> Optional[T]:
                 # it actually can happen.
                 logger.error(f"RPC subprocess missing stdout or stdin channel")
                 return None
-            call_str = call.to_json_string().strip()
             _write_packet(proc_stdin, call_str)
             proc_stdin.close()
+            return _read_packet(proc_stdout)
+        finally:
+            _stop(proc)
 
-            ret_str = _read_packet(proc_stdout)
-            if ret_str is None:
-                logger.error(f"Unable to read RPC response")
-                return None
-            ret = _parse_function_return(ret_str)
-            if ret is None:
-                # No need to log here, it's handled in the error case of
-                # _parse_function_return
-                return None
-            # Any request can return an error
-            if isinstance(ret.value, out.RetError):
-                err: str = ret.value.value
-                logger.error(f"RPC response indicated an error: {err}")
-                return None
-            # Check that we got the correct kind of response
-            if isinstance(ret.value, cls):
-                return ret.value
-            else:
-                logger.error(f"Received an incorrect kind of RPC response")
-                return None
+
+class RpcSession:
+    """
+    A fastlint-core RPC process kept alive across calls.
+
+    Calls are serialized: one packet is written, then one packet is read
+    back, using the same framing as the one-shot mode. Calls made while the
+    process is busy with another thread's call, as well as all calls if the
+    binary does not support the persistent mode, run in a process of their
+    own.
+    """
+
+    def __init__(self) -> None:
+        self._proc: Optional["subprocess.Popen[bytes]"] = None
+        self._lock = threading.Lock()
+        # None until we know whether the binary supports the persistent mode
+        self.is_persistent: Optional[bool] = None
+
+    def _start(self) -> "subprocess.Popen[bytes]":
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [*_core_command(), PERSISTENT_FLAG],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL if self.is_persistent is None else None,
+            )
+            atexit.register(self.close)
+        return self._proc
+
+    def _persistent_call(self, call_str: str) -> Optional[str]:
+        proc = self._start()
+        proc_stdin = proc.stdin
+        proc_stdout = proc.stdout
+        if proc_stdin is None or proc_stdout is None:
+            logger.error(f"RPC subprocess missing stdout or stdin channel")
+            return None
+        try:
+            _write_packet(proc_stdin, call_str)
+        except (BrokenPipeError, OSError):
+            # The process is gone, we'll see what happened when reading
+            pass
+        return _read_packet(proc_stdout)
+
+    def call(self, call_str: str) -> Optional[str]:
+        if not self._lock.acquire(blocking=False):
+            # Another thread is using the process (e.g., when rendering
+            # several outputs at once). Rather than waiting for it, run this
+            # call in a process of its own.
+            return _one_shot_call(call_str)
+        try:
+            return self._call_locked(call_str)
         finally:
+            self._lock.release()
+
+    def _call_locked(self, call_str: str) -> Optional[str]:
+        if self.is_persistent is False:
+            return _one_shot_call(call_str)
+        proc = self._proc
+        if proc is not None and proc.poll() is not None:
+            self._close_locked()
+            if self.is_persistent is None:
+                # The process exited after answering a single call: the
+                # binary ignored the persistent flag.
+                logger.debug("RPC persistent mode unsupported, falling back")
+                self.is_persistent = False
+            return _one_shot_call(call_str)
+        ret_str = self._persistent_call(call_str)
+        if ret_str is None:
+            # Don't reuse a process which may be in an unknown state, and
+            # run the call again in a process of its own.
+            self._close_locked()
+            if self.is_persistent is None:
+                # The process either rejected the persistent flag, or
+                # answered a single call and exited.
+                logger.debug("RPC persistent mode unsupported, falling back")
+                self.is_persistent = False
+            return _one_shot_call(call_str)
+        if proc is not None and self.is_persistent is None:
+            # Only a process which answered a second call is known to
+            # support the persistent mode.
+            self.is_persistent = True
+        return ret_str
+
+    def _close_locked(self) -> None:
+        proc = self._proc
+        self._proc = None
+        if proc is None:
+            return
+        atexit.unregister(self.close)
+        if proc.stdin is not None:
             try:
-                proc.wait(timeout=SUBPROC_TIMEOUT_S)
-            except subprocess.TimeoutExpired:
-                logger.error(f"RPC subprocess did not exit cleanly. Killing it.")
-                proc.kill()
+                proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        _stop(proc)
+        if proc.stdout is not None:
+            proc.stdout.close()
+
+    def close(self) -> None:
+        """
+        Stop the process. A later call would start a new one.
+        """
+        with self._lock:
+            self._close_locked()
+
+
+_session: Optional[RpcSession] = None
+
+
+def get_rpc_session() -> RpcSession:
+    """
+    The RPC session shared by all calls of this fastlint invocation.
+    """
+    global _session
+    if _session is None:
+        _session = RpcSession()
+    return _session
+
+
+##############################################################################
+# Entry point
+##############################################################################
+T = TypeVar("T")
+
+
+def rpc_call(call: out.FunctionCall, cls: Type[T]) -> Optional[T]:
+    call_str = call.to_json_string().strip()
+    ret_str = get_rpc_session().call(call_str)
+    if ret_str is None:
+        logger.error(f"Unable to read RPC response")
+        return None
+    ret = _parse_function_return(ret_str)
+    if ret is None:
+        # No need to log here, it's handled in the error case of
+        # _parse_function_return
+        return None
+    # Any request can return an error
+    if isinstance(ret.value, out.RetError):
+        err: str = ret.value.value
+        logger.error(f"RPC response indicated an error: {err}")
+        return None
+    # Check that we got the correct kind of response
+    if isinstance(ret.value, cls):
+        return ret.value
+    else:
+        logger.error(f"Received an incorrect kind of RPC response")
+        return None
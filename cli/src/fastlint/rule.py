@@ -1,9 +1,12 @@
 import hashlib
 import json
+import threading
+from functools import cached_property
 from typing import Any
 from typing import AnyStr
 from typing import cast
 from typing import Dict
+from typing import FrozenSet
 from typing import List
 from typing import Optional
 from typing import Sequence
@@ -26,6 +29,15 @@ from fastlint.fastlint_types import SEARCH_MODE
 
 
 class Rule:
+    """
+    A rule, as loaded from a config. Rules must not be modified once loaded,
+    except by rename_id(), since what is derived from their content is
+    computed only once.
+    """
+
+    # the cached_property attributes depending on the content of the rule
+    _CACHED = ("full_hash", "matching_hash", "formula_string")
+
     def __init__(
         self, raw: Dict[str, Any], yaml: Optional[YamlTree[YamlMap]] = None
     ) -> None:
@@ -113,10 +125,16 @@ class Rule:
             )
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, type(self)):
             return False
 
-        return self._raw == other._raw
+        return (
+            self._id == other._id
+            and self.full_hash == other.full_hash
+            and self.metadata == other.metadata
+        )
 
     def __hash__(self) -> int:
         return hash(self.id)
@@ -181,18 +199,18 @@ class Rule:
         else:
             return []
 
-    @property
-    def ecosystems(self) -> Set[Ecosystem]:
+    @cached_property
+    def ecosystems(self) -> FrozenSet[Ecosystem]:
         if "r2c-internal-project-depends-on" in self._raw:
             depends_on = self._raw["r2c-internal-project-depends-on"]
             if "depends-on-either" in depends_on:
                 dependencies: List[Dict[str, str]] = depends_on["depends-on-either"]
-                return {
+                return frozenset(
                     Ecosystem.from_json(d["namespace"].lower()) for d in dependencies
-                }
+                )
             else:
-                return {Ecosystem.from_json(depends_on["namespace"].lower())}
-        return set()
+                return frozenset({Ecosystem.from_json(depends_on["namespace"].lower())})
+        return frozenset()
 
     @property
     def languages(self) -> List[Language]:
@@ -226,8 +244,10 @@ class Rule:
     def rename_id(self, new_id: str) -> None:
         self._id = new_id
         self._raw["id"] = new_id
+        for name in self._CACHED:
+            self.__dict__.pop(name, None)
 
-    @property
+    @cached_property
     def full_hash(self) -> str:
         """
         sha256 hash of the whole rule object instead of just the id.
@@ -240,6 +260,22 @@ class Rule:
             json.dumps(rule_dict, sort_keys=True).encode()
         ).hexdigest()
 
+    @cached_property
+    def matching_hash(self) -> str:
+        """
+        sha256 hash of what fastlint-core needs to produce the matches of the
+        rule, i.e. everything but the id and the metadata.
+
+        Rules with the same matching_hash have the same matches, modulo their
+        check_id.
+        """
+        rule_dict = self._raw.copy()
+        rule_dict.pop("id", None)
+        rule_dict.pop("metadata", None)
+        return hashlib.sha256(
+            json.dumps(rule_dict, sort_keys=True).encode()
+        ).hexdigest()
+
     @property
     def should_run_on_fastlint_core(self) -> bool:
         """
@@ -249,7 +285,7 @@ class Rule:
         """
         return any(key in RuleValidation.PATTERN_KEYS for key in self._raw)
 
-    @property
+    @cached_property
     def product(self) -> out.Product:
         if "r2c-internal-project-depends-on" in self._raw:
             return out.Product(out.SCA())
@@ -279,7 +315,7 @@ class Rule:
     def from_transient_scan(self) -> bool:
         return self.scan_source == RuleScanSource.previous_scan
 
-    @property
+    @cached_property
     def formula_string(self) -> str:
         """
         Used to calculate a pattern based ID, works through DFS of all
@@ -331,8 +367,24 @@ class Rule:
         return res
 
 
-def rule_without_metadata(rule: Rule) -> Rule:
-    """Key used to deduplicate rules."""
-    new_rule = Rule(rule._raw.copy())
-    new_rule._raw.pop("metadata", None)
-    return new_rule
+class RuleRegistry:
+    """
+    The rules of the current run, by id.
+
+    Interning the rules once loaded, so that equal rules are the same
+    object, makes comparing them, and looking them up in sets and dicts,
+    a pointer comparison.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_id: Dict[str, List[Rule]] = {}
+
+    def intern(self, rule: Rule) -> Rule:
+        with self._lock:
+            rules = self._by_id.setdefault(rule.id, [])
+            for known in rules:
+                if known == rule:
+                    return known
+            rules.append(rule)
+            return rule
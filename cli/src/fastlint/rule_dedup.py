@@ -0,0 +1,79 @@
+##############################################################################
+# Prelude
+##############################################################################
+# Running each distinct rule only once.
+#
+# Overlapping packs (e.g. --config p/default --config p/python) often contain
+# the same rule under different ids. Config.get_rules() only removes the
+# copies with the same id, so the others used to be planned and matched by
+# fastlint-core separately.
+#
+# With --dedup-rules, the rules are grouped by Rule.matching_hash, which
+# ignores their id and metadata. Only the first rule of each group is passed
+# to fastlint-core, and its matches are copied for the other rules of the
+# group (its aliases) before being converted to RuleMatch objects, so nosem,
+# autofix and the outputs see the same findings as without deduplication.
+#
+# The message, severity and fix are part of the hash because fastlint-core
+# interpolates them in the matches. For the same reason, rules whose metadata
+# mentions a metavariable are never deduplicated.
+#
+# Note that the errors and the profiling data of fastlint-core only mention
+# the first rule of each group.
+import dataclasses
+import json
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Sequence
+from typing import Tuple
+
+import fastlint.fastlint_interfaces.fastlint_output_v1 as out
+from fastlint.rule import Rule
+
+
+def _may_interpolate_metadata(rule: Rule) -> bool:
+    return "$" in json.dumps(rule.metadata)
+
+
+def dedup_rules(rules: Sequence[Rule]) -> Tuple[List[Rule], Dict[str, List[Rule]]]:
+    """
+    The rules to pass to fastlint-core, in the order of `rules`, and the
+    other rules of the group of each of them, by id.
+    """
+    unique: List[Rule] = []
+    first_by_hash: Dict[str, Rule] = {}
+    aliases: Dict[str, List[Rule]] = {}
+    for rule in rules:
+        if _may_interpolate_metadata(rule):
+            unique.append(rule)
+            continue
+        first = first_by_hash.setdefault(rule.matching_hash, rule)
+        if first is rule:
+            unique.append(rule)
+        else:
+            aliases.setdefault(first.id, []).append(rule)
+    return unique, aliases
+
+
+def add_alias_matches(
+    core_output: out.CoreOutput, aliases: Mapping[str, Sequence[Rule]]
+) -> out.CoreOutput:
+    """
+    `core_output` with a copy of each match for each alias of its rule.
+    """
+    if not aliases:
+        return core_output
+    results = list(core_output.results)
+    for match in core_output.results:
+        for alias in aliases.get(match.check_id.value, ()):
+            results.append(
+                dataclasses.replace(
+                    match,
+                    check_id=alias.id2,
+                    # fastlint-core only echoes the metadata of the first rule,
+                    # core_matches_to_rule_matches() uses the one of the alias
+                    extra=dataclasses.replace(match.extra, metadata=None),
+                )
+            )
+    return dataclasses.replace(core_output, results=results)
@@ -1,5 +1,7 @@
+import hashlib
 import json
 import re
+import threading
 from io import StringIO
 from pathlib import Path
 from typing import Any
@@ -22,6 +24,7 @@ from packaging.version import Version
 from ruamel.yaml import MappingNode
 from ruamel.yaml import Node
 from ruamel.yaml import RoundTripConstructor
+from ruamel.yaml import SafeConstructor
 from ruamel.yaml import YAML
 
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
@@ -31,6 +34,7 @@ from fastlint.constants import PLEASE_FILE_ISSUE_TEXT
 from fastlint.error import OK_EXIT_CODE
 from fastlint.error import FastlintCoreError
 from fastlint.error import FastlintError
+from fastlint.error_location import SourceFileHash
 from fastlint.error_location import SourceTracker
 from fastlint.error_location import Span
 from fastlint.rpc_call import validate as rpc_validate
@@ -48,6 +52,13 @@ class EmptyYamlException(Exception):
 
 class RuleSchema:
     _schema: Dict[str, Any] = {}
+    _validator: Optional[Draft7Validator] = None
+    # Hashes of the rules found valid so far, with the rest of their config.
+    # Registry packs share most of their rules, so a rule is usually
+    # validated only once per run.
+    _valid_rules: Set[str] = set()
+    # The validator is shared by the configs resolved concurrently
+    _lock = threading.Lock()
 
     @classmethod
     def get(cls) -> Dict[str, Any]:
@@ -65,6 +76,65 @@ class RuleSchema:
                 cls._schema = yaml.load(fd)
         return cls._schema
 
+    @classmethod
+    def _get_validator(cls) -> Draft7Validator:
+        if cls._validator is None:
+            schema = cls.get()
+            Draft7Validator.check_schema(schema)
+            cls._validator = Draft7Validator(schema)
+        return cls._validator
+
+    @classmethod
+    def validate(cls, config: Any) -> None:
+        """
+        Like jsonschema.validate(config, RuleSchema.get(), cls=Draft7Validator),
+        but with a validator created once, and rule by rule, so that the
+        rules found valid before are not validated again.
+
+        :raise jsonschema.ValidationError: for the first invalid rule
+        """
+        rules = config.get("rules") if isinstance(config, dict) else None
+        with cls._lock:
+            validator = cls._get_validator()
+            if not isinstance(rules, list) or not rules:
+                error = jsonschema.exceptions.best_match(validator.iter_errors(config))
+                if error is not None:
+                    raise error
+                return
+
+            rest = {k: v for k, v in config.items() if k != "rules"}
+            for i, rule in enumerate(rules):
+                key = _rule_key(rest, rule)
+                if key is not None and key in cls._valid_rules:
+                    continue
+                error = jsonschema.exceptions.best_match(
+                    validator.iter_errors({**rest, "rules": [rule]})
+                )
+                if error is not None:
+                    # the path of the error is in the config with only this
+                    # rule, i.e. starts with ["rules", 0]
+                    root_error = error
+                    while root_error.parent is not None:
+                        root_error = cast(jsonschema.ValidationError, root_error.parent)
+                    path = root_error.relative_path
+                    if len(path) >= 2 and path[0] == "rules":
+                        path[1] = i
+                    raise error
+                if key is not None:
+                    cls._valid_rules.add(key)
+
+
+def _rule_key(rest: Dict[str, Any], rule: Any) -> Optional[str]:
+    """
+    None if the rule can't be serialized to JSON, e.g. if it contains YAML
+    dates, in which case its validation is not cached.
+    """
+    try:
+        serialized = json.dumps([rest, rule], sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
 
 EmptySpan = Span.from_string("a: b")
 
@@ -178,83 +248,116 @@ class YamlMap:
         return self._internal.keys()
 
 
-def parse_yaml_preserve_spans(
-    contents: str, filename: Optional[str], allow_null: bool = False
-) -> Optional[YamlTree]:
+# this uses the `RoundTripConstructor` which inherits from `SafeConstructor`
+class SpanPreservingRuamelConstructor(RoundTripConstructor):
     """
-    parse yaml into a YamlTree object. The resulting spans are tracked in SourceTracker
-    so they can be used later when constructing error messages or displaying context.
-
-    :raise jsonschema.exceptions.SchemaError: if config is invalid
+    Builds a YamlTree, with the span of each node, instead of plain values.
+    `source_hash`, `filename` and `allow_null` are set by
+    parse_yaml_preserve_spans() before loading.
     """
 
-    source_hash = SourceTracker.add_source(contents)
-
-    # this uses the `RoundTripConstructor` which inherits from `SafeConstructor`
-    class SpanPreservingRuamelConstructor(RoundTripConstructor):
-        def construct_object(self, node: Node, deep: bool = False) -> YamlTree:
-            r = super().construct_object(node, deep)
-
-            # Check for duplicate mapping keys.
-            # This -should- be caught and raised by ruamel.yaml.
-            # However, resetting the constructor below, where the line
-            # reads yaml.Constructor = SpanPreservingRuamelConstructor,
-            # causes ruamel's DuplicateKeyError not to be raised.
-            # This is a quick implementation that will check MappingNodes
-            #
-            if isinstance(node, MappingNode):
-                from fastlint.error import InvalidRuleSchemaError
-
-                kv_pairs: List[Tuple[Node, Node]] = [t for t in node.value]
-                uniq_key_names: Set[str] = {t[0].value for t in kv_pairs}
-                # If the number of unique key names is less than the number
-                # of key-value nodes, then there's a duplicate key
-                if len(uniq_key_names) < len(kv_pairs):
-                    raise InvalidRuleSchemaError(
-                        short_msg="Detected duplicate key",
-                        long_msg=f"Detected duplicate key name, one of {list(sorted(uniq_key_names))}.",
-                        spans=[
-                            Span.from_node(
-                                node, source_hash=source_hash, filename=filename
-                            ).with_context(before=1, after=1)
-                        ],
-                    )
-
-            if r is None and not allow_null:
-                # This was originally intended only for parsing fastlint rules
-                # but we use it for yaml based lockfiles now too, and those can have null in them
-                from fastlint.error import InvalidRuleSchemaError
-
-                Span.from_node(node, source_hash=source_hash, filename=filename)
+    source_hash: SourceFileHash
+    filename: Optional[str] = None
+    allow_null: bool = False
+
+    def construct_object(self, node: Node, deep: bool = False) -> YamlTree:
+        r = super().construct_object(node, deep)
+
+        # Check for duplicate mapping keys.
+        # This -should- be caught and raised by ruamel.yaml.
+        # However, resetting the constructor below, where the line
+        # reads yaml.Constructor = SpanPreservingRuamelConstructor,
+        # causes ruamel's DuplicateKeyError not to be raised.
+        # This is a quick implementation that will check MappingNodes
+        #
+        if isinstance(node, MappingNode):
+            from fastlint.error import InvalidRuleSchemaError
+
+            kv_pairs: List[Tuple[Node, Node]] = [t for t in node.value]
+            uniq_key_names: Set[str] = {t[0].value for t in kv_pairs}
+            # If the number of unique key names is less than the number
+            # of key-value nodes, then there's a duplicate key
+            if len(uniq_key_names) < len(kv_pairs):
                 raise InvalidRuleSchemaError(
-                    short_msg="null values prohibited",
-                    long_msg="In fastlint YAML configuration, null values are prohibited",
-                    spans=[
-                        Span.from_node(
-                            node, source_hash=source_hash, filename=filename
-                        ).with_context(before=1, after=1)
-                    ],
+                    short_msg="Detected duplicate key",
+                    long_msg=f"Detected duplicate key name, one of {list(sorted(uniq_key_names))}.",
+                    spans=[self._span(node).with_context(before=1, after=1)],
                 )
 
-            if isinstance(r, dict):
-                r = YamlMap(r)
-            return YamlTree(
-                r, Span.from_node(node, source_hash=source_hash, filename=filename)
+        if r is None and not self.allow_null:
+            # This was originally intended only for parsing fastlint rules
+            # but we use it for yaml based lockfiles now too, and those can have null in them
+            from fastlint.error import InvalidRuleSchemaError
+
+            raise InvalidRuleSchemaError(
+                short_msg="null values prohibited",
+                long_msg="In fastlint YAML configuration, null values are prohibited",
+                spans=[self._span(node).with_context(before=1, after=1)],
             )
 
-        def construct_yaml_timestamp(
-            self, node: Node, values: Optional[List[Any]] = None
-        ) -> Any:
-            """Load YAML timestamps as strings"""
-            return self.construct_yaml_str(node)  # type: ignore ## missing from ruamel stub
+        if isinstance(r, dict):
+            r = YamlMap(r)
+        return YamlTree(r, self._span(node))
 
-    SpanPreservingRuamelConstructor.add_constructor(  # type: ignore ## missing from ruamel stub
-        "tag:yaml.org,2002:timestamp",
-        SpanPreservingRuamelConstructor.construct_yaml_timestamp,
-    )
+    def _span(self, node: Node) -> Span:
+        return Span.from_node(
+            node, source_hash=self.source_hash, filename=self.filename
+        )
+
+    def construct_yaml_timestamp(
+        self, node: Node, values: Optional[List[Any]] = None
+    ) -> Any:
+        """Load YAML timestamps as strings"""
+        return self.construct_yaml_str(node)  # type: ignore ## missing from ruamel stub
+
+
+SpanPreservingRuamelConstructor.add_constructor(  # type: ignore ## missing from ruamel stub
+    "tag:yaml.org,2002:timestamp",
+    SpanPreservingRuamelConstructor.construct_yaml_timestamp,
+)
+
+
+class PlainRuamelConstructor(SafeConstructor):
+    """
+    Builds plain values, loading timestamps as strings like
+    SpanPreservingRuamelConstructor does.
+    """
+
+    def construct_yaml_timestamp(
+        self, node: Node, values: Optional[List[Any]] = None
+    ) -> Any:
+        return self.construct_yaml_str(node)  # type: ignore ## missing from ruamel stub
+
+
+PlainRuamelConstructor.add_constructor(  # type: ignore ## missing from ruamel stub
+    "tag:yaml.org,2002:timestamp",
+    PlainRuamelConstructor.construct_yaml_timestamp,
+)
+
+
+def parse_yaml_preserve_spans(
+    contents: str,
+    filename: Optional[str],
+    allow_null: bool = False,
+    source_path: Optional[Path] = None,
+) -> Optional[YamlTree]:
+    """
+    parse yaml into a YamlTree object. The resulting spans are tracked in SourceTracker
+    so they can be used later when constructing error messages or displaying context.
+
+    :param source_path: the file `contents` was read from, if SourceTracker can
+        read it again instead of keeping `contents` in memory
+    :raise jsonschema.exceptions.SchemaError: if config is invalid
+    """
+
+    source_hash = SourceTracker.add_source(contents, source_path)
 
     yaml = YAML()
     yaml.Constructor = SpanPreservingRuamelConstructor
+    constructor = yaml.constructor
+    constructor.source_hash = source_hash
+    constructor.filename = filename
+    constructor.allow_null = allow_null
     data = yaml.load(StringIO(contents))
     if data is None:
         return None
@@ -266,6 +369,36 @@ def parse_yaml_preserve_spans(
     return data
 
 
+def _has_null(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return any(_has_null(k) or _has_null(v) for k, v in value.items())
+    if isinstance(value, list):
+        return any(_has_null(x) for x in value)
+    return False
+
+
+def parse_yaml_fast(contents: str) -> Optional[YamlTree]:
+    """
+    parse yaml into a YamlTree object without tracking spans: the values are
+    built by ruamel's safe loader, with libyaml when available, and all get
+    EmptySpan. This is several times faster than parse_yaml_preserve_spans(),
+    which should be used instead to report errors.
+
+    Returns None if the yaml is empty or contains a null value, which
+    parse_yaml_preserve_spans() rejects.
+
+    :raise ruamel.yaml.YAMLError: if the yaml is invalid or has duplicate keys
+    """
+    yaml = YAML(typ="safe")
+    yaml.Constructor = PlainRuamelConstructor
+    data = yaml.load(contents)
+    if _has_null(data):
+        return None
+    return YamlTree.wrap(data, EmptySpan)
+
+
 @tracing.trace()
 def parse_config_preserve_spans(
     contents: str,
@@ -594,7 +727,7 @@ def validate_yaml(
 
         # Now enter the jsonschema validation for the custom error messages
         with tracing.TRACER.start_as_current_span("jsonschema.validate"):
-            jsonschema.validate(data.unroll(), RuleSchema.get(), cls=Draft7Validator)
+            RuleSchema.validate(data.unroll())
         # At this point we have successfully validated the rules
         # and can return any errors
         return errors
@@ -1,5 +1,6 @@
 import binascii
 import hashlib
+import heapq
 import textwrap
 from collections import Counter
 from datetime import datetime
@@ -21,7 +22,7 @@ from attrs import frozen
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
 from fastlint.constants import NOSEM_INLINE_COMMENT_RE
 from fastlint.constants import RuleScanSource
-from fastlint.external.pymmh3 import hash128  # type: ignore[attr-defined]
+from fastlint.murmur3 import hash128
 from fastlint.rule import Rule
 from fastlint.fastlint_interfaces.fastlint_output_v1 import Direct
 from fastlint.fastlint_interfaces.fastlint_output_v1 import Position
@@ -36,6 +37,9 @@ logger = getLogger(__name__)
 
 CliUniqueKey = Tuple[str, str, int, int, str, Optional[str]]
 
+# Same as RuleMatch.ordering_key, but flattened into primitive values
+SortKey = Tuple[str, int, int, int, int, int, int, str, str]
+
 
 def rstrip(value: Optional[str]) -> Optional[str]:
     return value.rstrip() if value is not None else None
@@ -68,8 +72,9 @@ class RuleMatch:
     # but then this would require to remove the @frozen from this class
     # because autofix and dependency_aware and join_rule are actually monkey patching
     # this frozen class.
-    # TODO: redundant with core.extra but we do some monkey patching on
-    # this extra field which prevents to use directly core.extra (immutable)
+    # This is only a small overlay on top of match.extra (immutable) holding
+    # what was monkey patched in. We used to store the whole match.extra.to_json()
+    # here for every finding; use get_full_extra() if you really need that.
     extra: Dict[str, Any] = field(repr=False, factory=dict)
 
     # fields derived from the rule
@@ -100,6 +105,7 @@ class RuleMatch:
     ordering_key: Tuple[str, Position, Position, str, str] = field(
         init=False, repr=False
     )
+    sort_key: SortKey = field(init=False, repr=False)
     match_based_key: Tuple[str, Path, str] = field(init=False, repr=False)
     syntactic_id: str = field(init=False, repr=False)
     match_based_id: str = field(init=False, repr=False)
@@ -286,6 +292,25 @@ class RuleMatch:
             self.message,
         )
 
+    @sort_key.default
+    def get_sort_key(self) -> SortKey:
+        """
+        The ordering_key, flattened into primitive values once and for all so
+        that sorting and merging findings doesn't compare Position objects.
+        """
+        sort_path, start, end, rule_id, message = self.ordering_key
+        return (
+            sort_path,
+            start.line,
+            start.col,
+            start.offset,
+            end.line,
+            end.col,
+            end.offset,
+            rule_id,
+            message,
+        )
+
     @syntactic_id.default
     def get_syntactic_id(self) -> str:
         """
@@ -300,6 +325,35 @@ class RuleMatch:
         hash_bytes = int.to_bytes(hash_int, byteorder="big", length=16, signed=False)
         return str(binascii.hexlify(hash_bytes), "ascii")
 
+    def get_full_extra(self) -> Dict[str, Any]:
+        """
+        The JSON of match.extra, with what was monkey patched in self.extra
+        on top of it.
+
+        This is built on demand, do not call it for every finding unless
+        you are actually outputting that.
+        """
+        return {**self.match.extra.to_json(), **self.extra}
+
+    def get_abstract_match_formula_string(self) -> str:
+        """
+        The formula of the rule, with the metavariables replaced by the
+        abstract content they were bound to in this match.
+        """
+        match_formula_str = self.match_formula_string
+        if self.extra.get("metavars") is not None:
+            metavars = self.extra["metavars"]
+            for metavar in metavars:
+                match_formula_str = match_formula_str.replace(
+                    metavar, metavars[metavar]["abstract_content"]
+                )
+        else:
+            for metavar, value in self.match.extra.metavars.value.items():
+                match_formula_str = match_formula_str.replace(
+                    metavar, value.abstract_content
+                )
+        return match_formula_str
+
     @match_based_key.default
     def get_match_based_key(self) -> Tuple[str, Path, str]:
         """
@@ -313,13 +367,7 @@ class RuleMatch:
             path = self.path.relative_to(Path.cwd())
         except (ValueError, FileNotFoundError):
             path = self.path
-        match_formula_str = self.match_formula_string
-        if self.extra.get("metavars") is not None:
-            metavars = self.extra["metavars"]
-            for metavar in metavars:
-                match_formula_str = match_formula_str.replace(
-                    metavar, metavars[metavar]["abstract_content"]
-                )
+        match_formula_str = self.get_abstract_match_formula_string()
         if self.from_transient_scan:
             # NOTE: We include the previous scan's rules in the config for consistent fixed status work.
             # For unique hashing/grouping, previous and current scan rules must have distinct check IDs.
@@ -376,13 +424,7 @@ class RuleMatch:
         By sending the hash of ONLY the pattern contents, we can determine whether a finding
         has only changed because e.g. the file path changed
         """
-        match_formula_str = self.match_formula_string
-        if self.extra.get("metavars") is not None:
-            metavars = self.extra["metavars"]
-            for metavar in metavars:
-                match_formula_str = match_formula_str.replace(
-                    metavar, metavars[metavar]["abstract_content"]
-                )
+        match_formula_str = self.get_abstract_match_formula_string()
         return hashlib.sha256(match_formula_str.encode()).hexdigest()
 
     @start_line_hash.default
@@ -593,7 +635,7 @@ class RuleMatch:
     def __lt__(self, other: "RuleMatch") -> bool:
         if not isinstance(other, type(self)):
             return NotImplemented
-        return self.ordering_key < other.ordering_key
+        return self.sort_key < other.sort_key
 
 
 class RuleMatches(Iterable[RuleMatch]):
@@ -656,6 +698,30 @@ OrderedRuleMatchList = List[RuleMatch]
 RuleMatchMap = Dict["Rule", OrderedRuleMatchList]
 
 
+def _get_sort_key(match: RuleMatch) -> SortKey:
+    return match.sort_key
+
+
+def sort_findings(rule_matches: Iterable[RuleMatch]) -> OrderedRuleMatchList:
+    """
+    Sort findings according to RuleMatch.get_ordering_key().
+
+    This is linear on findings that are already in order, e.g., coming from
+    merge_findings(), so consumers can call it defensively.
+    """
+    return sorted(rule_matches, key=_get_sort_key)
+
+
+def merge_findings(runs: Iterable[Iterable[RuleMatch]]) -> Iterator[RuleMatch]:
+    """
+    Merge runs of findings, each already in order (e.g., the values of a
+    RuleMatchMap), into a single ordered stream without sorting again.
+
+    Findings comparing equal keep the order of their runs.
+    """
+    return heapq.merge(*runs, key=_get_sort_key)
+
+
 def remove_content_call(x: out.MatchCallTrace) -> out.MatchCallTrace:
     if isinstance(x.value, out.CliLoc):
         value = out.CliLoc(value=remove_content_loc(x.value.value))
@@ -0,0 +1,97 @@
+##############################################################################
+# Prelude
+##############################################################################
+# The rules of a scan, serialized once for all the consumers of the rules
+# file: the fastlint-core run and the SARIF formatter.
+#
+# Serializing thousands of rules with json.dumps(indent=2, sort_keys=True)
+# takes seconds, and we used to do it once for the core run and then once
+# more for each SARIF output.
+import atexit
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+
+from fastlint.rule import Rule
+
+# How many sets of rules we keep serialized. A scan normally has one, plus
+# possibly a subset of it for outputs only showing some severities.
+MAX_ENTRIES = 2
+
+
+def serialize_rules(rules: Iterable[Rule]) -> str:
+    """
+    The content of the rules file passed to fastlint-core with -rules.
+    """
+    return json.dumps(
+        {"rules": [rule._raw for rule in rules]}, indent=2, sort_keys=True
+    )
+
+
+class RulesBlobCache:
+    """
+    The serialization of the last few sets of rules, and the temporary rules
+    files written for them.
+
+    Entries are keyed on the set of rules, so the order of the rules in the
+    file is the one of the first request for a given set.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._blobs: "OrderedDict[FrozenSet[Rule], str]" = OrderedDict()
+        self._paths: Dict[FrozenSet[Rule], Path] = {}
+
+    def get(self, rules: Iterable[Rule]) -> str:
+        rule_list = list(rules)
+        key = frozenset(rule_list)
+        with self._lock:
+            blob = self._blobs.get(key)
+            if blob is None:
+                blob = serialize_rules(rule_list)
+                self._blobs[key] = blob
+                while len(self._blobs) > MAX_ENTRIES:
+                    evicted, _ = self._blobs.popitem(last=False)
+                    self._remove_path(evicted)
+            else:
+                self._blobs.move_to_end(key)
+            return blob
+
+    def path(self, rules: Iterable[Rule]) -> Path:
+        """
+        A rules file for `rules`, valid until clear() or the end of the
+        program.
+        """
+        rule_list = list(rules)
+        blob = self.get(rule_list)
+        key = frozenset(rule_list)
+        with self._lock:
+            path = self._paths.get(key)
+            if path is None:
+                fd, name = tempfile.mkstemp(prefix="fastlint_rules_", suffix=".json")
+                with os.fdopen(fd, "w") as f:
+                    f.write(blob)
+                path = Path(name)
+                if not self._paths:
+                    atexit.register(self.clear)
+                self._paths[key] = path
+            return path
+
+    def _remove_path(self, key: FrozenSet[Rule]) -> None:
+        path = self._paths.pop(key, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+        if not self._paths:
+            atexit.unregister(self.clear)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blobs.clear()
+            for key in list(self._paths):
+                self._remove_path(key)
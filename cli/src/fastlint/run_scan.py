@@ -29,6 +29,7 @@ from typing import Optional
 from typing import Sequence
 from typing import Set
 from typing import Tuple
+from typing import TYPE_CHECKING
 from typing import Union
 
 from boltons.iterutils import partition
@@ -74,7 +75,7 @@ from fastlint.profile_manager import ProfileManager
 from fastlint.resolve_subprojects import resolve_subprojects
 from fastlint.rpc_call import dump_rule_partitions
 from fastlint.rule import Rule
-from fastlint.rule_match import RuleMatches
+from fastlint.rule_match import merge_findings
 from fastlint.rule_match import RuleMatchMap
 from fastlint.fastlint_interfaces.fastlint_metrics import Any_ as AnySecretsOrigin
 from fastlint.fastlint_interfaces.fastlint_metrics import CodeConfig
@@ -100,6 +101,9 @@ from fastlint.util import flatten
 from fastlint.util import unit_str
 from fastlint.verbose_logging import getLogger
 
+if TYPE_CHECKING:
+    from fastlint.join_rule import PreparedJoinRule
+
 
 logger = getLogger(__name__)
 
@@ -254,6 +258,7 @@ def run_rules(
     ptt_enabled: bool = False,
     resolve_all_deps_in_diff_scan: bool = False,
     x_tr: bool = False,
+    disable_nosem: bool = False,
 ) -> Tuple[
     RuleMatchMap,
     List[FastlintError],
@@ -329,8 +334,9 @@ def run_rules(
             dependency_aware_rules, resolved_subprojects
         )
 
+    dependency_aware_rule_set = set(dependency_aware_rules)
     rest_of_the_rules = [
-        r for r in rest_of_the_rules if r not in dependency_aware_rules
+        r for r in rest_of_the_rules if r not in dependency_aware_rule_set
     ] + filtered_dependency_aware_rules
 
     cli_ux = get_state().get_cli_ux_flavor()
@@ -345,6 +351,23 @@ def run_rules(
         with_supply_chain=with_supply_chain,
     )
 
+    # The rules of the join rules are run by fastlint-core along with the
+    # other rules, then the join conditions are evaluated on their findings.
+    prepared_join_rules: List["PreparedJoinRule"] = []
+    if join_rules:
+        from fastlint.join_rule import PreparedJoinRule
+
+        for rule in join_rules:
+            prepared_join_rule, join_rule_errors = PreparedJoinRule.prepare(rule)
+            output_handler.handle_fastlint_errors(join_rule_errors)
+            if prepared_join_rule is not None:
+                prepared_join_rules.append(prepared_join_rule)
+    join_rule_parts = [
+        part
+        for prepared_join_rule in prepared_join_rules
+        for part in prepared_join_rule.core_rules.values()
+    ]
+
     # Dispatching to fastlint-core!
     (
         rule_matches_by_rule,
@@ -352,7 +375,7 @@ def run_rules(
         output_extra,
     ) = core_runner.invoke_fastlint_core(
         target_manager,
-        rest_of_the_rules,
+        rest_of_the_rules + join_rule_parts,
         dump_command_for_core,
         time_flag,
         matching_explanations,
@@ -364,24 +387,12 @@ def run_rules(
         resolved_subprojects,
     )
 
-    if join_rules:
-        import fastlint.join_rule as join_rule
-
-        for rule in join_rules:
-            join_rule_matches, join_rule_errors = join_rule.run_join_rule(
-                rule.raw,
-                [scanning_root.path for scanning_root in target_manager.scanning_roots],
-                allow_local_builds=allow_local_builds,
-                ptt_enabled=ptt_enabled,
-            )
-            join_rule_matches_set = RuleMatches(rule)
-            for m in join_rule_matches:
-                join_rule_matches_set.add(m)
-            join_rule_matches_by_rule = {
-                Rule.from_json(rule.raw): list(join_rule_matches_set)
-            }
-            rule_matches_by_rule.update(join_rule_matches_by_rule)
-            output_handler.handle_fastlint_errors(join_rule_errors)
+    for prepared_join_rule in prepared_join_rules:
+        rule_matches_by_rule[prepared_join_rule.rule] = prepared_join_rule.evaluate(
+            rule_matches_by_rule, disable_nosem=disable_nosem
+        )
+    for part in join_rule_parts:
+        rule_matches_by_rule.pop(part, None)
 
     if len(dependency_aware_rules) > 0:
         from fastlint.dependency_aware_rule import (
@@ -551,6 +562,7 @@ def run_scan(
     allow_untrusted_validators: bool = False,
     severity: Optional[Sequence[str]] = None,
     optimizations: str = "none",
+    dedup_rules: bool = False,
     baseline_commit: Optional[str] = None,
     baseline_commit_is_mergebase: bool = False,
     x_ls: bool = False,
@@ -797,6 +809,7 @@ def run_scan(
         respect_rule_paths=respect_rule_paths,
         path_sensitive=path_sensitive,
         symbol_analysis=symbol_analysis,
+        dedup_rules=dedup_rules,
     )
 
     experimental_rules, normal_rules = partition(
@@ -846,6 +859,7 @@ def run_scan(
         ptt_enabled=ptt_enabled,
         resolve_all_deps_in_diff_scan=resolve_all_deps_in_diff_scan,
         x_tr=x_tr,
+        disable_nosem=disable_nosem,
     )
     profiler.save("core_time", core_start_time)
     fastlint_errors: List[FastlintError] = config_errors + scan_errors
@@ -989,6 +1003,7 @@ def run_scan(
                         baseline_target_mode_config,
                         allow_local_builds=allow_local_builds,
                         ptt_enabled=ptt_enabled,
+                        disable_nosem=disable_nosem,
                     )
                     rule_matches_by_rule = remove_matches_in_baseline(
                         rule_matches_by_rule,
@@ -1053,7 +1068,7 @@ def run_scan(
     )
 
 
-# This is called from join_rule.py and test.py (and maybe tools wrapping
+# This is called from test.py (and maybe tools wrapping
 # fastlint)
 # old: this used to be called fastlint.fastlint_main.invoke_fastlint()
 # and was part of an unofficial Python API but external users should
@@ -1099,9 +1114,9 @@ def run_scan_and_return_json(
     )
 
     output_handler.rules = frozenset(filtered_rules)
-    output_handler.rule_matches = [
-        m for ms in filtered_matches_by_rule.values() for m in ms
-    ]
+    output_handler.rule_matches = list(
+        merge_findings(filtered_matches_by_rule.values())
+    )
     output_handler.profiler = profiler
     output_handler.severities = shown_severities
     output_handler.explanations = output_extra.core.explanations
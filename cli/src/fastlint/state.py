@@ -11,6 +11,8 @@ from fastlint.app.session import AppSession
 from fastlint.env import Env
 from fastlint.error_handler import ErrorHandler
 from fastlint.metrics import Metrics
+from fastlint.rule import RuleRegistry
+from fastlint.rules_blob import RulesBlobCache
 from fastlint.fastlint_types import get_frozen_id
 from fastlint.settings import Settings
 from fastlint.terminal import Terminal
@@ -40,6 +42,8 @@ class FastlintState:
     settings: Settings = Factory(Settings)
     terminal: Terminal = Factory(Terminal)
     traces: Traces = Factory(Traces)
+    rules_blob_cache: RulesBlobCache = Factory(RulesBlobCache)
+    rule_registry: RuleRegistry = Factory(RuleRegistry)
 
     @staticmethod
     def get_cli_ux_flavor() -> DesignTreatment:
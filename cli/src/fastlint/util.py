@@ -1,5 +1,4 @@
 import functools
-import itertools
 import operator
 import os
 import subprocess
@@ -9,6 +8,7 @@ from pathlib import Path
 from typing import Any
 from typing import Callable
 from typing import FrozenSet
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Sequence
@@ -259,6 +259,24 @@ def truncate(file_name: str, col_lim: int) -> str:
     return file_name
 
 
+def path_sort_key(path: str) -> List[str]:
+    """
+    Sort key for paths as strings giving the same order as sorted() on
+    Path objects, i.e. component by component.
+    """
+    return os.path.normcase(path).split(os.sep)
+
+
+def sort_paths(paths: Iterable[Path]) -> List[str]:
+    """
+    The paths as strings, in the order of sorted(paths).
+
+    Comparing Path objects is slow, sorting 500k of them means millions of
+    calls to Path.__lt__, while this compares lists of strings natively.
+    """
+    return sorted(map(str, paths), key=path_sort_key)
+
+
 def flatten(some_list: List[List[T]]) -> List[T]:
     return functools.reduce(operator.iconcat, some_list, [])
 
@@ -297,21 +315,14 @@ def get_lines_from_file(
     """
     Return lines in the given file.
 
-    Assumes file exists.
-    """
-    # Start and end line are one-indexed, but the subsequent slice call is
-    # inclusive for start and exclusive for end, so only subtract from start
-    start_line = start_line - 1
-
-    if start_line == -1 and end_line == 0:
-        # Completely empty file
-        return []
+    Start and end line are one-indexed and inclusive. The file is read and
+    its lines indexed once per scan, see fastlint.line_index.
 
-    # buffering=1 turns on line-level reads
-    with path.open(buffering=1, errors="replace") as fd:
-        result = list(itertools.islice(fd, start_line, end_line))
+    A file which doesn't exist (anymore) has no lines.
+    """
+    from fastlint.line_index import get_line_index_cache  # avoiding circular imports
 
-    return result
+    return get_line_index_cache().get_file_lines(path, start_line, end_line)
 
 
 def get_lines_from_git_blob(
@@ -323,23 +334,14 @@ def get_lines_from_git_blob(
     Return lines in the given git blob. Result is cached since calling git
     multiple times may be expensive and the contents of a blob are stable
     (addressed by sha), since (among other reasons) the sha is directly related
-    to the content.
+    to the content. Blobs are read through a single `git cat-file --batch`
+    process, see fastlint.git_blob.
 
     Assumes blob exists.
     """
-    # Avoid circular import
-    from fastlint.git import git_check_output
-
-    # Start and end line are one-indexed, but the subsequent slice call is
-    # inclusive for start and exclusive for end, so only subtract from start
-    start_line = start_line - 1
-
-    if start_line == -1 and end_line == 0:
-        # Completely empty file
-        return []
+    from fastlint.line_index import get_line_index_cache  # avoiding circular imports
 
-    contents = git_check_output(["git", "cat-file", "blob", blob_sha.value])
-    return list(itertools.islice(contents.splitlines(), start_line, end_line))
+    return get_line_index_cache().get_blob_lines(blob_sha.value, start_line, end_line)
 
 
 def with_feature_status(*, enabled: bool = False) -> str:
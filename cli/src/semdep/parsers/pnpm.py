@@ -471,7 +471,7 @@ def parse_pnpm(
         DependencyFileToParse(
             lockfile_path,
             lambda text: parse_yaml_preserve_spans(
-                text, str(lockfile_path), allow_null=True
+                text, str(lockfile_path), allow_null=True, source_path=lockfile_path
             ),
             ScaParserName(out.PPnpmLock()),
         ),
@@ -30,7 +30,7 @@ def parse_pubspec_lock(
         DependencyFileToParse(
             lockfile_path,
             lambda text: parse_yaml_preserve_spans(
-                text, str(lockfile_path), allow_null=True
+                text, str(lockfile_path), allow_null=True, source_path=lockfile_path
             ),
             ScaParserName(out.PPubspecLock()),
         ),
@@ -11,13 +11,16 @@ class Node(NamedTuple):
 class MappingNode:
     value: Any
 
-class RoundTripConstructor:
+class SafeConstructor:
     def construct_object(self, node: Node, deep: bool = False) -> Any: ...
 
+class RoundTripConstructor(SafeConstructor): ...
+
 def safe_load(stream: Any) -> Any: ...
 
 class YAML:
     Constructor: Any
+    constructor: Any
     representer: Any
 
     def __init__(self, typ: str = "rt"):
@@ -252,6 +252,8 @@ ALWAYS_MASK: Maskers = (
     re.compile(r"python (\d+[.]\d+[.]\d+[ ]+)"),
     re.compile(r'FASTLINT_SETTINGS_FILE="(.+?)"'),
     re.compile(r'FASTLINT_VERSION_CACHE_PATH="(.+?)"'),
+    re.compile(r'FASTLINT_CONFIG_CACHE_PATH="(.+?)"'),
+    re.compile(r'FASTLINT_CONFIG_HTTP_CACHE_PATH="(.+?)"'),
     # Dates
     re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:(?:\.\d+)?Z)?"),
     # Hide any substring that resembles a temporary file path.
@@ -440,6 +442,12 @@ def _run_fastlint(
                 env["FASTLINT_SETTINGS_FILE"] = unique_settings_file
             if "FASTLINT_VERSION_CACHE_PATH" not in env:
                 env["FASTLINT_VERSION_CACHE_PATH"] = tempfile.TemporaryDirectory().name
+            if "FASTLINT_CONFIG_CACHE_PATH" not in env:
+                env["FASTLINT_CONFIG_CACHE_PATH"] = tempfile.TemporaryDirectory().name
+            if "FASTLINT_CONFIG_HTTP_CACHE_PATH" not in env:
+                env["FASTLINT_CONFIG_HTTP_CACHE_PATH"] = (
+                    tempfile.TemporaryDirectory().name
+                )
             if "FASTLINT_ENABLE_VERSION_CHECK" not in env:
                 env["FASTLINT_ENABLE_VERSION_CHECK"] = "0"
             if force_metrics_off and "FASTLINT_SEND_METRICS" not in env:
@@ -555,6 +563,24 @@ def _run_fastlint(
 #
 
 
+@pytest.fixture(autouse=True)
+def isolated_config_caches(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    # Otherwise a config downloaded, mocked or parsed in a test could be
+    # reused from the cache by the next ones, and the tests would write to
+    # the cache of the user.
+    monkeypatch.setattr(
+        "fastlint.config_http_cache._cache_dir", lambda: tmp_path / "config_http"
+    )
+    monkeypatch.setattr("fastlint.config_cache._cache_dir", lambda: tmp_path / "config")
+
+
+@pytest.fixture(autouse=True)
+def isolated_line_index_cache(monkeypatch: pytest.MonkeyPatch):
+    # Otherwise the lines of a file read, or mocked, in a test could be
+    # reused by the next ones.
+    monkeypatch.setattr("fastlint.line_index._cache", None)
+
+
 @pytest.fixture
 def run_fastlint() -> fixtures.RunFastlint:
     return _run_fastlint
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from tests.fixtures import RunFastlint
 
@@ -82,3 +84,46 @@ def test_recursive(run_fastlint_in_tmp: RunFastlint, snapshot, rule, target):
         run_fastlint_in_tmp(rule, target_name=target, is_logged_in_weak=True).stdout,
         "results.json",
     )
+
+
+@pytest.mark.kinda_slow
+@pytest.mark.osemfail
+def test_several_join_rules(run_fastlint_in_tmp: RunFastlint):
+    # The rules of both join rules are run by the same fastlint-core call as
+    # the other rules, and only the findings of the join rules are reported.
+    output = run_fastlint_in_tmp(
+        [
+            "rules/join_rules/user-input-escaped-with-safe.yaml",
+            "rules/join_rules/multiple-rules.yaml",
+        ],
+        target_name="join_rules/user-input-with-unescaped-extension",
+        options=["targets/join_rules/user-input-escaped-with-safe"],
+        is_logged_in_weak=True,
+    ).stdout
+
+    assert {result["check_id"] for result in json.loads(output)["results"]} == {
+        "rules.join_rules.user-input-escaped-with-safe",
+        "rules.join_rules.user-input-with-unescaped-extension",
+        "rules.join_rules.print",
+    }
+
+
+@pytest.mark.kinda_slow
+@pytest.mark.osemfail
+@pytest.mark.parametrize(
+    "options,expected",
+    [
+        ([], []),
+        (["--disable-nosem"], ["rules.join_rules.user-input-with-unescaped-extension"]),
+    ],
+)
+def test_nosem(run_fastlint_in_tmp: RunFastlint, options, expected):
+    # The user input is ignored with a nofastlint comment
+    output = run_fastlint_in_tmp(
+        "rules/join_rules/user-input-with-unescaped-extension.yaml",
+        target_name="join_rules/user-input-with-nofastlint",
+        options=options,
+        is_logged_in_weak=True,
+    ).stdout
+
+    assert [result["check_id"] for result in json.loads(output)["results"]] == expected
@@ -0,0 +1,135 @@
+import gzip
+import json
+from array import array
+from io import BytesIO
+
+import pytest
+
+import fastlint.fastlint_interfaces.fastlint_output_v1 as out
+from fastlint.columnar import COLUMNS
+from fastlint.columnar import read_columns
+from fastlint.columnar import StringTable
+from fastlint.columnar import write_columns
+from fastlint.constants import OutputFormat
+from fastlint.output import OutputHandler
+from fastlint.output import OutputSettings
+from fastlint.rule import Rule
+from fastlint.rule_match import RuleMatch
+
+
+def make_row(rule_id, path, line, offset, metadata, is_ignored):
+    return {
+        "rule_id": rule_id,
+        "path": path,
+        "start_line": line,
+        "start_col": 1,
+        "start_offset": offset,
+        "end_line": line,
+        "end_col": 8,
+        "end_offset": offset + 7,
+        "severity": "WARNING",
+        "message": f"{rule_id} matched",
+        "fingerprint": f"{rule_id}:{path}:{line}",
+        "metadata": metadata,
+        "is_ignored": is_ignored,
+    }
+
+
+@pytest.mark.quick
+def test_columnar_round_trip():
+    rows = [
+        make_row("rule.a", "foo.py", 1, 0, '{"cwe": ["CWE-1"]}', 0),
+        make_row("rule.b", "foo.py", 10, 300, "{}", 1),
+        make_row("rule.a", "dir/bår.py", 2**31 - 1, 2**40, '{"cwe": ["CWE-1"]}', 0),
+    ]
+    strings = StringTable()
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    for row in rows:
+        for name, typecode in COLUMNS:
+            value = row[name]
+            columns[name].append(strings.add(value) if typecode == "I" else value)
+
+    buf = BytesIO()
+    write_columns(buf, len(rows), columns, strings)
+    buf.seek(0)
+    findings = read_columns(buf)
+
+    assert len(findings) == 3
+    assert findings.values("rule_id") == ["rule.a", "rule.b", "rule.a"]
+    assert findings.values("end_offset") == [7, 307, 2**40 + 7]
+    # strings are stored once
+    assert findings.columns["rule_id"][0] == findings.columns["rule_id"][2]
+
+    decoded = list(findings.rows())
+    assert [
+        {**row, "metadata": findings.strings[findings.columns["metadata"][i]]}
+        for i, row in enumerate(decoded)
+    ] == rows
+    assert decoded[0]["metadata"] == {"cwe": ["CWE-1"]}
+    assert decoded[0]["metadata"] is decoded[2]["metadata"]
+
+
+@pytest.mark.quick
+def test_read_columns_rejects_other_files():
+    with pytest.raises(ValueError):
+        read_columns(BytesIO(b'{"results": []}'))
+
+
+@pytest.mark.quick
+def test_columnar_output(tmp_path):
+    rule = Rule.from_json(
+        {
+            "id": "rule.a",
+            "pattern": "$X == $X",
+            "languages": ["python"],
+            "severity": "INFO",
+            "message": "bad",
+            "metadata": {"cwe": ["CWE-1"]},
+        }
+    )
+    target = tmp_path / "foo.py"
+    target.write_text("a == a\nb == b\n")
+    matches = [
+        RuleMatch(
+            message="bad",
+            severity=out.MatchSeverity.from_json("INFO"),
+            metadata=rule.metadata,
+            match=out.CoreMatch(
+                check_id=out.RuleId(rule.id),
+                path=out.Fpath(str(target)),
+                start=out.Position(line, 1, (line - 1) * 7),
+                end=out.Position(line, 7, (line - 1) * 7 + 6),
+                extra=out.CoreMatchExtra(
+                    metavars=out.Metavars({}),
+                    engine_kind=out.EngineOfFinding(out.OSS()),
+                    is_ignored=False,
+                ),
+            ),
+        )
+        for line in [1, 2]
+    ]
+    # as with --columnar-output=findings.col.gz --json-output=findings.json
+    columnar_path = tmp_path / "findings.col.gz"
+    json_path = tmp_path / "findings.json"
+    output_handler = OutputHandler(
+        OutputSettings(
+            outputs={
+                str(columnar_path): OutputFormat.COLUMNAR,
+                str(json_path): OutputFormat.JSON,
+            }
+        )
+    )
+
+    output_handler.output({rule: matches}, all_targets={target}, filtered_rules=[])
+
+    with gzip.open(columnar_path, "rb") as fin:
+        findings = read_columns(fin)
+    results = json.loads(json_path.read_text())["results"]
+    assert len(findings) == len(results) == 2
+    assert findings.values("rule_id") == [r["check_id"] for r in results]
+    assert findings.values("path") == [r["path"] for r in results]
+    assert findings.values("start_line") == [r["start"]["line"] for r in results]
+    assert findings.values("fingerprint") == [
+        r["extra"]["fingerprint"] for r in results
+    ]
+    assert [row["metadata"] for row in findings.rows()] == [{"cwe": ["CWE-1"]}] * 2
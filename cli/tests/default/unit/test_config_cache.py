@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+
+from fastlint import config_cache
+from fastlint.config_cache import cache_config
+from fastlint.config_cache import get_cached_config
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_cache, "_cache_dir", lambda: tmp_path)
+    return tmp_path
+
+
+@pytest.mark.quick
+def test_cache_config_round_trip(cache_dir):
+    contents = "rules:\n- id: foo\n"
+    data = {"rules": [{"id": "foo", "languages": ["python"], "severity": "INFO"}]}
+
+    assert get_cached_config(contents) is None
+    cache_config(contents, data)
+
+    assert get_cached_config(contents) == data
+    assert get_cached_config(contents + " ") is None
+    assert get_cached_config(contents, force_jsonschema=True) is None
+
+
+@pytest.mark.quick
+def test_cache_config_skips_non_json_data(cache_dir):
+    cache_config("a", {"rules": [{"metadata": {"date": datetime.date.today()}}]})
+    cache_config("b", {"rules": [{"metadata": {1: "one"}}]})
+
+    assert list(cache_dir.iterdir()) == []
+
+
+@pytest.mark.quick
+def test_cache_config_evicts_old_entries(cache_dir, monkeypatch):
+    monkeypatch.setattr(config_cache, "MAX_ENTRIES", 2)
+    for contents in ["a", "b", "c"]:
+        cache_config(contents, {"rules": []})
+
+    assert len(list(cache_dir.glob("*.json"))) == 2
@@ -0,0 +1,80 @@
+import pytest
+import requests
+
+from fastlint import config_http_cache
+
+URL = "https://fastlint.dev/c/p/default"
+
+
+@pytest.mark.quick
+def test_fresh_response_is_reused_without_request(requests_mock):
+    mocked = requests_mock.get(
+        URL,
+        content=b'{"rule_config": []}',
+        headers={"Cache-Control": "max-age=60", "Content-Type": "text/plain"},
+    )
+
+    first = config_http_cache.request("GET", URL)
+    second = config_http_cache.request("GET", URL)
+
+    assert mocked.call_count == 1
+    assert second.status_code == requests.codes.ok
+    assert second.content == first.content == b'{"rule_config": []}'
+    assert second.headers["Content-Type"] == "text/plain"
+
+
+@pytest.mark.quick
+def test_stale_response_is_revalidated(requests_mock):
+    requests_mock.get(
+        URL,
+        content=b'{"rule_config": []}',
+        headers={"Cache-Control": "no-cache", "ETag": '"v1"'},
+    )
+    config_http_cache.request("GET", URL)
+
+    mocked = requests_mock.get(URL, status_code=requests.codes.not_modified)
+    response = config_http_cache.request("GET", URL)
+
+    assert mocked.last_request.headers["If-None-Match"] == '"v1"'
+    assert response.headers["ETag"] == '"v1"'
+    assert response.status_code == requests.codes.ok
+    assert response.content == b'{"rule_config": []}'
+
+
+@pytest.mark.quick
+def test_stored_response_is_used_offline(requests_mock):
+    requests_mock.get(
+        URL, content=b'{"rule_config": []}', headers={"Cache-Control": "no-cache"}
+    )
+    config_http_cache.request("GET", URL)
+
+    requests_mock.get(URL, exc=requests.exceptions.ConnectionError)
+    requests_mock.get(f"{URL}/other", exc=requests.exceptions.ConnectionError)
+    response = config_http_cache.request("GET", URL)
+
+    assert response.content == b'{"rule_config": []}'
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        config_http_cache.request("GET", f"{URL}/other")
+
+
+@pytest.mark.quick
+def test_cache_size_is_bounded(requests_mock, monkeypatch):
+    monkeypatch.setattr(config_http_cache, "MAX_SIZE", 1500)
+    for i in range(3):
+        requests_mock.get(f"{URL}/{i}", content=b"x" * 600)
+        config_http_cache.request("GET", f"{URL}/{i}")
+
+    assert len(list(config_http_cache._cache_dir().iterdir())) == 2
+
+
+@pytest.mark.quick
+def test_post_is_never_cached(requests_mock):
+    mocked = requests_mock.post(
+        URL, content=b'{"rule_config": []}', headers={"Cache-Control": "max-age=60"}
+    )
+
+    config_http_cache.request("POST", URL, json={})
+    config_http_cache.request("POST", URL, json={})
+
+    assert mocked.call_count == 2
@@ -4,13 +4,20 @@ import pytest
 
 import fastlint.fastlint_interfaces.fastlint_output_v1 as out
 from fastlint import __VERSION__
+from fastlint.config_cache import cache_config
+from fastlint.config_resolver import Config
 from fastlint.config_resolver import ConfigFile
 from fastlint.config_resolver import ConfigLoader
 from fastlint.config_resolver import ConfigType
 from fastlint.config_resolver import legacy_url_for_scan
+from fastlint.config_resolver import parse_config_files
+from fastlint.config_resolver import parse_config_string
 from fastlint.config_resolver import PRODUCT_NAMES
 from fastlint.constants import DEFAULT_FASTLINT_APP_CONFIG_URL
 from fastlint.error import FastlintError
+from fastlint.rule_lang import EmptySpan
+from fastlint.rule_lang import RpcValidationError
+from fastlint.rule_lang import YamlTree
 from fastlint.state import FastlintState
 
 FAKE_USER_AGENT = "user-agent"
@@ -278,3 +285,104 @@ def test_legacy_url_for_scan(
         mocker.patch("os.environ", {"FASTLINT_REPO_NAME": repo_name})
 
     assert legacy_url_for_scan(extra_params) == expected_url
+
+
+RULES = (
+    "rules:\n"
+    "- id: rule0\n"
+    "  pattern: $X == $X\n"
+    "  languages: [python]\n"
+    "  severity: INFO\n"
+    "  message: bad\n"
+)
+
+
+@pytest.mark.quick
+def test_parse_config_string_caches_configs_by_validation(mocker):
+    validate = mocker.patch("fastlint.rule_lang.run_rpc_validate")
+
+    for force_jsonschema in [True, True, False, False]:
+        parse_config_string(
+            "rules.yaml", RULES, "rules.yaml", force_jsonschema=force_jsonschema
+        )
+
+    # the config cached with jsonschema only is validated by fastlint-core
+    assert validate.call_count == 1
+
+
+@pytest.mark.quick
+def test_parse_config_string_parses_again_invalid_cached_config(mocker):
+    mocker.patch("fastlint.rule_lang.run_rpc_validate")
+    # regex-only rules can't have a pattern
+    cache_config(
+        RULES, {"rules": [{"id": "rule0", "languages": ["regex"], "pattern": "x"}]}
+    )
+
+    config, errors = parse_config_string("rules.yaml", RULES, "rules.yaml")
+
+    assert not errors
+    assert config["rules.yaml"].unroll()["rules"][0]["languages"] == ["python"]
+
+
+@pytest.mark.quick
+def test_from_config_list_keeps_the_order_of_configs(tmp_path):
+    configs = []
+    for i in range(6):
+        path = tmp_path / f"rules{i}.yaml"
+        path.write_text(
+            f"rules:\n"
+            f"- id: rule{i}\n"
+            f"  pattern: $X == $X\n"
+            f"  languages: [python]\n"
+            f"  severity: INFO\n"
+            f"  message: bad\n"
+        )
+        configs.append(str(path))
+    configs.append(str(tmp_path / "missing.yaml"))
+
+    config, errors = Config.from_config_list(configs, None)
+
+    assert list(config.valid) == [f"{path}_{i}" for i, path in enumerate(configs[:-1])]
+    assert len(errors) == 1 and "missing.yaml" in str(errors[0])
+
+
+def _rule_file(i):
+    return ConfigFile(
+        f"rules{i}.yaml",
+        f"rules:\n"
+        f"- id: rule{i}\n"
+        f"  pattern: $X == $X\n"
+        f"  languages: [python]\n"
+        f"  severity: INFO\n"
+        f"  message: bad\n",
+        f"rules{i}.yaml",
+    )
+
+
+@pytest.mark.quick
+def test_parse_config_files_validates_configs_together(mocker):
+    validate = mocker.patch("fastlint.config_resolver.run_rpc_validate")
+    parse_one = mocker.patch("fastlint.config_resolver._parse_config_string")
+
+    config, errors = parse_config_files([_rule_file(i) for i in range(3)])
+
+    assert validate.call_count == 1
+    assert parse_one.call_count == 0
+    assert not errors
+    assert list(config) == ["rules0.yaml", "rules1.yaml", "rules2.yaml"]
+    assert config["rules2.yaml"].unroll()["rules"][0]["id"] == "rule2"
+
+
+@pytest.mark.quick
+def test_parse_config_files_validates_configs_one_by_one_on_error(mocker):
+    mocker.patch(
+        "fastlint.config_resolver.run_rpc_validate", side_effect=RpcValidationError
+    )
+    parse_one = mocker.patch(
+        "fastlint.config_resolver._parse_config_string",
+        return_value=(YamlTree.wrap({"rules": []}, EmptySpan), []),
+    )
+
+    parse_config_files([_rule_file(i) for i in range(3)])
+
+    assert parse_one.call_count == 3
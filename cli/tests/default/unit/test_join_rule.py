@@ -1,11 +1,109 @@
+import dataclasses
+
 import pytest
 
+import fastlint.fastlint_interfaces.fastlint_output_v1 as out
+from fastlint.engine import EngineType
 from fastlint.join_rule import Condition
 from fastlint.join_rule import create_collection_set_from_conditions
 from fastlint.join_rule import create_model_map
+from fastlint.join_rule import db
 from fastlint.join_rule import InvalidConditionError
 from fastlint.join_rule import JoinOperator
+from fastlint.join_rule import load_results_into_db
+from fastlint.join_rule import match_on_conditions
 from fastlint.join_rule import model_factory
+from fastlint.join_rule import PreparedJoinRule
+from fastlint.join_rule import Ref
+from fastlint.join_rule import rename_metavars
+from fastlint.rule import Rule
+from fastlint.rule_match import RuleMatch
+from fastlint.run_scan import run_rules
+
+
+def to_core_match(result):
+    return out.CoreMatch(
+        check_id=out.RuleId(result["check_id"]),
+        path=out.Fpath(result["path"]),
+        start=out.Position(result["start"]["line"], result["start"]["col"], 0),
+        end=out.Position(result["end"]["line"], result["end"]["col"], 0),
+        extra=out.CoreMatchExtra(
+            metavars=out.Metavars(
+                {
+                    metavar: out.MetavarValue(
+                        start=out.Position.from_json(content["start"]),
+                        end=out.Position.from_json(content["end"]),
+                        abstract_content=content["abstract_content"],
+                    )
+                    for metavar, content in result["extra"]["metavars"].items()
+                }
+            ),
+            engine_kind=out.EngineOfFinding(out.OSS()),
+            is_ignored=False,
+        ),
+    )
+
+
+def make_result(check_id, path, **metavars):
+    position = {"col": 1, "line": 1, "offset": 0}
+    return to_core_match(
+        {
+            "check_id": check_id,
+            "path": path,
+            "start": position,
+            "end": position,
+            "extra": {
+                "metavars": {
+                    metavar: {
+                        "abstract_content": content,
+                        "start": position,
+                        "end": position,
+                    }
+                    for metavar, content in metavars.items()
+                }
+            },
+        }
+    )
+
+
+def make_join_rule(on=("user-input.$VAR == sink.$VAR",), **fields):
+    return Rule.from_json(
+        {
+            "id": "join",
+            "mode": "join",
+            "message": "join message",
+            "join": {
+                "rules": [
+                    {
+                        "id": "user-input",
+                        "languages": ["python"],
+                        "pattern": "$VAR = input()",
+                    },
+                    {"id": "sink", "languages": ["python"], "pattern": "eval($VAR)"},
+                ],
+                "on": list(on),
+            },
+            **fields,
+        }
+    )
+
+
+def make_finding(check_id, path, is_ignored=False, **metavars):
+    match = make_result(check_id, str(path), **metavars)
+    return RuleMatch(
+        message="part message",
+        severity=out.MatchSeverity.from_json("WARNING"),
+        match=dataclasses.replace(
+            match, extra=dataclasses.replace(match.extra, is_ignored=is_ignored)
+        ),
+    )
+
+
+@pytest.fixture
+def target(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("x = input()\neval(x)\n")
+    return path
 
 
 @pytest.mark.quick
@@ -214,7 +312,7 @@ def test_create_model_map():
             "start": {"col": 12, "line": 31},
         },
     ]
-    model_map = create_model_map(results)
+    model_map = create_model_map([to_core_match(result) for result in results])
 
     check_ids = {result.get("check_id") for result in results}
     assert set(model_map.keys()) == check_ids
@@ -223,3 +321,142 @@ def test_create_model_map():
         metavars = result.get("extra", {}).get("metavars")  # type: ignore
         for metavar in metavars.keys():
             assert getattr(model_map[check_id], metavar)  # type: ignore
+
+
+@pytest.mark.quick
+def test_match_on_conditions_returns_findings():
+    results = [
+        make_result("user-input", "app.py", **{"$VAR": "query"}),
+        make_result("user-input", "app.py", **{"$VAR": "page"}),
+        make_result("template", "app.py", **{"$EXPR": "query"}),
+        make_result("template", "app.py", **{"$EXPR": "other"}),
+    ]
+    refs_lookup = {
+        "user-input": Ref(id="user-input", renames={}, alias="user-input"),
+        "template": Ref(id="template", renames={"$EXPR": "$VAR"}, alias="template"),
+    }
+    results = rename_metavars(results, refs_lookup)
+    model_map = create_model_map(results)
+    db.connect()
+    try:
+        db.create_tables(model_map.values())
+        load_results_into_db(results, model_map)
+
+        query = match_on_conditions(
+            model_map,
+            {"user-input": "user-input", "template": "template"},
+            [Condition.parse("user-input.$VAR == template.$VAR")],
+        )
+
+        assert [row.finding for row in query] == [2]
+    finally:
+        db.close()
+
+
+@pytest.mark.quick
+def test_prepare_renames_the_rules_of_the_join():
+    prepared, errors = PreparedJoinRule.prepare(make_join_rule())
+
+    assert not errors
+    assert prepared is not None
+    assert list(prepared.core_rules) == ["join.user-input", "join.sink"]
+    assert prepared.original_ids == {
+        "join.user-input": "user-input",
+        "join.sink": "sink",
+    }
+
+
+@pytest.mark.quick
+def test_prepare_reports_invalid_conditions():
+    prepared, errors = PreparedJoinRule.prepare(make_join_rule(on=["nope"]))
+
+    assert prepared is None
+    assert len(errors) == 1 and isinstance(errors[0], InvalidConditionError)
+
+
+@pytest.mark.quick
+@pytest.mark.parametrize(
+    "fields,severity", [({"severity": "ERROR"}, "ERROR"), ({}, "WARNING")]
+)
+def test_evaluate_join_rule(target, fields, severity):
+    join_rule = make_join_rule(**fields)
+    prepared, _ = PreparedJoinRule.prepare(join_rule)
+    rules = prepared.core_rules
+
+    findings = prepared.evaluate(
+        {
+            rules["join.user-input"]: [
+                make_finding("join.user-input", target, **{"$VAR": "x"})
+            ],
+            rules["join.sink"]: [
+                make_finding("join.sink", target, **{"$VAR": "x"}),
+                make_finding("join.sink", target, **{"$VAR": "y"}),
+            ],
+        }
+    )
+
+    assert len(findings) == 1
+    assert findings[0].rule_id == "join"
+    assert findings[0].message == "join message"
+    # without a severity, the join rule uses the one of the matched finding
+    assert findings[0].severity == out.MatchSeverity.from_json(severity)
+
+
+@pytest.mark.quick
+def test_evaluate_join_rule_follows_nosem(target):
+    prepared, _ = PreparedJoinRule.prepare(make_join_rule())
+    rules = prepared.core_rules
+    rule_matches = {
+        rules["join.user-input"]: [
+            make_finding("join.user-input", target, is_ignored=True, **{"$VAR": "x"})
+        ],
+        rules["join.sink"]: [make_finding("join.sink", target, **{"$VAR": "x"})],
+    }
+
+    assert prepared.evaluate(rule_matches) == []
+    assert len(prepared.evaluate(rule_matches, disable_nosem=True)) == 1
+
+
+@pytest.mark.quick
+def test_run_rules_reports_join_rules_instead_of_their_rules(mocker, target):
+    join_rule = make_join_rule()
+    other_rule = Rule.from_json(
+        {
+            "id": "other",
+            "languages": ["python"],
+            "pattern": "eval(...)",
+            "severity": "INFO",
+            "message": "eval",
+        }
+    )
+
+    def invoke_fastlint_core(target_manager, rules, *args):
+        by_id = {rule.id: rule for rule in rules}
+        assert set(by_id) == {"join.user-input", "join.sink", "other"}
+        rule_matches_by_rule = {
+            by_id["join.user-input"]: [
+                make_finding("join.user-input", target, **{"$VAR": "x"})
+            ],
+            by_id["join.sink"]: [make_finding("join.sink", target, **{"$VAR": "x"})],
+            by_id["other"]: [make_finding("other", target)],
+        }
+        return rule_matches_by_rule, [], mocker.MagicMock()
+
+    core_runner = mocker.MagicMock()
+    core_runner.invoke_fastlint_core.side_effect = invoke_fastlint_core
+    mocker.patch("fastlint.run_scan.scan_report.print_scan_status", return_value=[])
+
+    rule_matches_by_rule, *_ = run_rules(
+        [join_rule, other_rule],
+        mocker.MagicMock(),
+        core_runner,
+        mocker.MagicMock(),
+        dump_command_for_core=False,
+        time_flag=False,
+        matching_explanations=False,
+        engine_type=EngineType.OSS,
+        strict=False,
+    )
+
+    assert set(rule_matches_by_rule) == {other_rule, join_rule}
+    assert [match.rule_id for match in rule_matches_by_rule[join_rule]] == ["join"]
@@ -0,0 +1,80 @@
+import json
+from io import StringIO
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import fastlint.formatter.base as base
+import fastlint.fastlint_interfaces.fastlint_output_v1 as out
+from fastlint.error import FastlintError
+from fastlint.formatter.json import write_json
+from fastlint.formatter.ndjson import NdjsonFormatter
+from fastlint.rule_match import RuleMatch
+
+
+def create_match(path: str, line: int) -> RuleMatch:
+    return RuleMatch(
+        message="messagé",
+        severity=out.MatchSeverity(out.Error()),
+        match=out.CoreMatch(
+            check_id=out.RuleId("rule.id"),
+            path=out.Fpath(path),
+            start=out.Position(line, 1, line * 10),
+            end=out.Position(line, 6, line * 10 + 5),
+            extra=out.CoreMatchExtra(
+                metavars=out.Metavars({}),
+                engine_kind=out.EngineOfFinding(out.OSS()),
+                is_ignored=False,
+            ),
+        ),
+    )
+
+
+def create_matches(tmp_path: Path) -> List[RuleMatch]:
+    matches = []
+    for name in ["b.py", "a.py"]:
+        path = tmp_path / name
+        path.write_text("foo()\nbar()\n")
+        matches += [create_match(str(path), line) for line in [2, 1]]
+    return matches
+
+
+CLI_OUTPUT_EXTRA = out.CliOutputExtra(
+    paths=out.ScannedAndSkipped(scanned=[out.Fpath("a.py"), out.Fpath("b.py")]),
+    skipped_rules=[],
+)
+
+
+@pytest.mark.quick
+def test_write_json_same_as_cli_output(tmp_path):
+    matches = create_matches(tmp_path)
+    errors = [FastlintError("oops")]
+
+    fout = StringIO()
+    write_json(fout, matches, errors, CLI_OUTPUT_EXTRA)
+
+    expected = base.to_CliOutput(matches, errors, CLI_OUTPUT_EXTRA).to_json()
+    assert json.loads(fout.getvalue()) == expected
+    # same key order as the serializers of fastlint-core
+    assert list(json.loads(fout.getvalue())) == list(expected)
+
+
+@pytest.mark.quick
+def test_ndjson_one_finding_per_line(tmp_path):
+    matches = create_matches(tmp_path)
+    errors = [FastlintError("oops")]
+
+    ctx = out.FormatContext(
+        is_ci_invocation=False, is_logged_in=False, is_using_registry=False
+    )
+    output = NdjsonFormatter().format([], matches, errors, CLI_OUTPUT_EXTRA, {}, ctx)
+
+    lines = output.splitlines()
+    assert output.endswith("\n")
+    assert len(lines) == len(matches) + len(errors)
+    cli_output = base.to_CliOutput(matches, errors, CLI_OUTPUT_EXTRA).to_json()
+    assert [json.loads(line) for line in lines] == [
+        *cli_output["results"],
+        *cli_output["errors"],
+    ]
@@ -0,0 +1,114 @@
+import itertools
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from fastlint.error import FastlintError
+from fastlint.line_index import LineIndex
+from fastlint.line_index import LineIndexCache
+from fastlint.line_index import SPLITLINES_RE
+
+
+TEXTS = [
+    "",
+    "\n",
+    "one line without newline",
+    "a\nb\nc\n",
+    "a\nb\nc",
+    "\n\nthird\n\n",
+    "with\ttabs\n  and indentation\n",
+]
+
+
+@pytest.mark.quick
+@pytest.mark.parametrize("text", TEXTS)
+def test_line_index_matches_file_iteration(text: str) -> None:
+    index = LineIndex(text)
+    lines = text.splitlines(keepends=True)
+    assert len(index) == len(lines)
+    for start, end in itertools.product(range(0, 6), range(0, 6)):
+        expected = list(itertools.islice(lines, max(start - 1, 0), end))
+        assert index.get_lines(start, end) == expected
+
+
+@pytest.mark.quick
+def test_line_index_splitlines() -> None:
+    text = "a\r\nb\rc\x0cd e\n"
+    index = LineIndex(text, line_break=SPLITLINES_RE, keepends=False)
+    assert index.get_lines(1, 10) == text.splitlines()
+    assert index.get_line(3) == "c"
+
+
+@pytest.mark.quick
+def test_file_index_reads_once(tmp_path: Path, mocker) -> None:
+    path = tmp_path / "foo.py"
+    path.write_text("x = 1\ny = 2\nz = 3\n")
+    cache = LineIndexCache()
+    spy = mocker.spy(LineIndexCache, "_read_file")
+
+    assert cache.get_file_lines(path, 2, 3) == ["y = 2\n", "z = 3\n"]
+    assert cache.get_file_lines(path, 1, 1) == ["x = 1\n"]
+    assert spy.call_count == 1
+
+    # a rewritten file must be indexed again
+    path.write_text("x = 1\ny = 2\nz = 3\nw = 4\n")
+    assert cache.get_file_lines(path, 4, 4) == ["w = 4\n"]
+    assert spy.call_count == 2
+
+
+@pytest.mark.quick
+def test_empty_range_does_not_read(tmp_path: Path) -> None:
+    cache = LineIndexCache()
+    # the lines of a match in an empty file
+    assert cache.get_file_lines(tmp_path / "missing.py", 0, 0) == []
+    assert cache.get_blob_lines("0" * 40, 0, 0) == []
+    assert len(cache) == 0
+
+
+@pytest.mark.quick
+def test_removed_file_has_no_lines(tmp_path: Path) -> None:
+    cache = LineIndexCache()
+    assert cache.get_file_lines(tmp_path / "removed.py", 1, 3) == []
+
+
+@pytest.mark.quick
+def test_cache_is_bounded_by_bytes() -> None:
+    cache = LineIndexCache(max_bytes=100)
+    for key in range(10):
+        cache.put(key, LineIndex("x" * 30))
+    assert cache.size <= 100
+    assert cache.get(0) is None
+    assert cache.get(9) is not None
+
+    # too big to ever be kept
+    cache.put("big", LineIndex("x" * 1000))
+    assert cache.get("big") is None
+
+
+@pytest.mark.quick
+def test_blob_index(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    contents = "\n\nfirst = 1\r\nsecond = 2\nthird = 3\n"
+    blob_sha = subprocess.run(
+        ["git", "hash-object", "-w", "--stdin"],
+        input=contents,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+    cache = LineIndexCache()
+    try:
+        # same as `git cat-file blob` through git_check_output().splitlines()
+        expected = contents.strip().splitlines()
+        assert cache.get_blob_lines(blob_sha, 1, 3) == expected
+        assert cache.get_blob_lines(blob_sha, 2, 2) == ["second = 2"]
+        # reported by the `git cat-file blob` fallback
+        with pytest.raises(FastlintError, match="Command failed"):
+            cache.blob_index("0" * 40)
+        # the reader survives a missing object
+        assert cache.get_blob_lines(blob_sha, 3, 3) == ["third = 3"]
+    finally:
+        cache.clear()
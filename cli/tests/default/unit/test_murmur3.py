@@ -0,0 +1,53 @@
+import random
+from typing import Union
+
+import pytest
+
+import fastlint.murmur3 as murmur3
+from fastlint.external.pymmh3 import hash128 as pymmh3_hash128  # type: ignore[attr-defined]
+from fastlint.murmur3 import hash128
+
+# Computed with fastlint.external.pymmh3.hash128. These must never change:
+# the syntactic_id of findings is derived from them.
+GOLDEN_VECTORS = [
+    ("", 0, 0x00000000000000000000000000000000),
+    ("a", 0, 0xE6B53A48510E895A85555565F6597889),
+    ("ab", 0, 0xE65EA7019B52D4AD938B11EA16ED1B2E),
+    ("abcdefgh", 0, 0x48890D60EB6940A1CC8A0AB037EF8C02),
+    ("abcdefghi", 0, 0x79B53DF5B741E0330547C0CFF13C7964),
+    ("0123456789abcdef", 0, 0x87C35B5C63A708DA4BE06D94CF4AD1A7),
+    ("0123456789abcdef0", 0, 0x73FB68B3313128CAEB24AE8785A5C075),
+    ("0123456789abcdef0123456789abcde", 0, 0x89FE4CDA7EFD82519AFBAC977E4DAF00),
+    ("héllo wörld ✓", 0, 0x861BDD8F6007D815E36A3988C2F0FE74),
+    (
+        "('long.rule.id', 'relative/path/to/foo.py', '5 == 5', 0)",
+        0,
+        0xE9F75FFE95EDB9E7B898D5F8C475501A,
+    ),
+    ("a", 42, 0x25EBCA9125F82B1528259CA4FDF626B0),
+    ("0123456789abcdef0123", 42, 0xB7F785C1DFD99B8D081E6D1FD710E499),
+    (b"\x00\xff" * 13, 0, 0xA7D72905DCDCC5CBCC87CB53DA3D4999),
+]
+
+
+@pytest.fixture(params=["default", "pure-python"])
+def backend(request, monkeypatch) -> str:
+    if request.param == "pure-python":
+        monkeypatch.setattr(murmur3, "_mmh3", None)
+    return request.param
+
+
+@pytest.mark.quick
+@pytest.mark.parametrize("key,seed,expected", GOLDEN_VECTORS)
+def test_golden_vectors(backend: str, key: Union[str, bytes], seed: int, expected: int):
+    assert hash128(key, seed) == expected
+
+
+@pytest.mark.quick
+def test_same_as_pymmh3(backend: str):
+    rand = random.Random(0)
+    keys = [bytes(rand.randrange(256) for _ in range(n)) for n in range(0, 80)]
+    keys.append(bytes(rand.randrange(256) for _ in range(4099)))
+    for seed in [0, 1, 0xDEADBEEF]:
+        expected = [pymmh3_hash128(key, seed) for key in keys]
+        assert [hash128(key, seed) for key in keys] == expected
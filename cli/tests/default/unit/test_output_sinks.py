@@ -0,0 +1,40 @@
+import gzip
+import lzma
+
+import pytest
+
+from fastlint.output import gzip_chunks
+from fastlint.output import open_output_file
+from fastlint.output import post_timeout
+
+
+@pytest.mark.quick
+@pytest.mark.parametrize(
+    ("name", "read"),
+    [
+        ("out.json", lambda path: path.read_text()),
+        ("out.json.gz", lambda path: gzip.decompress(path.read_bytes()).decode()),
+        ("out.sarif.xz", lambda path: lzma.decompress(path.read_bytes()).decode()),
+    ],
+)
+def test_open_output_file(tmp_path, name, read):
+    path = tmp_path / "sub" / name
+    with open_output_file(path) as fout:
+        fout.write('{"results": ["é"]}')
+
+    assert read(path) == '{"results": ["é"]}'
+
+
+@pytest.mark.quick
+def test_gzip_chunks():
+    data = b"".join(b"finding %d\n" % i for i in range(100_000))
+
+    chunks = list(gzip_chunks(data, chunk_size=4096))
+
+    assert len(chunks) > 1
+    assert gzip.decompress(b"".join(chunks)) == data
+
+
+@pytest.mark.quick
+def test_post_timeout_grows_with_size():
+    assert post_timeout(0) < post_timeout(100 * 1024 * 1024)
@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from fastlint import rpc
+from fastlint.rpc import RpcSession
+
+# A fake fastlint-core echoing every call back, prefixed with its pid so that
+# we can tell how many processes served the calls.
+FAKE_CORE = """
+import os
+import sys
+
+persistent = "-rpc_persistent" in sys.argv and "--one-call" not in sys.argv
+if "--no-persistent" in sys.argv and persistent:
+    sys.exit(2)
+while True:
+    size = sys.stdin.readline()
+    if not size:
+        break
+    packet = "%d:%s" % (os.getpid(), sys.stdin.read(int(size)))
+    sys.stdout.write("%d\\n%s" % (len(packet), packet))
+    sys.stdout.flush()
+    if not persistent:
+        break
+"""
+
+
+def fake_core(tmp_path: Path, *args: str) -> List[str]:
+    script = tmp_path / "fake_core.py"
+    script.write_text(FAKE_CORE)
+    return [sys.executable, str(script), *args, "-rpc"]
+
+
+def pids(responses: List[str]) -> List[str]:
+    return [response.split(":", 1)[0] for response in responses]
+
+
+@pytest.mark.quick
+def test_session_reuses_process(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(rpc, "_core_command", lambda: fake_core(tmp_path))
+    session = RpcSession()
+    try:
+        responses = [session.call(f"call {i}") for i in range(3)]
+    finally:
+        session.close()
+    assert session.is_persistent
+    assert [r.split(":", 1)[1] for r in responses] == ["call 0", "call 1", "call 2"]
+    assert len(set(pids(responses))) == 1
+
+
+@pytest.mark.quick
+def test_session_falls_back_to_one_shot(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(
+        rpc, "_core_command", lambda: fake_core(tmp_path, "--no-persistent")
+    )
+    session = RpcSession()
+    try:
+        responses = [session.call(f"call {i}") for i in range(3)]
+    finally:
+        session.close()
+    assert session.is_persistent is False
+    assert [r.split(":", 1)[1] for r in responses] == ["call 0", "call 1", "call 2"]
+    assert len(set(pids(responses))) == 3
+
+
+@pytest.mark.quick
+def test_session_falls_back_when_flag_ignored(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(rpc, "_core_command", lambda: fake_core(tmp_path, "--one-call"))
+    session = RpcSession()
+    try:
+        responses = [session.call(f"call {i}") for i in range(6)]
+    finally:
+        session.close()
+    assert session.is_persistent is False
+    assert [r.split(":", 1)[1] for r in responses] == [f"call {i}" for i in range(6)]
+
+
+@pytest.mark.quick
+def test_session_retries_when_process_died(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(rpc, "_core_command", lambda: fake_core(tmp_path))
+    session = RpcSession()
+    try:
+        responses = [session.call(f"call {i}") for i in range(2)]
+        assert session._proc is not None
+        session._proc.kill()
+        session._proc.wait()
+        responses += [session.call(f"call {i}") for i in range(2, 4)]
+    finally:
+        session.close()
+    assert session.is_persistent
+    assert [r.split(":", 1)[1] for r in responses] == [f"call {i}" for i in range(4)]
@@ -4,6 +4,7 @@ import pytest
 
 from fastlint.config_resolver import parse_config_string
 from fastlint.rule import Rule
+from fastlint.rule import RuleRegistry
 
 
 def create_validator_rule(
@@ -95,6 +96,26 @@ def test_rule_full_hash_equivalency():
     assert rule2.full_hash != rule3.full_hash
 
 
+@pytest.mark.quick
+def test_rule_rename_id_updates_full_hash():
+    rule = create_validator_rule()
+    full_hash = rule.full_hash
+
+    rule.rename_id("testfile.rule_id")
+
+    assert rule.full_hash != full_hash
+    assert rule != create_validator_rule()
+
+
+@pytest.mark.quick
+def test_rule_registry_interns_equal_rules():
+    registry = RuleRegistry()
+    rule = registry.intern(create_validator_rule())
+
+    assert registry.intern(create_validator_rule()) is rule
+    assert registry.intern(create_validator_rule(action="block")) is not rule
+
+
 @pytest.mark.quick
 @pytest.mark.parametrize(
     ("valid_action", "expected"), [("block", True), ("monitor", False)]
@@ -0,0 +1,68 @@
+import pytest
+
+import fastlint.fastlint_interfaces.fastlint_output_v1 as out
+from fastlint.rule import Rule
+from fastlint.rule_dedup import add_alias_matches
+from fastlint.rule_dedup import dedup_rules
+
+
+def make_rule(rule_id, message="bad", metadata=None):
+    raw = {
+        "id": rule_id,
+        "pattern": "$X == $X",
+        "languages": ["python"],
+        "severity": "INFO",
+        "message": message,
+    }
+    if metadata is not None:
+        raw["metadata"] = metadata
+    return Rule(raw)
+
+
+def make_match(rule_id):
+    return out.CoreMatch(
+        check_id=out.RuleId(rule_id),
+        path=out.Fpath("foo.py"),
+        start=out.Position(1, 1, 0),
+        end=out.Position(1, 7, 6),
+        extra=out.CoreMatchExtra(
+            metavars=out.Metavars({}),
+            engine_kind=out.EngineOfFinding(out.OSS()),
+            is_ignored=False,
+            metadata=out.RawJson({"pack": "default"}),
+        ),
+    )
+
+
+@pytest.mark.quick
+def test_dedup_rules_ignores_id_and_metadata():
+    first = make_rule("p.default.eq", metadata={"pack": "default"})
+    alias = make_rule("p.python.eq", metadata={"pack": "python"})
+    other_message = make_rule("p.audit.eq", message="very bad")
+    interpolated = make_rule("p.audit.eq2", metadata={"var": "$X"})
+
+    unique, aliases = dedup_rules([first, alias, other_message, interpolated])
+
+    assert unique == [first, other_message, interpolated]
+    assert aliases == {"p.default.eq": [alias]}
+
+
+@pytest.mark.quick
+def test_add_alias_matches():
+    alias = make_rule("p.python.eq", metadata={"pack": "python"})
+    core_output = out.CoreOutput(
+        version=out.Version("1.0.0"),
+        results=[make_match("p.default.eq")],
+        errors=[],
+        paths=out.ScannedAndSkipped(scanned=[out.Fpath("foo.py")]),
+    )
+
+    results = add_alias_matches(core_output, {"p.default.eq": [alias]}).results
+
+    assert [match.check_id.value for match in results] == [
+        "p.default.eq",
+        "p.python.eq",
+    ]
+    assert results[0].extra.metadata is not None
+    assert results[1].extra.metadata is None
+    assert results[1].start == results[0].start
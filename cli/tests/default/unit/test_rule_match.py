@@ -14,8 +14,10 @@ from fastlint.rule_match import remove_content
 from fastlint.rule_match import remove_content_call
 from fastlint.rule_match import remove_content_int_var
 from fastlint.rule_match import remove_content_loc
+from fastlint.rule_match import merge_findings
 from fastlint.rule_match import RuleMatch
 from fastlint.rule_match import RuleMatches
+from fastlint.rule_match import sort_findings
 
 
 def create_rule() -> Rule:
@@ -775,3 +777,86 @@ def test_remove_content_call(input_json, output_json):
 def test_remove_content(input_json, output_json):
     data = remove_content(out.MatchDataflowTrace.from_json(input_json))
     assert data and (out.MatchDataflowTrace.to_json(data) == output_json)
+
+
+@pytest.mark.quick
+def test_rule_match_metavars_from_core_match(mocker):
+    mocker.patch.object(RuleMatch, "get_lines", lambda self: ["foo(x)\n"])
+    metavar = out.MetavarValue(
+        start=out.Position(1, 5, 4),
+        end=out.Position(1, 6, 5),
+        abstract_content="x",
+    )
+    core_match = out.CoreMatch(
+        check_id=out.RuleId("rule_id"),
+        path=out.Fpath("foo.py"),
+        start=out.Position(1, 1, 0),
+        end=out.Position(1, 7, 6),
+        extra=out.CoreMatchExtra(
+            metavars=out.Metavars({"$X": metavar}),
+            engine_kind=out.EngineOfFinding(out.OSS()),
+            is_ignored=False,
+        ),
+    )
+    # matches no longer carry the JSON of their core match in extra...
+    from_core = RuleMatch(
+        message="message",
+        severity=out.MatchSeverity(out.Error()),
+        match=core_match,
+        match_formula_string="foo($X)",
+    )
+    # ...but must hash the same as when they did
+    from_extra = RuleMatch(
+        message="message",
+        severity=out.MatchSeverity(out.Error()),
+        match=core_match,
+        match_formula_string="foo($X)",
+        extra=core_match.extra.to_json(),
+    )
+    assert from_core.extra == {}
+    assert from_core.get_abstract_match_formula_string() == "foo(x)"
+    assert from_core.match_based_id == from_extra.match_based_id
+    assert from_core.pattern_hash == from_extra.pattern_hash
+
+    from_core.extra["fixed_lines"] = ["foo(y)"]
+    full_extra = from_core.get_full_extra()
+    assert full_extra["fixed_lines"] == ["foo(y)"]
+    assert full_extra["metavars"]["$X"]["abstract_content"] == "x"
+
+
+@pytest.mark.quick
+def test_merge_findings(mocker):
+    mocker.patch.object(RuleMatch, "get_lines", lambda self: ["foo()\n"])
+
+    def create_match(rule_id: str, path: str, line: int) -> RuleMatch:
+        return RuleMatch(
+            message="message",
+            severity=out.MatchSeverity(out.Error()),
+            match=out.CoreMatch(
+                check_id=out.RuleId(rule_id),
+                path=out.Fpath(path),
+                start=out.Position(line, 1, line * 10),
+                end=out.Position(line, 6, line * 10 + 5),
+                extra=out.CoreMatchExtra(
+                    metavars=out.Metavars({}),
+                    engine_kind=out.EngineOfFinding(out.OSS()),
+                    is_ignored=False,
+                ),
+            ),
+        )
+
+    runs = [
+        sort_findings(
+            create_match(rule_id, path, line)
+            for path in ["b.py", "a.py"]
+            for line in [3, 1, 2]
+        )
+        for rule_id in ["rule2", "rule1"]
+    ]
+    merged = list(merge_findings(runs))
+    assert merged == sorted(match for run in runs for match in run)
+    assert [(m.path.name, m.start.line, m.rule_id) for m in merged[:3]] == [
+        ("a.py", 1, "rule1"),
+        ("a.py", 1, "rule2"),
+        ("a.py", 2, "rule1"),
+    ]
@@ -0,0 +1,31 @@
+import json
+from io import StringIO
+
+import pytest
+
+from fastlint.formatter.sarif import _write_sarif
+
+
+@pytest.mark.quick
+def test_write_sarif_concatenates_results():
+    envelope = {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "runs": [
+            {
+                "invocations": [{"executionSuccessful": True}],
+                "results": [],
+                "tool": {"driver": {"name": "Fastlint OSS", "rules": []}},
+            }
+        ],
+        "version": "2.1.0",
+    }
+    chunks = [[{"ruleId": "a"}, {"ruleId": "b"}], [], [{"ruleId": "ç"}]]
+
+    fout = StringIO()
+    _write_sarif(fout, envelope, iter(chunks))
+
+    expected = json.loads(json.dumps(envelope))
+    expected["runs"][0]["results"] = [r for chunk in chunks for r in chunk]
+    assert json.loads(fout.getvalue()) == expected
+    # the envelope is left untouched
+    assert envelope["runs"][0]["results"] == []
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+import pytest
+
+from fastlint.util import sort_paths
+
+
+@pytest.mark.quick
+def test_sort_paths_same_order_as_paths():
+    names = ["a/b", "a-b", "a", "a/b/c", "a.b", "ab", "a/-", "b", "a b", "x/y.py"]
+    paths = {Path(name) for name in names}
+
+    assert sort_paths(paths) == [str(path) for path in sorted(paths)]
@@ -0,0 +1,30 @@
+import pytest
+
+from fastlint.error_location import SourceTracker
+
+
+@pytest.mark.quick
+def test_source_lines_are_read_again_from_path(tmp_path):
+    path = tmp_path / "pnpm-lock.yaml"
+    path.write_text("lockfileVersion: 5.4\npackages: {}\n")
+
+    source_hash = SourceTracker.add_source(path.read_text(), path)
+
+    assert source_hash not in SourceTracker.sources
+    assert SourceTracker.source(source_hash) == [
+        "lockfileVersion: 5.4",
+        "packages: {}",
+    ]
+
+
+@pytest.mark.quick
+def test_source_lines_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(SourceTracker, "MAX_CACHED_SOURCES", 2)
+    hashes = [SourceTracker.add_source(f"source: {i}\n") for i in range(3)]
+
+    for source_hash in hashes:
+        SourceTracker.source(source_hash)
+
+    assert hashes[0] not in SourceTracker._lines
+    assert SourceTracker.source(hashes[0]) == ["source: 0"]
+    assert len(SourceTracker._lines) == 2
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+from fastlint.formatter.text import format_lines
+
+
+@pytest.mark.quick
+def test_format_lines_counts_lines_not_fetched():
+    lines = [f"x = {i}\n" for i in range(3)]
+    texts = list(
+        format_lines(
+            Path("foo.py"),
+            1,
+            1,
+            1000,
+            6,
+            lines,
+            False,
+            False,
+            3,
+            None,
+            False,
+            False,
+            total_lines=1000,
+        )
+    )
+
+    assert [text.plain.strip() for text in texts[:3]] == [
+        f"{i + 1}┆ x = {i}" for i in range(3)
+    ]
+    assert "[hid 997 additional lines" in texts[-1].plain
@@ -4,12 +4,15 @@ from textwrap import dedent
 
 import pytest
 from ruamel.yaml import YAML
+from ruamel.yaml import YAMLError
 
 from fastlint.config_resolver import Config
 from fastlint.config_resolver import parse_config_string
 from fastlint.config_resolver import validate_single_rule
 from fastlint.constants import RULES_KEY
 from fastlint.error import InvalidRuleSchemaError
+from fastlint.rule_lang import parse_yaml_fast
+from fastlint.rule_lang import parse_yaml_preserve_spans
 
 
 @pytest.mark.quick
@@ -223,3 +226,72 @@ def test_invalid_rule_with_null():
 
     with pytest.raises(InvalidRuleSchemaError):
         parse_config_string("testfile", rule, None)
+
+
+@pytest.mark.quick
+def test_parse_yaml_fast_matches_preserve_spans():
+    contents = dedent(
+        """
+        rules:
+        - id: blah
+          message: bad
+          severity: INFO
+          languages: [python]
+          pattern: $X == $X
+          metadata:
+            created: 2021-10-19
+            confidence: 3
+            references: [a, b]
+            enabled: true
+        """
+    )
+
+    fast = parse_yaml_fast(contents)
+    slow = parse_yaml_preserve_spans(contents, "testfile")
+
+    assert fast is not None and slow is not None
+    assert fast.unroll() == slow.unroll()
+
+
+@pytest.mark.quick
+def test_parse_yaml_fast_leaves_errors_to_preserve_spans():
+    assert parse_yaml_fast("") is None
+    assert parse_yaml_fast("rules:\n- id: ~\n") is None
+
+    with pytest.raises(YAMLError):
+        parse_yaml_fast("rules: []\nrules: []\n")
+    with pytest.raises(InvalidRuleSchemaError):
+        parse_config_string("testfile", "rules: []\nrules: []\n", None)
+
+
+@pytest.mark.quick
+def test_invalid_rule_is_reported_when_other_rules_were_validated():
+    valid_rule = dedent(
+        """
+        - id: valid
+          pattern: $X == $X
+          message: bad
+          languages: [python]
+          severity: ERROR
+        """
+    )
+    invalid_rule = dedent(
+        """
+        - id: invalid
+          pattern: $X == $X
+          languages: [python]
+          severity: ERROR
+        """
+    )
+    parse_config_string("valid", f"rules:{valid_rule}", None)
+    contents = f"rules:{valid_rule}{invalid_rule}"
+
+    # the first rule was validated above, the error must still point to the
+    # second one
+    with pytest.raises(InvalidRuleSchemaError) as excinfo:
+        parse_config_string("testfile", contents, None)
+
+    assert (
+        excinfo.value.spans[0].start.line
+        == contents.splitlines().index("- id: invalid") + 1
+    )
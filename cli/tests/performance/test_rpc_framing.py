@@ -0,0 +1,31 @@
+import os
+import threading
+from time import perf_counter
+
+import pytest
+
+from fastlint.rpc import _read_packet
+from fastlint.rpc import _write_packet
+
+# About the size of the CliOutput of our biggest scans
+PAYLOAD_MB = 500
+
+
+@pytest.mark.slow
+def test_rpc_framing_round_trip_benchmark():
+    # Mostly ASCII, like JSON, with some multi-byte characters thrown in so
+    # that reads can end in the middle of one.
+    chunk = '{"check_id": "rule", "message": "café — \U0001f600"},'
+    payload = chunk * (PAYLOAD_MB * 1024 * 1024 // len(chunk.encode()))
+
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "rb") as reader, os.fdopen(write_fd, "wb") as writer:
+        start = perf_counter()
+        thread = threading.Thread(target=_write_packet, args=(writer, payload))
+        thread.start()
+        result = _read_packet(reader)
+        thread.join()
+        elapsed = perf_counter() - start
+
+    print(f"round-tripped {PAYLOAD_MB}MB in {elapsed:.3f}s")
+    assert result == payload
@@ -0,0 +1,33 @@
+from time import perf_counter
+
+import pytest
+
+from fastlint.external.pymmh3 import hash128 as pymmh3_hash128  # type: ignore[attr-defined]
+from fastlint.murmur3 import hash128
+
+# A typical str(RuleMatch.ci_unique_key)
+KEY = str(
+    (
+        "python.lang.security.audit.dangerous-subprocess-use",
+        "src/project/module/submodule/file.py",
+        "subprocess.check_output(cmd, shell=True)",
+        0,
+    )
+)
+
+
+@pytest.mark.kinda_slow
+def test_hash128_benchmark():
+    keys = [f"{KEY}{i}" for i in range(20000)]
+
+    start = perf_counter()
+    expected = [pymmh3_hash128(key) for key in keys]
+    pymmh3_time = perf_counter() - start
+
+    start = perf_counter()
+    result = [hash128(key) for key in keys]
+    murmur3_time = perf_counter() - start
+
+    print(f"pymmh3: {pymmh3_time:.3f}s, murmur3: {murmur3_time:.3f}s")
+    assert result == expected
+    assert murmur3_time < pymmh3_time